@@ -0,0 +1,317 @@
+"""
+Blob Store Module
+Content-addressed store for cleaned page bodies (SQLite under data/)
+Bodies are stored once per sha256, zlib-compressed, with a reference count.
+References come from a URL -> hash index (latest full cleaned body per URL,
+stored when the page is fetched and shared across sessions and users) and
+from session snapshots (the exact sources of each generated PDF), so a pack
+can be rebuilt later without network access.
+Unreferenced blobs are deleted; above a size cap the least recently used URL
+index entries are dropped first.
+"""
+import sqlite3
+import os
+import json
+import time
+import zlib
+import hashlib
+from contextlib import contextmanager
+import url_normalizer
+
+# Base directory for data storage
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+BLOB_STORE_DB = os.path.join(DATA_DIR, 'blob_store.db')
+
+# Store settings (override via env)
+# Compressed size above which URL index entries are evicted (least recently used first)
+BLOB_STORE_MAX_BYTES = int(os.environ.get("BLOB_STORE_MAX_BYTES", 500 * 1024 * 1024))
+# "lru": evict URL index entries above the cap; "none": never evict referenced blobs
+BLOB_STORE_EVICTION = os.environ.get("BLOB_STORE_EVICTION", "lru")
+# Session snapshots older than this are released (0 = keep forever)
+BLOB_STORE_SESSION_MAX_AGE_DAYS = float(os.environ.get("BLOB_STORE_SESSION_MAX_AGE_DAYS", 0))
+BLOB_STORE_ENABLED = os.environ.get("BLOB_STORE_ENABLED", "1") != "0"
+
+
+@contextmanager
+def get_store_db():
+    """Context manager for blob store connections"""
+    conn = sqlite3.connect(BLOB_STORE_DB, timeout=10)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+def init_store():
+    """Initialize blob store database with schema"""
+    os.makedirs(os.path.dirname(BLOB_STORE_DB), exist_ok=True)
+    with get_store_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+        """)
+
+        # URL -> latest cleaned body
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS url_blobs (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_url_blobs_accessed
+            ON url_blobs(last_accessed)
+        """)
+
+        # Sources of each generated PDF, in order
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_blobs (
+                session_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                also_at TEXT,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (session_id, position)
+            )
+        """)
+
+
+def content_hash(body: str) -> str:
+    return hashlib.sha256((body or '').encode('utf-8')).hexdigest()
+
+
+def _put(cursor, body: str) -> str:
+    """Store a body (if new) and take a reference to it"""
+    digest = content_hash(body)
+    cursor.execute("UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?", (digest,))
+    if cursor.rowcount == 0:
+        data = zlib.compress((body or '').encode('utf-8'), 6)
+        cursor.execute("""
+            INSERT INTO blobs (hash, data, size, refcount, created_at)
+            VALUES (?, ?, ?, 1, ?)
+        """, (digest, data, len(data), time.time()))
+    return digest
+
+
+def _release(cursor, digest: str):
+    """Drop a reference; the blob is deleted with its last reference"""
+    cursor.execute("UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?", (digest,))
+    cursor.execute("DELETE FROM blobs WHERE hash = ? AND refcount <= 0", (digest,))
+
+
+def _get(cursor, digest: str):
+    cursor.execute("SELECT data FROM blobs WHERE hash = ?", (digest,))
+    row = cursor.fetchone()
+    return zlib.decompress(row['data']).decode('utf-8') if row else None
+
+
+def get_blob(digest: str):
+    """Body for a content hash (None if not stored)"""
+    with get_store_db() as conn:
+        return _get(conn.cursor(), digest)
+
+
+# ---------- URL INDEX ----------
+
+def _link_url(cursor, url: str, body: str, now: float):
+    key = url_normalizer.url_key(url)
+    cursor.execute("SELECT hash FROM url_blobs WHERE url_key = ?", (key,))
+    row = cursor.fetchone()
+    digest = content_hash(body)
+    if row and row['hash'] == digest:
+        cursor.execute("UPDATE url_blobs SET last_accessed = ? WHERE url_key = ?", (now, key))
+        return
+    _put(cursor, body)
+    if row:
+        _release(cursor, row['hash'])
+    cursor.execute("""
+        INSERT OR REPLACE INTO url_blobs (url_key, url, hash, stored_at, last_accessed)
+        VALUES (?, ?, ?, ?, ?)
+    """, (key, url, digest, now, now))
+
+
+def put_url(url: str, body: str):
+    """Record the latest cleaned body of a fetched page in the URL index"""
+    if not BLOB_STORE_ENABLED or not body:
+        return
+    with get_store_db() as conn:
+        _link_url(conn.cursor(), url, body, time.time())
+    _evict()
+
+
+def get_url(url: str):
+    """Latest stored cleaned body for a URL (None if not stored)"""
+    with get_store_db() as conn:
+        cursor = conn.cursor()
+        key = url_normalizer.url_key(url)
+        cursor.execute("SELECT hash FROM url_blobs WHERE url_key = ?", (key,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        cursor.execute("UPDATE url_blobs SET last_accessed = ? WHERE url_key = ?", (time.time(), key))
+        return _get(cursor, row['hash'])
+
+
+# ---------- SESSION SNAPSHOTS ----------
+
+def save_session(session_id, sources: list, duplicates: dict = None):
+    """
+    Snapshot the sources of a generated PDF (replacing any earlier snapshot).
+
+    Args:
+        session_id: Research session the PDF belongs to
+        sources: List of (url, body_html) tuples, in PDF order
+        duplicates: Optional {url: [(duplicate_url, similarity), ...]} merged into sources
+    """
+    if not BLOB_STORE_ENABLED or not sources:
+        return
+    duplicates = duplicates or {}
+    now = time.time()
+    with get_store_db() as conn:
+        cursor = conn.cursor()
+        # Take the new references before dropping the old ones, so unchanged bodies stay put
+        cursor.execute("SELECT hash FROM session_blobs WHERE session_id = ?", (session_id,))
+        previous = [row['hash'] for row in cursor.fetchall()]
+        cursor.execute("DELETE FROM session_blobs WHERE session_id = ?", (session_id,))
+        for position, (url, body) in enumerate(sources):
+            digest = _put(cursor, body)
+            also_at = [dup_url for dup_url, _ in duplicates.get(url, [])]
+            cursor.execute("""
+                INSERT INTO session_blobs (session_id, position, url, hash, also_at, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (session_id, position, url, digest, json.dumps(also_at) if also_at else None, now))
+        for digest in previous:
+            _release(cursor, digest)
+    _evict()
+
+
+def load_session(session_id, urls: list = None):
+    """
+    Stored sources of a session's PDF, for rebuilding it without network I/O.
+
+    Uses the session's snapshot; sessions without one (generated before the
+    store existed) fall back to the URL index for `urls`, whose bodies are
+    the full cleaned pages rather than the truncated ones in the PDF.
+
+    Returns:
+        (sources, duplicates, missing): sources and duplicates in the shape
+        build_html_document() takes, and the URLs with no stored body
+    """
+    with get_store_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT url, hash, also_at FROM session_blobs
+            WHERE session_id = ? ORDER BY position
+        """, (session_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            rows = []
+            for url in urls or []:
+                cursor.execute("SELECT hash FROM url_blobs WHERE url_key = ?", (url_normalizer.url_key(url),))
+                row = cursor.fetchone()
+                rows.append({'url': url, 'hash': row['hash'] if row else None, 'also_at': None})
+
+        sources, duplicates, missing = [], {}, []
+        for row in rows:
+            body = _get(cursor, row['hash']) if row['hash'] else None
+            if body is None:
+                missing.append(row['url'])
+                continue
+            sources.append((row['url'], body))
+            if row['also_at']:
+                duplicates[row['url']] = [(url, None) for url in json.loads(row['also_at'])]
+    return sources, duplicates, missing
+
+
+def has_session(session_id) -> bool:
+    with get_store_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM session_blobs WHERE session_id = ? LIMIT 1", (session_id,))
+        return cursor.fetchone() is not None
+
+
+def _release_session(cursor, session_id):
+    cursor.execute("SELECT hash FROM session_blobs WHERE session_id = ?", (session_id,))
+    for row in cursor.fetchall():
+        _release(cursor, row['hash'])
+    cursor.execute("DELETE FROM session_blobs WHERE session_id = ?", (session_id,))
+
+
+def release_session(session_id):
+    """Drop a session's snapshot (blobs still referenced elsewhere are kept)"""
+    with get_store_db() as conn:
+        _release_session(conn.cursor(), session_id)
+
+
+# ---------- EVICTION ----------
+
+def _evict():
+    """Release expired session snapshots, then LRU URL index entries while above the size cap"""
+    with get_store_db() as conn:
+        cursor = conn.cursor()
+        released = 0
+        if BLOB_STORE_SESSION_MAX_AGE_DAYS > 0:
+            cutoff = time.time() - BLOB_STORE_SESSION_MAX_AGE_DAYS * 86400
+            cursor.execute("SELECT DISTINCT session_id FROM session_blobs WHERE stored_at < ?", (cutoff,))
+            for row in cursor.fetchall():
+                _release_session(cursor, row['session_id'])
+                released += 1
+
+        evicted = 0
+        if BLOB_STORE_EVICTION == "lru":
+            cursor.execute("SELECT COALESCE(SUM(size), 0) FROM blobs")
+            total = cursor.fetchone()[0]
+            while total > BLOB_STORE_MAX_BYTES:
+                cursor.execute("SELECT url_key, hash FROM url_blobs ORDER BY last_accessed ASC LIMIT 1")
+                row = cursor.fetchone()
+                if not row:
+                    # Everything left is pinned by session snapshots
+                    break
+                cursor.execute("DELETE FROM url_blobs WHERE url_key = ?", (row['url_key'],))
+                _release(cursor, row['hash'])
+                evicted += 1
+                cursor.execute("SELECT COALESCE(SUM(size), 0) FROM blobs")
+                total = cursor.fetchone()[0]
+
+    if released or evicted:
+        print(f"Blob store: released {released} old sessions, evicted {evicted} URL entries")
+
+
+def get_store_stats():
+    """Get blob count, stored size and how much content-addressing saves"""
+    with get_store_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refcount), 0) FROM blobs")
+        blobs, size, references = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM url_blobs")
+        urls = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(DISTINCT session_id) FROM session_blobs")
+        sessions = cursor.fetchone()[0]
+    return {
+        'blobs': blobs,
+        'size_bytes': size,
+        'references': references,
+        'urls': urls,
+        'sessions': sessions
+    }
+
+
+# Initialize store on module import
+init_store()
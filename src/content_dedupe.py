@@ -0,0 +1,266 @@
+"""
+Content Dedupe Module
+Near-duplicate detection for fetched sources: syndicated or mirrored articles
+published under different URLs. Each cleaned body gets a 64-bit SimHash over
+word shingles; bodies within a few bits of each other are the same article.
+Fingerprints are kept in SQLite (data/content_index.db) so known mirrors are
+recognized in later sessions before anything is fetched.
+"""
+import sqlite3
+import os
+import re
+import time
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+import url_normalizer
+
+# Base directory for data storage
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+CONTENT_INDEX_DB = os.path.join(DATA_DIR, 'content_index.db')
+
+# Settings (override via env)
+# Max differing SimHash bits (out of 64) for two bodies to count as the same article
+DEDUPE_MAX_DISTANCE = int(os.environ.get("DEDUPE_MAX_DISTANCE", 6))
+# Bodies shorter than this many words are too short to fingerprint reliably
+DEDUPE_MIN_WORDS = int(os.environ.get("DEDUPE_MIN_WORDS", 50))
+DEDUPE_ENABLED = os.environ.get("DEDUPE_ENABLED", "1") != "0"
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+
+@contextmanager
+def get_index_db():
+    """Context manager for content index connections"""
+    conn = sqlite3.connect(CONTENT_INDEX_DB, timeout=10)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+def init_index():
+    """Initialize content index database with schema"""
+    os.makedirs(os.path.dirname(CONTENT_INDEX_DB), exist_ok=True)
+    with get_index_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS content_fingerprints (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                simhash INTEGER NOT NULL,
+                words INTEGER NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        """)
+
+        # Single row of counters
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS content_index_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                duplicates_removed INTEGER DEFAULT 0,
+                bytes_saved INTEGER DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO content_index_stats (id) VALUES (1)")
+
+
+# ---------- FINGERPRINTS ----------
+
+def _words(body_html: str) -> list:
+    text = re.sub(r'<[^>]+>', ' ', body_html or '')
+    return re.findall(r'\w+', text.lower())
+
+
+def simhash(body_html: str):
+    """
+    64-bit SimHash of a cleaned body over SHINGLE_SIZE-word shingles.
+
+    Returns (fingerprint, word count); fingerprint is None for bodies under
+    DEDUPE_MIN_WORDS words.
+    """
+    words = _words(body_html)
+    if len(words) < DEDUPE_MIN_WORDS:
+        return None, len(words)
+
+    hashes = np.array([
+        int.from_bytes(hashlib.blake2b(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8'),
+                                       digest_size=8).digest(), 'big')
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    ], dtype=np.uint64)
+    # Per bit: +1 for every shingle hash with the bit set, -1 otherwise
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(hashes)
+
+    fingerprint = 0
+    for bit in np.flatnonzero(votes > 0):
+        fingerprint |= 1 << int(bit)
+    return fingerprint, len(words)
+
+
+def distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+# ---------- INDEX ----------
+
+def record_fingerprints(fingerprints: dict):
+    """Save {url: (fingerprint, words)} in the index (fingerprints of None are skipped)"""
+    now = time.time()
+    with get_index_db() as conn:
+        cursor = conn.cursor()
+        for url, (fingerprint, words) in fingerprints.items():
+            if fingerprint is None:
+                continue
+            cursor.execute("""
+                INSERT INTO content_fingerprints (url_key, url, simhash, words, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    url = excluded.url, simhash = excluded.simhash,
+                    words = excluded.words, last_seen = excluded.last_seen
+            """, (url_normalizer.url_key(url), url, _to_signed(fingerprint), words, now, now))
+
+
+def known_fingerprints(urls: list) -> dict:
+    """{url: fingerprint} for the URLs already in the index"""
+    keys = {url_normalizer.url_key(url): url for url in urls}
+    found = {}
+    with get_index_db() as conn:
+        cursor = conn.cursor()
+        key_list = list(keys)
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            cursor.execute(f"""
+                SELECT url_key, simhash FROM content_fingerprints
+                WHERE url_key IN ({','.join('?' * len(chunk))})
+            """, chunk)
+            for row in cursor.fetchall():
+                found[keys[row['url_key']]] = _to_unsigned(row['simhash'])
+    return found
+
+
+def mark_known_duplicates(results: list) -> list:
+    """
+    Flag search results whose content is already known (from earlier
+    sessions) to duplicate a higher-ranked result in the same list.
+
+    Flagged results get 'duplicate_of' set to that result's URL; nothing is
+    removed, so the user can still pick them.
+    """
+    if not DEDUPE_ENABLED or not results:
+        return results
+    fingerprints = known_fingerprints([r['url'] for r in results])
+    seen = []  # (fingerprint, url) of earlier results
+    flagged = 0
+    for result in results:
+        fingerprint = fingerprints.get(result['url'])
+        if fingerprint is None:
+            continue
+        match = next((url for other, url in seen if distance(fingerprint, other) <= DEDUPE_MAX_DISTANCE), None)
+        if match:
+            result['duplicate_of'] = match
+            flagged += 1
+        else:
+            seen.append((fingerprint, result['url']))
+    if flagged:
+        print(f"✓ {flagged} results are known mirrors of other results")
+    return results
+
+
+# ---------- DEDUPE ----------
+
+def dedupe_sources(sources: list):
+    """
+    Collapse fetched sources whose bodies are near-duplicates.
+
+    Each group of near-duplicates is merged into one source, placed where
+    the group's first member was. The longest body wins (mirrors tend to
+    truncate) and its URL is the one shown.
+
+    Args:
+        sources: List of (url, body_html) tuples, in PDF order
+
+    Returns:
+        (unique_sources, duplicates) where duplicates maps each kept URL to
+        the list of (dropped_url, similarity) merged into it
+    """
+    fingerprints = {url: simhash(body) for url, body in sources}
+    record_fingerprints(fingerprints)
+    if not DEDUPE_ENABLED:
+        return sources, {}
+
+    groups = []  # (fingerprint, [indexes]) in order of first member
+    for i, (url, _) in enumerate(sources):
+        fingerprint = fingerprints[url][0]
+        group = None
+        # Bodies too short to fingerprint never match anything
+        if fingerprint is not None:
+            group = next((g for g in groups
+                          if g[0] is not None and distance(g[0], fingerprint) <= DEDUPE_MAX_DISTANCE), None)
+        if group is None:
+            groups.append((fingerprint, [i]))
+        else:
+            group[1].append(i)
+
+    kept = []
+    duplicates = {}
+    saved_bytes = 0
+    for _, members in groups:
+        best = max(members, key=lambda i: len(sources[i][1]))
+        url, body = sources[best]
+        kept.append((url, body))
+        merged = []
+        for i in members:
+            if i == best:
+                continue
+            other_url, other_body = sources[i]
+            similarity = 1 - distance(fingerprints[url][0], fingerprints[other_url][0]) / 64
+            merged.append((other_url, similarity))
+            saved_bytes += len(other_body.encode('utf-8'))
+        if merged:
+            duplicates[url] = merged
+
+    if duplicates:
+        removed = sum(len(m) for m in duplicates.values())
+        with get_index_db() as conn:
+            conn.cursor().execute("""
+                UPDATE content_index_stats
+                SET duplicates_removed = duplicates_removed + ?, bytes_saved = bytes_saved + ?
+                WHERE id = 1
+            """, (removed, saved_bytes))
+        print(f"✓ Merged {removed} near-duplicate sources ({saved_bytes / 1024:.0f} KB)")
+    return kept, duplicates
+
+
+def get_index_stats():
+    """Get index size and how many duplicate sources have been removed"""
+    with get_index_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT duplicates_removed, bytes_saved FROM content_index_stats WHERE id = 1")
+        stats = dict(cursor.fetchone())
+        cursor.execute("SELECT COUNT(*) FROM content_fingerprints")
+        stats['entries'] = cursor.fetchone()[0]
+    return stats
+
+
+# Initialize index on module import
+init_index()
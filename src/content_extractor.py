@@ -0,0 +1,333 @@
+"""
+Content Extractor
+Turns raw page HTML into the simplified <h3>/<p> body used in the PDF
+Selectable parser backend: BeautifulSoup (reference), lxml, or selectolax (lexbor)
+All backends walk the tree the same way, so well-formed pages give identical output
+Two modes: "all" keeps every heading/paragraph/list item, "main" keeps only the
+main article (readability-style scoring by text and link density)
+"""
+import os
+import re
+from bs4 import BeautifulSoup, NavigableString, CData, Tag
+
+try:
+    import lxml.html
+    import lxml.etree
+    _lxml_parser = lxml.html.HTMLParser(huge_tree=True)
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# "bs4", "lxml", "selectolax" or "auto" (fastest installed); see tests/benchmark_extraction.py
+EXTRACTION_BACKEND = os.environ.get("EXTRACTION_BACKEND", "bs4")
+
+# Subtrees dropped before extraction
+REMOVED_TAGS = {"script", "style", "nav", "header", "footer", "noscript", "svg", "form"}
+# Elements whose text becomes a block of the output
+BLOCK_TAGS = ("h1", "h2", "h3", "p", "li")
+
+# "all" (every block) or "main" (main article only)
+EXTRACTION_MODE = os.environ.get("EXTRACTION_MODE", "all")
+
+
+def available_backends() -> list:
+    """Backends usable in this environment, reference (bs4) first"""
+    backends = ["bs4"]
+    if lxml is not None:
+        backends.append("lxml")
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    return backends
+
+
+def resolve_backend(backend: str = None) -> str:
+    """Pick the requested backend, falling back to bs4 if it isn't installed"""
+    backend = (backend or EXTRACTION_BACKEND).lower()
+    if backend == "auto":
+        return available_backends()[-1]
+    if backend not in available_backends():
+        if backend != "bs4":
+            print(f"Extraction backend '{backend}' not installed, using bs4")
+        return "bs4"
+    return backend
+
+
+# ---------- BACKENDS ----------
+# Each backend yields a node's children as (tag, item) pairs in document order:
+# ("-text", string) for text, (lowercase tag name, node) for elements.
+# Comments and processing instructions are skipped.
+
+def _bs4_root(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    # Remove script/style/nav/footer, etc.
+    for tag in soup(list(REMOVED_TAGS)):
+        tag.decompose()
+    return soup
+
+
+def _bs4_blocks(html: str) -> list:
+    # Basic heuristic: join all <p> and <h1-3> text
+    blocks = []
+    for el in _bs4_root(html).find_all(list(BLOCK_TAGS)):
+        text = el.get_text(" ", strip=True)
+        if text:
+            blocks.append((el.name, text))
+    return blocks
+
+
+def _lxml_children(el):
+    if el.text:
+        yield "-text", el.text
+    for child in el:
+        if isinstance(child.tag, str):
+            yield child.tag.lower(), child
+        if child.tail:
+            yield "-text", child.tail
+
+
+def _lxml_root(html: str):
+    try:
+        # huge_tree lifts libxml2's 256-level nesting limit (to 2048)
+        return lxml.html.document_fromstring(html, parser=_lxml_parser)
+    except lxml.etree.ParserError:
+        # Empty document
+        return None
+
+
+def _selectolax_children(node):
+    for child in node.iter(include_text=True):
+        if child.tag == "-text":
+            yield "-text", child.text_content
+        elif not child.tag.startswith("-"):
+            yield child.tag, child
+
+
+def _selectolax_root(html: str):
+    return LexborHTMLParser(html).root
+
+
+def _walk_blocks(root, children) -> list:
+    """Shared tree walk for the lxml and selectolax backends (mirrors _bs4_blocks)"""
+    blocks = []
+
+    def texts(node):
+        for tag, item in children(node):
+            if tag == "-text":
+                yield item
+            elif tag not in REMOVED_TAGS:
+                yield from texts(item)
+
+    def walk(node):
+        for tag, item in children(node):
+            if tag == "-text" or tag in REMOVED_TAGS:
+                continue
+            if tag in BLOCK_TAGS:
+                text = " ".join(s for s in (t.strip() for t in texts(item)) if s)
+                if text:
+                    blocks.append((tag, text))
+            walk(item)
+
+    if root is not None:
+        walk(root)
+    return blocks
+
+
+# ---------- MAIN-CONTENT (READABILITY-STYLE) MODE ----------
+# Extra subtrees that are never main content
+BOILERPLATE_TAGS = {"aside", "iframe", "button", "select", "dialog", "menu", "template"}
+# class/id hints (readability-style)
+NEGATIVE_HINTS = re.compile(
+    r'comment|related|sidebar|share|social|cookie|consent|banner|promo|advert|sponsor|'
+    r'subscribe|newsletter|popup|modal|breadcrumb|pagination|widget|footer|masthead|menu|nav', re.I)
+POSITIVE_HINTS = re.compile(r'article|content|main|post|entry|story|body|text|blog', re.I)
+# Container bonus by tag
+TAG_WEIGHTS = {"article": 25, "main": 25, "div": 5, "section": 5, "td": 3, "blockquote": 3,
+               "ul": -3, "ol": -3, "li": -3, "table": -3}
+# Paragraphs shorter than this don't vote for their container
+MAIN_MIN_PARAGRAPH_CHARS = 25
+# Blocks (and containers) that are mostly link text are navigation, not content
+MAIN_MAX_LINK_DENSITY = 0.5
+# Siblings of the best container are kept if they score at least this fraction of it
+MAIN_SIBLING_THRESHOLD = 0.2
+
+
+def _bs4_children(node):
+    for child in node.children:
+        if isinstance(child, Tag):
+            yield child.name, child
+        elif type(child) in (NavigableString, CData):
+            yield "-text", str(child)
+
+
+def _bs4_attrs(node) -> str:
+    return " ".join(node.get("class") or []) + " " + (node.get("id") or "")
+
+
+def _lxml_attrs(el) -> str:
+    return (el.get("class") or "") + " " + (el.get("id") or "")
+
+
+def _selectolax_attrs(node) -> str:
+    attributes = node.attributes
+    return (attributes.get("class") or "") + " " + (attributes.get("id") or "")
+
+
+def _is_boilerplate(tag: str, hints: str) -> bool:
+    if tag in BOILERPLATE_TAGS:
+        return True
+    if tag in ("html", "body", "article", "main") or not hints.strip():
+        return False
+    return bool(NEGATIVE_HINTS.search(hints)) and not POSITIVE_HINTS.search(hints)
+
+
+def _main_blocks(root, children, attrs) -> list:
+    """
+    Keep only the blocks of the main article.
+
+    Every paragraph votes for its parent (full score) and grandparent (half)
+    with 1 point, +1 per comma and +1 per 100 chars (max 3). Containers get
+    a tag and class/id bonus, then are scaled by (1 - link density). Blocks
+    under the best container, or under siblings scoring at least
+    MAIN_SIBLING_THRESHOLD of it, are kept unless they are mostly links.
+    Falls back to every block when nothing can be scored.
+    """
+    blocks = []      # (tag, text, link_chars, ancestor ids incl. own id)
+    containers = {}  # id -> (tag, parent id, bonus)
+
+    def texts(node):
+        # (text, inside a link) pairs in document order; an explicit stack, not
+        # recursion, so pathologically deep pages can't hit the recursion limit
+        stack = [(children(node), False)]
+        while stack:
+            items, in_link = stack[-1]
+            for tag, item in items:
+                if tag == "-text":
+                    yield item, in_link
+                elif tag not in REMOVED_TAGS:
+                    stack.append((children(item), in_link or tag == "a"))
+                    break
+            else:
+                stack.pop()
+
+    if root is None:
+        return []
+    stack = [(children(root), ())]
+    while stack:
+        items, ancestors = stack[-1]
+        for tag, item in items:
+            if tag == "-text" or tag in REMOVED_TAGS:
+                continue
+            hints = attrs(item)
+            if _is_boilerplate(tag, hints):
+                continue
+
+            node_id = len(containers) + 1
+            bonus = TAG_WEIGHTS.get(tag, 0)
+            if NEGATIVE_HINTS.search(hints):
+                bonus -= 25
+            if POSITIVE_HINTS.search(hints):
+                bonus += 25
+            containers[node_id] = (tag, ancestors[-1] if ancestors else None, bonus)
+            path = ancestors + (node_id,)
+
+            if tag in BLOCK_TAGS:
+                pieces = [(t.strip(), link) for t, link in texts(item)]
+                text = " ".join(t for t, _ in pieces if t)
+                if text:
+                    link_chars = sum(len(t) for t, link in pieces if t and link)
+                    blocks.append((tag, text, link_chars, path))
+            stack.append((children(item), path))
+            break
+        else:
+            stack.pop()
+
+    # Text and link totals per container, and paragraph votes
+    text_chars, link_chars, votes = {}, {}, {}
+    for tag, text, links, path in blocks:
+        for ancestor in path[:-1]:
+            text_chars[ancestor] = text_chars.get(ancestor, 0) + len(text)
+            link_chars[ancestor] = link_chars.get(ancestor, 0) + links
+        if tag != "p" or len(text) < MAIN_MIN_PARAGRAPH_CHARS or len(path) < 2:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        votes[path[-2]] = votes.get(path[-2], 0) + score
+        if len(path) >= 3:
+            votes[path[-3]] = votes.get(path[-3], 0) + score / 2
+
+    if not votes:
+        return [(tag, text) for tag, text, _, _ in blocks]
+
+    scores = {}
+    for node_id, vote in votes.items():
+        density = link_chars.get(node_id, 0) / max(text_chars.get(node_id, 0), 1)
+        scores[node_id] = (vote + containers[node_id][2]) * (1 - density)
+
+    top = max(scores, key=scores.get)
+    threshold = max(10, scores[top] * MAIN_SIBLING_THRESHOLD)
+    parent = containers[top][1]
+    selected = {top} | {node_id for node_id, score in scores.items()
+                        if node_id != top and containers[node_id][1] == parent and score >= threshold}
+
+    kept = [(tag, text) for tag, text, links, path in blocks
+            if selected.intersection(path) and links / len(text) <= MAIN_MAX_LINK_DENSITY]
+    return kept or [(tag, text) for tag, text, _, _ in blocks]
+
+
+def extract_blocks(html: str, backend: str = None, mode: str = None) -> list:
+    """
+    Extract (tag, text) blocks for every h1-h3/p/li outside removed subtrees.
+
+    Args:
+        html: Raw page HTML
+        backend: "bs4", "lxml", "selectolax" or "auto" (default EXTRACTION_BACKEND)
+        mode: "all" or "main" (default EXTRACTION_MODE)
+
+    Returns:
+        List of (tag, text) tuples in document order
+    """
+    backend = resolve_backend(backend)
+    main = resolve_mode(mode) == "main"
+    if backend == "bs4":
+        if main:
+            return _main_blocks(BeautifulSoup(html, "html.parser"), _bs4_children, _bs4_attrs)
+        return _bs4_blocks(html)
+
+    try:
+        if backend == "lxml":
+            root, children, attrs = _lxml_root(html), _lxml_children, _lxml_attrs
+        else:
+            root, children, attrs = _selectolax_root(html), _selectolax_children, _selectolax_attrs
+        blocks = _main_blocks(root, children, attrs) if main else _walk_blocks(root, children)
+        if not blocks and backend == "lxml" and root is not None and not root.text_content().strip():
+            # libxml2 silently drops everything nested deeper than its limit
+            raise ValueError("document nested too deeply")
+        return blocks
+    except (ValueError, RecursionError) as e:
+        # e.g. XML encoding declarations (lxml) or pathologically deep nesting
+        print(f"Extraction with {backend} failed ({e}), using bs4")
+        return extract_blocks(html, "bs4", mode)
+
+
+def resolve_mode(mode: str = None) -> str:
+    mode = (mode or EXTRACTION_MODE).lower()
+    return mode if mode in ("all", "main") else "all"
+
+
+def render_blocks(blocks: list) -> str:
+    """Render (tag, text) blocks as the <h3>/<p> body used in the PDF"""
+    parts = []
+    for tag, text in blocks:
+        if tag.startswith("h"):
+            parts.append(f"<h3>{text}</h3>")
+        else:
+            parts.append(f"<p>{text}</p>")
+    return "\n".join(parts)
+
+
+def extract_content(html: str, backend: str = None, mode: str = None) -> str:
+    """Turn raw page HTML into the simplified <h3>/<p> body (not truncated)"""
+    return render_blocks(extract_blocks(html, backend, mode))
@@ -7,10 +7,12 @@ from datetime import datetime
 from contextlib import contextmanager
 import json
 import os
+import url_normalizer
 
 # Base directory for data storage
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, 'data', 'research_memory.db')
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+DB_PATH = os.path.join(DATA_DIR, 'research_memory.db')
 
 @contextmanager
 def get_db():
@@ -28,6 +30,7 @@ def get_db():
 
 def init_database():
     """Initialize database with schema"""
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -81,6 +84,23 @@ def init_database():
             )
         """)
 
+        # URL key (url_normalizer.url_key()) and alias set were added later; migrate older databases
+        cursor.execute("PRAGMA table_info(sources)")
+        columns = [col[1] for col in cursor.fetchall()]
+        if 'canonical_url' in columns:
+            # The column first shipped under a misleading name; it always held url_key()
+            cursor.execute("DROP INDEX IF EXISTS idx_sources_canonical")
+            cursor.execute("ALTER TABLE sources RENAME COLUMN canonical_url TO url_key")
+            print("✓ Renamed 'canonical_url' column to 'url_key' in sources table")
+        elif 'url_key' not in columns:
+            cursor.execute("ALTER TABLE sources ADD COLUMN url_key TEXT")
+            cursor.execute("ALTER TABLE sources ADD COLUMN aliases TEXT")
+            cursor.execute("SELECT id, url FROM sources")
+            for row in cursor.fetchall():
+                cursor.execute("UPDATE sources SET url_key = ? WHERE id = ?",
+                               (url_normalizer.url_key(row['url']), row['id']))
+            print("✓ Added 'url_key' and 'aliases' columns to sources table")
+
         # Create indexes for fast queries
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_sessions_topic
@@ -98,6 +118,10 @@ def init_database():
             CREATE INDEX IF NOT EXISTS idx_sources_selected
             ON sources(selected)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sources_url_key
+            ON sources(session_id, url_key)
+        """)
 
         print("✓ Database initialized successfully")
 
@@ -127,26 +151,53 @@ def save_queries(session_id, queries, selected_queries=None):
             """, (session_id, query, query in selected_queries))
 
 def save_sources(session_id, sources, selected_urls=None):
-    """Save found sources for a session"""
+    """
+    Save found sources for a session.
+
+    Sources are keyed by url_normalizer.url_key(): saving the
+    same page again (e.g. with the final selection) updates its row, and
+    every URL variant seen for it is recorded in its alias set.
+    """
     if selected_urls is None:
         selected_urls = []
+    selected_keys = {url_normalizer.url_key(url) for url in selected_urls}
 
     with get_db() as conn:
         cursor = conn.cursor()
         for source in sources:
+            url = source.get('url')
+            key = url_normalizer.url_key(url)
             cursor.execute("""
-                INSERT INTO sources
-                (session_id, url, title, query_source, ai_score, score_reasoning, selected)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                session_id,
-                source.get('url'),
+                SELECT id, aliases FROM sources WHERE session_id = ? AND url_key = ?
+            """, (session_id, key))
+            existing = cursor.fetchone()
+
+            aliases = json.loads(existing['aliases'] or '[]') if existing else []
+            for alias in source.get('aliases') or []:
+                if alias not in aliases:
+                    aliases.append(alias)
+
+            values = (
                 source.get('title'),
                 source.get('query'),
                 source.get('relevance_score'),
                 source.get('score_reasoning'),
-                source.get('url') in selected_urls
-            ))
+                key in selected_keys,
+                json.dumps(aliases) if aliases else None
+            )
+            if existing:
+                cursor.execute("""
+                    UPDATE sources
+                    SET title = ?, query_source = ?, ai_score = ?, score_reasoning = ?, selected = ?, aliases = ?
+                    WHERE id = ?
+                """, values + (existing['id'],))
+            else:
+                cursor.execute("""
+                    INSERT INTO sources
+                    (title, query_source, ai_score, score_reasoning, selected, aliases,
+                     session_id, url, url_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, values + (session_id, url, key))
 
 def mark_session_complete(session_id):
     """Mark a session as completed"""
@@ -230,7 +281,7 @@ def get_favorite_sources(min_selections=2):
                 SUM(selected) as times_selected,
                 AVG(ai_score) as avg_score
             FROM sources
-            GROUP BY url
+            GROUP BY COALESCE(url_key, url)
             HAVING times_selected >= ?
             ORDER BY times_selected DESC, avg_score DESC
             LIMIT 20
@@ -0,0 +1,117 @@
+"""
+Embedding Cache Module
+Disk-backed cache of text embeddings (SQLite under data/), keyed by model + text hash
+Re-seen titles/URLs cost nothing to embed again
+"""
+import sqlite3
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+
+# Base directory for data storage
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+EMBEDDING_CACHE_DB = os.path.join(DATA_DIR, 'embedding_cache.db')
+
+# Least recently used embeddings are evicted above this many entries
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", 200000))
+
+
+@contextmanager
+def get_cache_db():
+    """Context manager for embedding cache connections"""
+    conn = sqlite3.connect(EMBEDDING_CACHE_DB, timeout=10)
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+def init_cache():
+    """Initialize embedding cache database with schema"""
+    os.makedirs(os.path.dirname(EMBEDDING_CACHE_DB), exist_ok=True)
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_embeddings_accessed
+            ON embeddings(last_accessed)
+        """)
+
+
+def _key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode('utf-8')).hexdigest()
+
+
+def get_embeddings(model: str, texts: list) -> dict:
+    """Return {text: np.ndarray} for every text that is already cached"""
+    if not texts:
+        return {}
+
+    keys = {_key(model, t): t for t in texts}
+    found = {}
+
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        key_list = list(keys)
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            cursor.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for key, blob in cursor.fetchall():
+                found[keys[key]] = np.frombuffer(blob, dtype=np.float32)
+
+        if found:
+            now = time.time()
+            cursor.executemany("UPDATE embeddings SET last_accessed = ? WHERE key = ?",
+                               [(now, _key(model, t)) for t in found])
+
+    return found
+
+
+def save_embeddings(model: str, embeddings: dict):
+    """Store {text: vector} and evict least recently used entries above the size cap"""
+    if not embeddings:
+        return
+
+    now = time.time()
+    rows = [
+        (_key(model, text), model, np.asarray(vector, dtype=np.float32).tobytes(), now)
+        for text, vector in embeddings.items()
+    ]
+
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO embeddings (key, model, vector, last_accessed)
+            VALUES (?, ?, ?, ?)
+        """, rows)
+
+        cursor.execute("SELECT COUNT(*) FROM embeddings")
+        overflow = cursor.fetchone()[0] - EMBEDDING_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            cursor.execute("""
+                DELETE FROM embeddings WHERE key IN (
+                    SELECT key FROM embeddings ORDER BY last_accessed ASC LIMIT ?
+                )
+            """, (overflow,))
+
+
+# Initialize cache on module import
+init_cache()
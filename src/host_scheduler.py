@@ -0,0 +1,161 @@
+"""
+Host Scheduler
+Per-domain politeness for page fetching: concurrency cap and minimum delay
+between requests to the same host, a circuit breaker that fast-fails hosts
+after repeated timeouts, and timeouts adapted to each host's latency history
+"""
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Politeness (override via env)
+HOST_MAX_CONCURRENCY = int(os.environ.get("FETCH_PER_HOST_CONCURRENCY", 2))
+HOST_MIN_DELAY_SECONDS = float(os.environ.get("FETCH_HOST_MIN_DELAY", 0.25))
+
+# Circuit breaker: this many failures within the window opens the circuit for the cooldown
+BREAKER_FAILURES = int(os.environ.get("FETCH_BREAKER_FAILURES", 3))
+BREAKER_WINDOW_SECONDS = float(os.environ.get("FETCH_BREAKER_WINDOW", 60))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get("FETCH_BREAKER_COOLDOWN", 120))
+
+# Adaptive timeouts: p95 of recent latencies x multiplier, clamped to [min, max]
+TIMEOUT_MAX_SECONDS = float(os.environ.get("FETCH_TIMEOUT_SECONDS", 15))
+TIMEOUT_MIN_SECONDS = float(os.environ.get("FETCH_TIMEOUT_MIN_SECONDS", 4))
+TIMEOUT_MULTIPLIER = float(os.environ.get("FETCH_TIMEOUT_MULTIPLIER", 3))
+TIMEOUT_MIN_SAMPLES = 3
+
+
+class HostUnavailable(Exception):
+    """The host's circuit breaker is open"""
+
+
+class _Host:
+    def __init__(self, max_concurrency: int):
+        self.semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.next_start = 0.0
+        self.latencies = deque(maxlen=50)
+        self.failures = deque()
+        self.open_until = 0.0
+        self.trial_running = False
+
+
+class HostScheduler:
+    """
+    Hands out fetch slots per host.
+
+    Usage:
+        with scheduler.slot(url) as timeout:
+            ... download with `timeout` ...
+
+    Exceptions of `failure_types` raised inside the block (timeouts,
+    connection errors) count towards the host's circuit breaker; a block that
+    completes records its latency. Any other exception (e.g. an HTTP 404)
+    means the host answered and counts as neither.
+    """
+
+    def __init__(self, failure_types: tuple = (TimeoutError, ConnectionError),
+                 max_concurrency: int = None, min_delay: float = None):
+        self.failure_types = failure_types
+        self.max_concurrency = HOST_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+        self.min_delay = HOST_MIN_DELAY_SECONDS if min_delay is None else min_delay
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        return (urlsplit(url or '').hostname or '').lower()
+
+    def _host(self, host: str) -> _Host:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _Host(self.max_concurrency)
+            return self._hosts[host]
+
+    def timeout_for(self, host: str) -> float:
+        """Adaptive timeout for a host (TIMEOUT_MAX_SECONDS until it has history)"""
+        state = self._host(host)
+        with self._lock:
+            samples = sorted(state.latencies)
+        if len(samples) < TIMEOUT_MIN_SAMPLES:
+            return TIMEOUT_MAX_SECONDS
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return min(TIMEOUT_MAX_SECONDS, max(TIMEOUT_MIN_SECONDS, p95 * TIMEOUT_MULTIPLIER))
+
+    def _check_breaker(self, host: str, state: _Host):
+        """Raise HostUnavailable while the circuit is open; let one trial through after the cooldown"""
+        with self._lock:
+            now = time.time()
+            if state.open_until == 0.0:
+                return False
+            if now < state.open_until or state.trial_running:
+                raise HostUnavailable(f"{host} is failing, skipping for {max(state.open_until - now, 0):.0f}s")
+            state.trial_running = True
+            return True
+
+    def _wait_turn(self, state: _Host):
+        """Space request starts to the same host at least min_delay apart"""
+        with self._lock:
+            now = time.time()
+            start = max(now, state.next_start)
+            state.next_start = start + self.min_delay
+        if start > now:
+            time.sleep(start - now)
+
+    @contextmanager
+    def slot(self, url: str):
+        host = self.host_key(url)
+        state = self._host(host)
+        trial = False
+
+        try:
+            with state.semaphore:
+                # Checked after queueing for the host, so waiters fail fast once it trips
+                trial = self._check_breaker(host, state)
+                self._wait_turn(state)
+                started = time.time()
+                try:
+                    yield self.timeout_for(host)
+                except self.failure_types:
+                    self._record_failure(host, state)
+                    raise
+                self._record_success(state, time.time() - started)
+        finally:
+            if trial:
+                with self._lock:
+                    state.trial_running = False
+
+    def _record_success(self, state: _Host, seconds: float):
+        with self._lock:
+            state.latencies.append(seconds)
+            state.failures.clear()
+            state.open_until = 0.0
+
+    def _record_failure(self, host: str, state: _Host):
+        with self._lock:
+            now = time.time()
+            state.failures.append(now)
+            while state.failures and state.failures[0] < now - BREAKER_WINDOW_SECONDS:
+                state.failures.popleft()
+            # A failed half-open trial re-opens the circuit straight away
+            if len(state.failures) >= BREAKER_FAILURES or state.open_until:
+                state.open_until = now + BREAKER_COOLDOWN_SECONDS
+                print(f"Circuit open for {host}: {len(state.failures)} failures in "
+                      f"{BREAKER_WINDOW_SECONDS:.0f}s, skipping it for {BREAKER_COOLDOWN_SECONDS:.0f}s")
+
+    def get_stats(self) -> dict:
+        """Per-host state for monitoring: circuit, recent failures, latency and current timeout"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        now = time.time()
+        stats = {}
+        for host, state in hosts.items():
+            samples = sorted(state.latencies)
+            stats[host] = {
+                'circuit': 'open' if state.open_until > now else ('half-open' if state.open_until else 'closed'),
+                'recent_failures': len(state.failures),
+                'median_latency': samples[len(samples) // 2] if samples else None,
+                'timeout': self.timeout_for(host)
+            }
+        return stats
@@ -0,0 +1,197 @@
+"""
+Local Relevance Scorer
+Zero-cost ranking of search results without any network calls:
+BM25 over title + URL tokens against the topic and queries, plus domain priors
+Produces the same 0-100 relevance scores as the AI scorer
+"""
+import re
+from urllib.parse import urlsplit
+import numpy as np
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Topic terms count more than terms that only appear in generated queries
+TOPIC_TERM_WEIGHT = 2.0
+QUERY_TERM_WEIGHT = 0.5
+
+# Score = BASE + RELEVANCE_POINTS * lexical relevance (0-1) + domain prior
+BASE_SCORE = 35
+RELEVANCE_POINTS = 45
+
+# Domain priors (points). Checked against the host, most specific first.
+DOMAIN_PRIORS = {
+    "arxiv.org": 20,
+    "nature.com": 18,
+    "acm.org": 18,
+    "ieee.org": 18,
+    "sciencedirect.com": 15,
+    "springer.com": 15,
+    "ncbi.nlm.nih.gov": 18,
+    "wikipedia.org": 12,
+    "github.com": 10,
+    "readthedocs.io": 15,
+    "stackoverflow.com": 5,
+    "medium.com": 0,
+    "towardsdatascience.com": 3,
+    "reddit.com": -5,
+    "quora.com": -15,
+    "pinterest.com": -25,
+    "facebook.com": -20,
+    "instagram.com": -25,
+    "tiktok.com": -25,
+    "amazon.com": -15,
+    "ebay.com": -20,
+}
+
+# Top-level domain priors, used when no specific domain matches
+TLD_PRIORS = {
+    "edu": 18,
+    "gov": 15,
+    "ac.uk": 15,
+    "org": 4,
+}
+
+# Host prefixes that usually mean official documentation
+DOCS_PREFIXES = ("docs.", "developer.", "developers.", "learn.", "doc.")
+DOCS_PRIOR = 12
+
+# Title patterns typical of listicles, ads and SEO content
+LOW_QUALITY_PATTERNS = [
+    (re.compile(r'\b(top|best)\s+\d+\b', re.I), -10),
+    (re.compile(r'\b(buy|cheap|discount|deal|coupon|sale)\b', re.I), -15),
+    (re.compile(r'\b(you won\'?t believe|shocking|hack)\b', re.I), -10),
+]
+
+# High-signal title/path words for in-depth content
+DEPTH_PATTERNS = [
+    (re.compile(r'\b(guide|tutorial|documentation|introduction|overview|paper|survey|handbook|reference)\b', re.I), 5),
+]
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "what", "with", "www", "com", "org", "net",
+    "http", "https", "html", "htm", "php", "index", "amp",
+}
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens, splitting URL punctuation, dropping stopwords and 1-char tokens"""
+    tokens = re.findall(r'[a-z0-9]+', (text or '').lower())
+    return [t for t in tokens if len(t) > 1 and t not in STOPWORDS]
+
+
+def _result_tokens(result: dict) -> list:
+    parts = urlsplit(result.get('url', ''))
+    return tokenize(result.get('title', '')) + tokenize(parts.hostname or '') + tokenize(parts.path)
+
+
+def domain_prior(url: str):
+    """Prior points for a URL's domain, with a short label explaining it"""
+    host = (urlsplit(url or '').hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+
+    for domain, points in DOMAIN_PRIORS.items():
+        if host == domain or host.endswith('.' + domain):
+            return points, domain
+
+    if host.startswith(DOCS_PREFIXES):
+        return DOCS_PRIOR, "docs site"
+
+    for tld, points in TLD_PRIORS.items():
+        if host.endswith('.' + tld):
+            return points, f".{tld}"
+
+    return 0, None
+
+
+def title_prior(title: str) -> int:
+    """Prior points from listicle/spam vs. depth patterns in the title"""
+    points = 0
+    for pattern, value in LOW_QUALITY_PATTERNS + DEPTH_PATTERNS:
+        if pattern.search(title or ''):
+            points += value
+    return points
+
+
+def lexical_relevance(topic: str, results: list, queries: list = None):
+    """
+    Vectorized BM25 + topic-term coverage for all results at once.
+
+    Returns (relevance, coverage) arrays of shape (len(results),), both in 0-1.
+    """
+    topic_terms = list(dict.fromkeys(tokenize(topic)))
+    query_terms = [t for q in (queries or []) for t in tokenize(q) if t not in topic_terms]
+    terms = topic_terms + list(dict.fromkeys(query_terms))
+    if not terms or not results:
+        zeros = np.zeros(len(results))
+        return zeros, zeros
+
+    term_index = {t: i for i, t in enumerate(terms)}
+    weights = np.array([TOPIC_TERM_WEIGHT] * len(topic_terms) +
+                       [QUERY_TERM_WEIGHT] * (len(terms) - len(topic_terms)))
+
+    # Term frequency matrix: results x terms
+    tf = np.zeros((len(results), len(terms)))
+    doc_lengths = np.zeros(len(results))
+    for row, result in enumerate(results):
+        tokens = _result_tokens(result)
+        doc_lengths[row] = len(tokens)
+        for token in tokens:
+            col = term_index.get(token)
+            if col is not None:
+                tf[row, col] += 1
+
+    n_docs = len(results)
+    doc_freq = (tf > 0).sum(axis=0)
+    idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    avg_length = max(doc_lengths.mean(), 1.0)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avg_length)
+    bm25 = ((tf * (BM25_K1 + 1)) / (tf + norm[:, None]) * idf * weights).sum(axis=1)
+
+    # Best possible score: every term present once in an average-length document
+    best = (idf * weights).sum()
+    bm25_relative = np.clip(bm25 / best, 0, 1) if best > 0 else np.zeros(n_docs)
+
+    if topic_terms:
+        coverage = (tf[:, :len(topic_terms)] > 0).mean(axis=1)
+    else:
+        coverage = np.zeros(n_docs)
+
+    return 0.6 * coverage + 0.4 * bm25_relative, coverage
+
+
+def score_results_local(topic: str, results: list, queries: list = None) -> list:
+    """
+    Score search results locally (no network).
+
+    Args:
+        topic: Research topic
+        results: List of search results with 'title' and 'url'
+        queries: Generated search queries (extra, lower-weight match terms)
+
+    Returns:
+        List of {"score", "reasoning"} dicts aligned with `results`
+    """
+    if not results:
+        return []
+
+    relevance, coverage = lexical_relevance(topic, results, queries)
+    priors = [domain_prior(r.get('url', '')) for r in results]
+    title_points = np.array([title_prior(r.get('title', '')) for r in results])
+    domain_points = np.array([p for p, _ in priors])
+
+    scores = np.clip(np.rint(BASE_SCORE + RELEVANCE_POINTS * relevance + domain_points + title_points), 0, 100)
+
+    scored = []
+    for i, (points, label) in enumerate(priors):
+        reasoning = f"Local score: topic match {coverage[i]:.0%}"
+        if label:
+            reasoning += f", {label} {points:+d}"
+        if title_points[i]:
+            reasoning += f", title {int(title_points[i]):+d}"
+        scored.append({"score": int(scores[i]), "reasoning": reasoning})
+    return scored
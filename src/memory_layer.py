@@ -12,7 +12,7 @@ import sqlite3
 
 # Base directory for data storage
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, 'data')
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
 
 # Mem0 usage tracking database
 TRACKING_DB = os.path.join(DATA_DIR, 'mem0_usage_tracking.db')
@@ -0,0 +1,256 @@
+"""
+Page Cache Module
+Disk-backed cache of fetched pages (SQLite under data/), keyed by canonical URL
+Stores the raw response and the cleaned content zlib-compressed, revalidates
+stale entries with ETag / Last-Modified, and evicts least recently used pages
+above a total size cap
+"""
+import sqlite3
+import os
+import time
+import zlib
+from contextlib import contextmanager
+import url_normalizer
+
+# Base directory for data storage
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+PAGE_CACHE_DB = os.path.join(DATA_DIR, 'page_cache.db')
+
+# Cache settings (override via env)
+# Pages younger than the TTL are served without any network request;
+# older ones are revalidated (or refetched if the server gave no validators)
+PAGE_CACHE_TTL_SECONDS = int(os.environ.get("PAGE_CACHE_TTL_SECONDS", 3 * 24 * 3600))
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") != "0"
+
+
+@contextmanager
+def get_cache_db():
+    """Context manager for page cache connections"""
+    conn = sqlite3.connect(PAGE_CACHE_DB, timeout=10)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+def init_cache():
+    """Initialize page cache database with schema"""
+    os.makedirs(os.path.dirname(PAGE_CACHE_DB), exist_ok=True)
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS page_cache (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                raw BLOB,
+                content BLOB NOT NULL,
+                main_content BLOB,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+
+        # Main-content extraction was added later; migrate older databases
+        cursor.execute("PRAGMA table_info(page_cache)")
+        if 'main_content' not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE page_cache ADD COLUMN main_content BLOB")
+
+        # Keys used to include the scheme; re-key older entries to url_normalizer.url_key()
+        cursor.execute("SELECT url_key, url FROM page_cache WHERE url_key LIKE '%://%'")
+        for row in cursor.fetchall():
+            cursor.execute("UPDATE OR REPLACE page_cache SET url_key = ? WHERE url_key = ?",
+                           (url_normalizer.url_key(row['url']), row['url_key']))
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_page_cache_accessed
+            ON page_cache(last_accessed)
+        """)
+
+        # Single row of counters
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS page_cache_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hits INTEGER DEFAULT 0,
+                revalidated INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0,
+                evictions INTEGER DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO page_cache_stats (id) VALUES (1)")
+
+
+def _compress(text: str) -> bytes:
+    return zlib.compress((text or '').encode('utf-8'), 6)
+
+
+def _decompress(blob: bytes) -> str:
+    return zlib.decompress(blob).decode('utf-8') if blob else ''
+
+
+def _bump_stat(cursor, column, amount=1):
+    cursor.execute(f"UPDATE page_cache_stats SET {column} = {column} + ? WHERE id = 1", (amount,))
+
+
+def get_page(url: str):
+    """
+    Look up a cached page.
+
+    Returns None on a miss, otherwise a dict with "content" (cleaned, not
+    truncated), "main_content" (main-article extraction, or None if it
+    hasn't been computed yet), "etag", "last_modified", "age" (seconds since it was fetched
+    or last revalidated) and "fresh" (younger than PAGE_CACHE_TTL_SECONDS).
+    Fresh lookups count as hits; a stale entry counts as revalidated
+    (mark_revalidated()) or, once it is refetched (save_page()), a miss.
+    """
+    now = time.time()
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT etag, last_modified, content, main_content, fetched_at FROM page_cache WHERE url_key = ?
+        """, (url_normalizer.url_key(url),))
+        row = cursor.fetchone()
+
+        if row is None:
+            _bump_stat(cursor, 'misses')
+            return None
+
+        age = now - row['fetched_at']
+        fresh = age < PAGE_CACHE_TTL_SECONDS
+        cursor.execute("UPDATE page_cache SET last_accessed = ? WHERE url_key = ?",
+                       (now, url_normalizer.url_key(url)))
+        if fresh:
+            _bump_stat(cursor, 'hits')
+
+    return {
+        'content': _decompress(row['content']),
+        'main_content': _decompress(row['main_content']) if row['main_content'] is not None else None,
+        'etag': row['etag'],
+        'last_modified': row['last_modified'],
+        'age': age,
+        'fresh': fresh
+    }
+
+
+def get_raw(url: str):
+    """Raw response body of a cached page (or None)"""
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT raw FROM page_cache WHERE url_key = ?", (url_normalizer.url_key(url),))
+        row = cursor.fetchone()
+    return _decompress(row['raw']) if row and row['raw'] else None
+
+
+def iter_raw_pages(limit: int = None):
+    """Yield (url, raw body) for cached pages, most recently used first"""
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT url, raw FROM page_cache WHERE raw IS NOT NULL
+            ORDER BY last_accessed DESC LIMIT ?
+        """, (limit if limit else -1,))
+        rows = cursor.fetchall()
+    for row in rows:
+        yield row['url'], _decompress(row['raw'])
+
+
+def mark_revalidated(url: str):
+    """The server answered 304 Not Modified: restart the entry's TTL"""
+    now = time.time()
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE page_cache SET fetched_at = ?, last_accessed = ? WHERE url_key = ?",
+                       (now, now, url_normalizer.url_key(url)))
+        _bump_stat(cursor, 'revalidated')
+
+
+def save_page(url: str, raw: str, content: str, etag: str = None, last_modified: str = None,
+              main_content: str = None):
+    """Store a freshly fetched page and evict least recently used pages above the size cap"""
+    now = time.time()
+    raw_blob = _compress(raw)
+    content_blob = _compress(content)
+    main_blob = _compress(main_content) if main_content is not None else None
+
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        # Replacing a stale entry: the lookup that found it wasn't counted yet
+        cursor.execute("SELECT 1 FROM page_cache WHERE url_key = ?", (url_normalizer.url_key(url),))
+        if cursor.fetchone():
+            _bump_stat(cursor, 'misses')
+
+        cursor.execute("""
+            INSERT OR REPLACE INTO page_cache
+            (url_key, url, etag, last_modified, raw, content, main_content, size, fetched_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (url_normalizer.url_key(url), url, etag, last_modified, raw_blob, content_blob, main_blob,
+              len(raw_blob) + len(content_blob) + len(main_blob or b''), now, now))
+
+        _evict(cursor)
+
+
+def save_main_content(url: str, main_content: str):
+    """Add the main-article extraction to an already cached page"""
+    main_blob = _compress(main_content)
+    with get_cache_db() as conn:
+        conn.cursor().execute("""
+            UPDATE page_cache SET main_content = ?, size = size + ? WHERE url_key = ? AND main_content IS NULL
+        """, (main_blob, len(main_blob), url_normalizer.url_key(url)))
+
+
+def _evict(cursor):
+    """Drop least recently used pages until the cache fits in PAGE_CACHE_MAX_BYTES"""
+    cursor.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache")
+    overflow = cursor.fetchone()[0] - PAGE_CACHE_MAX_BYTES
+    if overflow <= 0:
+        return
+
+    cursor.execute("SELECT url_key, size FROM page_cache ORDER BY last_accessed ASC")
+    victims = []
+    for row in cursor.fetchall():
+        if overflow <= 0:
+            break
+        victims.append((row['url_key'],))
+        overflow -= row['size']
+
+    cursor.executemany("DELETE FROM page_cache WHERE url_key = ?", victims)
+    _bump_stat(cursor, 'evictions', len(victims))
+
+
+def get_cache_stats():
+    """Get hit/miss counters and size of the page cache"""
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT hits, revalidated, misses, evictions FROM page_cache_stats WHERE id = 1")
+        stats = dict(cursor.fetchone())
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM page_cache")
+        entries, size = cursor.fetchone()
+
+    served = stats['hits'] + stats['revalidated']
+    lookups = served + stats['misses']
+    stats.update({
+        'entries': entries,
+        'size_bytes': size,
+        'hit_rate': (served / lookups * 100) if lookups > 0 else 0.0
+    })
+    return stats
+
+
+def clear_cache():
+    """Remove all cached pages (counters are kept)"""
+    with get_cache_db() as conn:
+        conn.cursor().execute("DELETE FROM page_cache")
+
+
+# Initialize cache on module import
+init_cache()
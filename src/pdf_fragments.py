@@ -0,0 +1,365 @@
+"""
+PDF Fragments Module
+Research packs assembled from per-source PDF fragments. Each source is
+rendered on its own and cached (SQLite under data/) by a hash of its HTML and
+the stylesheet version, so regenerating a pack with one source added or
+removed only renders that source. Fragments carry no position-dependent text:
+the cover page with contents, the "Source i of n" running header, page
+numbers and bookmarks are added when the fragments are merged. The cover and
+the header stamps for every page come from a single render, so a rebuild
+with cached fragments costs one render.
+
+Merging needs pypdf (in requirements.txt); without it callers fall back to
+rendering the whole document in one go (see research_to_pdf.build_pack_pdf()).
+"""
+import sqlite3
+import os
+import io
+import time
+import hashlib
+from html import escape
+from datetime import datetime
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import render_service
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
+# Base directory for data storage
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+FRAGMENT_CACHE_DB = os.path.join(DATA_DIR, 'pdf_fragments.db')
+
+# Cache settings (override via env)
+FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get("FRAGMENT_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+FRAGMENT_CACHE_ENABLED = os.environ.get("FRAGMENT_CACHE_ENABLED", "1") != "0"
+
+# Page geometry is shared by fragments and the cover/overlay document so their pages line up
+PAGE_SIZE = "A4"
+PAGE_MARGIN = "2cm 2cm 2.5cm 2cm"
+
+PAGE_STYLE = f"@page {{ size: {PAGE_SIZE}; margin: {PAGE_MARGIN}; }}"
+
+# Pack styles ship in assets/ and renders load them through the render sandbox
+PACK_STYLESHEET_PATH = os.path.join(BASE_DIR, 'assets', 'pack.css')
+with open(PACK_STYLESHEET_PATH, encoding='utf-8') as f:
+    PACK_STYLESHEET = f.read()
+
+# Cached fragments rendered under another stylesheet are never looked up again
+STYLESHEET_VERSION = hashlib.sha256((PAGE_STYLE + PACK_STYLESHEET).encode('utf-8')).hexdigest()[:12]
+
+
+@contextmanager
+def get_fragment_db():
+    """Context manager for fragment cache connections"""
+    conn = sqlite3.connect(FRAGMENT_CACHE_DB, timeout=10)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+def init_fragments():
+    """Initialize fragment cache database with schema"""
+    os.makedirs(os.path.dirname(FRAGMENT_CACHE_DB), exist_ok=True)
+    with get_fragment_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pdf_fragments (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                pdf BLOB NOT NULL,
+                pages INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                stylesheet_version TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pdf_fragments_accessed
+            ON pdf_fragments(last_accessed)
+        """)
+
+        # Single row of counters
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pdf_fragment_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0,
+                evictions INTEGER DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO pdf_fragment_stats (id) VALUES (1)")
+
+
+def available() -> bool:
+    """Whether packs can be assembled from fragments (pypdf installed and enabled)"""
+    return PdfWriter is not None and FRAGMENT_CACHE_ENABLED
+
+
+def _bump_stat(cursor, column, amount=1):
+    cursor.execute(f"UPDATE pdf_fragment_stats SET {column} = {column} + ? WHERE id = 1", (amount,))
+
+
+# ---------- HTML ----------
+
+def _document(body: str, title: str = "", css: str = PAGE_STYLE) -> str:
+    # pack.css resolves against the asset directory (render_sandbox.base_url())
+    return "\n".join([
+        "<html>",
+        "<head>",
+        "<meta charset='utf-8'>",
+        f"<title>{title}</title>",
+        "<link rel='stylesheet' href='pack.css'>",
+        f"<style>{css}</style>",
+        "</head>",
+        "<body>",
+        body,
+        "</body></html>",
+    ])
+
+
+def source_title(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+
+def fragment_html(url: str, body_html: str, also_at: list = None) -> str:
+    """Standalone document for one source (no numbering, so it can be reused at any position)"""
+    parts = [f"<h2>{source_title(url)}</h2>", f"<div class='source-url'>{url}</div>"]
+    if also_at:
+        parts.append(f"<div class='source-url'>Also published at: {', '.join(also_at)}</div>")
+    parts.append(body_html)
+    return _document("\n".join(parts), source_title(url))
+
+
+def fragment_key(html_str: str) -> str:
+    return hashlib.sha256(f"{STYLESHEET_VERSION}\n{html_str}".encode('utf-8')).hexdigest()
+
+
+def _cover_body(topic: str, entries: list) -> str:
+    """entries: (url, first page number) per source"""
+    items = "\n".join(
+        f"<li>{source_title(url)} <span class='page'>{page}</span>"
+        f"<div class='source-url'>{url}</div></li>"
+        for url, page in entries
+    )
+    body = f"""
+    <h1>Research Pack: {topic}</h1>
+    <p class='source-url'>{len(entries)} sources, generated {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+    <h2>Contents</h2>
+    <ol class='toc'>{items}</ol>
+    """
+    return body
+
+
+def _css_string(text: str) -> str:
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _cover_overlay_html(topic: str, entries: list, headers: list) -> str:
+    """
+    The cover, then one empty page per fragment page with the running header
+    and page number in the margins. The cover pages are used as they are and
+    the empty pages are stamped onto the fragments.
+
+    headers: running header per fragment page
+    """
+    css = f"@page {{ size: {PAGE_SIZE}; margin: {PAGE_MARGIN};" + """
+        @top-left { content: string(pack); font-size: 9px; color: #888; }
+        @top-right { content: string(source); font-size: 9px; color: #888; }
+        @bottom-center { content: "Page " counter(page) " of " counter(pages); font-size: 9px; color: #888; }
+    }
+    .sheet { height: 1px; break-before: page; }
+    """
+    # The cover sets no strings, so it gets no running header
+    pack = _css_string(f"Research Pack: {topic}")
+    sheets = []
+    for header in headers:
+        strings = f"string-set: pack {pack}, source {_css_string(header)}"
+        sheets.append(f'<div class="sheet" style="{escape(strings)}"></div>')
+    sheets = "\n".join(sheets)
+    return _document(_cover_body(topic, entries) + sheets, topic, css)
+
+
+# ---------- CACHE ----------
+
+def _get_cached(keys: list) -> dict:
+    """{key: (pdf, pages)} for the keys in the cache"""
+    found = {}
+    if not FRAGMENT_CACHE_ENABLED or not keys:
+        return found
+    unique = list(set(keys))
+    with get_fragment_db() as conn:
+        cursor = conn.cursor()
+        placeholders = ", ".join("?" * len(unique))
+        cursor.execute(f"SELECT key, pdf, pages FROM pdf_fragments WHERE key IN ({placeholders})", unique)
+        for row in cursor.fetchall():
+            found[row['key']] = (bytes(row['pdf']), row['pages'])
+        if found:
+            cursor.executemany("UPDATE pdf_fragments SET last_accessed = ? WHERE key = ?",
+                               [(time.time(), key) for key in found])
+        _bump_stat(cursor, 'hits', len(found))
+        _bump_stat(cursor, 'misses', len(unique) - len(found))
+    return found
+
+
+def _save(key: str, url: str, pdf: bytes, pages: int):
+    if not FRAGMENT_CACHE_ENABLED:
+        return
+    now = time.time()
+    with get_fragment_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO pdf_fragments
+                (key, url, pdf, pages, size, stylesheet_version, created_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (key, url, pdf, pages, len(pdf), STYLESHEET_VERSION, now, now))
+        _evict(cursor)
+
+
+def _evict(cursor):
+    """Drop fragments of old stylesheets, then least recently used ones above FRAGMENT_CACHE_MAX_BYTES"""
+    cursor.execute("DELETE FROM pdf_fragments WHERE stylesheet_version != ?", (STYLESHEET_VERSION,))
+    evicted = cursor.rowcount
+    cursor.execute("SELECT COALESCE(SUM(size), 0) FROM pdf_fragments")
+    overflow = cursor.fetchone()[0] - FRAGMENT_CACHE_MAX_BYTES
+    if overflow > 0:
+        cursor.execute("SELECT key, size FROM pdf_fragments ORDER BY last_accessed ASC")
+        victims = []
+        for row in cursor.fetchall():
+            if overflow <= 0:
+                break
+            victims.append((row['key'],))
+            overflow -= row['size']
+        cursor.executemany("DELETE FROM pdf_fragments WHERE key = ?", victims)
+        evicted += len(victims)
+    if evicted:
+        _bump_stat(cursor, 'evictions', evicted)
+
+
+def get_fragment_stats():
+    """Get hit/miss counters and size of the fragment cache"""
+    with get_fragment_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT hits, misses, evictions FROM pdf_fragment_stats WHERE id = 1")
+        stats = dict(cursor.fetchone())
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pdf_fragments")
+        entries, size = cursor.fetchone()
+
+    lookups = stats['hits'] + stats['misses']
+    stats.update({
+        'entries': entries,
+        'size_bytes': size,
+        'hit_rate': (stats['hits'] / lookups * 100) if lookups > 0 else 0.0
+    })
+    return stats
+
+
+def clear_fragments():
+    """Remove all cached fragments (counters are kept)"""
+    with get_fragment_db() as conn:
+        conn.cursor().execute("DELETE FROM pdf_fragments")
+
+
+# ---------- ASSEMBLY ----------
+
+def _render(html_str: str):
+    pdf = render_service.render_pdf_bytes(html_str)
+    return pdf, len(PdfReader(io.BytesIO(pdf)).pages)
+
+
+def build_pack(topic: str, sources: list, output_path: str, duplicates: dict = None, on_progress=None) -> dict:
+    """
+    Render a research pack from cached per-source fragments.
+
+    Args:
+        topic: Research topic (cover title and running header)
+        sources: List of (url, body_html) tuples, in PDF order
+        output_path: Where to write the merged PDF
+        duplicates: Optional {url: [(duplicate_url, similarity), ...]} merged into sources
+        on_progress: Optional callback(fragments_done, total)
+
+    Returns:
+        {"fragments", "cached", "rendered", "pages"}
+    """
+    if PdfWriter is None:
+        raise RuntimeError("Install pypdf to assemble packs from fragments: pip install pypdf")
+    duplicates = duplicates or {}
+
+    htmls = [fragment_html(url, body, [dup for dup, _ in duplicates.get(url, [])]) for url, body in sources]
+    keys = [fragment_key(html) for html in htmls]
+    fragments = _get_cached(keys)
+    cached = done = sum(1 for key in keys if key in fragments)
+    if on_progress:
+        on_progress(done, len(keys))
+
+    # Render the missing fragments in parallel across the render pool
+    missing = {key: (url, html) for key, (url, _), html in zip(keys, sources, htmls) if key not in fragments}
+
+    def render_missing(key):
+        url, html = missing[key]
+        pdf, pages = _render(html)
+        _save(key, url, pdf, pages)
+        return key, pdf, pages
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(render_service.RENDER_WORKERS, 1),
+                                thread_name_prefix="fragment") as executor:
+            for key, pdf, pages in executor.map(render_missing, missing):
+                fragments[key] = (pdf, pages)
+                done += keys.count(key)
+                if on_progress:
+                    on_progress(done, len(keys))
+
+    headers, page_counts = [], []
+    for i, key in enumerate(keys, start=1):
+        headers += [f"Source {i} of {len(sources)}"] * fragments[key][1]
+        page_counts.append(fragments[key][1])
+
+    # Contents page numbers depend on the cover's own length: render until the
+    # cover takes as many pages as the numbers assumed
+    cover_pages, tried = 1, set()
+    while True:
+        entries, page = [], cover_pages + 1
+        for (url, _), pages in zip(sources, page_counts):
+            entries.append((url, page))
+            page += pages
+        html = _cover_overlay_html(topic, entries, headers)
+        rendered = PdfReader(io.BytesIO(render_service.render_pdf_bytes(html)))
+        tried.add(cover_pages)
+        actual = len(rendered.pages) - len(headers)
+        if actual == cover_pages:
+            break
+        if actual < 1 or actual in tried:
+            raise RuntimeError(f"Cover page count does not settle (tried {sorted(tried)}, got {actual})")
+        cover_pages = actual
+
+    writer = PdfWriter()
+    writer.append(rendered, pages=(0, cover_pages), outline_item="Contents", import_outline=False)
+    for i, ((url, _), key) in enumerate(zip(sources, keys), start=1):
+        writer.append(PdfReader(io.BytesIO(fragments[key][0])), outline_item=f"Source {i}: {source_title(url)}")
+
+    # Running headers and page numbers are stamped onto the fragment pages
+    for page, stamp in zip(writer.pages[cover_pages:], rendered.pages[cover_pages:]):
+        page.merge_page(stamp)
+
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+
+    print(f"✓ Pack assembled from {len(keys)} fragments ({cached} cached, {len(missing)} rendered)")
+    return {'fragments': len(keys), 'cached': cached, 'rendered': len(missing), 'pages': cover_pages + len(headers)}
+
+
+# Initialize cache on module import
+init_fragments()
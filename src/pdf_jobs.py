@@ -0,0 +1,331 @@
+"""
+PDF Jobs Module
+Background PDF generation: submit() returns a job ID right away and a worker
+pool runs fetch -> dedupe -> render -> save outside any HTTP request.
+submit_rebuild() queues an offline job that renders a session's stored
+sources again (see blob_store.py) instead of fetching them.
+Job state lives in SQLite (data/pdf_jobs.db), so status pages survive reloads,
+and get_status() reports per-stage progress and an ETA learned from past jobs.
+"""
+import sqlite3
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import database as db
+import blob_store
+import content_dedupe
+from research_to_pdf import fetch_pages_parallel, build_pack_pdf
+
+# Base directory for data storage
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+PDF_JOBS_DB = os.path.join(DATA_DIR, 'pdf_jobs.db')
+
+# Jobs run at the same time (override via env)
+PDF_JOB_WORKERS = int(os.environ.get("PDF_JOB_WORKERS", 2))
+
+# (name, label) in execution order
+STAGES = [
+    ("fetch", "Fetching sources"),
+    ("dedupe", "Merging duplicates"),
+    ("render", "Rendering PDF"),
+    ("save", "Saving to history"),
+]
+
+# Seconds per source for each stage, until there is history to learn from
+DEFAULT_STAGE_SECONDS = {"fetch": 1.5, "dedupe": 0.01, "render": 0.4, "save": 0.2}
+# Completed jobs used for ETA estimates
+ETA_HISTORY_JOBS = 20
+
+_executor = ThreadPoolExecutor(max_workers=PDF_JOB_WORKERS, thread_name_prefix="pdf-job")
+_lock = threading.Lock()
+
+
+@contextmanager
+def get_jobs_db():
+    """Context manager for job database connections"""
+    conn = sqlite3.connect(PDF_JOBS_DB, timeout=10)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+def init_jobs():
+    """Initialize job database; jobs left running by a dead process are marked failed"""
+    os.makedirs(os.path.dirname(PDF_JOBS_DB), exist_ok=True)
+    with get_jobs_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pdf_jobs (
+                id TEXT PRIMARY KEY,
+                session_id INTEGER,
+                topic TEXT NOT NULL,
+                urls TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker_pid INTEGER,
+                stage TEXT,
+                stages TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                output_pdf TEXT,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        # Jobs whose worker process is gone will never finish
+        cursor.execute("SELECT id, worker_pid FROM pdf_jobs WHERE status IN ('queued', 'running')")
+        orphaned = [row['id'] for row in cursor.fetchall() if not _process_alive(row['worker_pid'])]
+        for job_id in orphaned:
+            cursor.execute("""
+                UPDATE pdf_jobs SET status = 'failed', error = 'Interrupted by a server restart', finished_at = ?
+                WHERE id = ?
+            """, (time.time(), job_id))
+        if orphaned:
+            print(f"Marked {len(orphaned)} interrupted PDF jobs as failed")
+
+
+def _process_alive(pid) -> bool:
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _update(job_id: str, **fields):
+    for key in ('stages', 'result'):
+        if key in fields:
+            fields[key] = json.dumps(fields[key])
+    columns = ", ".join(f"{key} = ?" for key in fields)
+    with _lock, get_jobs_db() as conn:
+        conn.cursor().execute(f"UPDATE pdf_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+def output_filename(topic: str, job_id: str = None) -> str:
+    """PDF filename for a topic; with a job ID, concurrent jobs on one topic don't share a file"""
+    safe_topic = "".join(c for c in topic if c.isalnum() or c in (" ", "_", "-")).strip()
+    if not safe_topic:
+        safe_topic = "research"
+    safe_topic = safe_topic.replace(' ', '_')
+    return f"{safe_topic}_{job_id}.pdf" if job_id else f"{safe_topic}.pdf"
+
+
+def submit(topic: str, urls: list, session_id=None, on_complete=None, backend: str = None) -> str:
+    """
+    Queue a PDF job and return its ID immediately.
+
+    Args:
+        topic: Research topic (PDF title and filename)
+        urls: Selected source URLs, in PDF order
+        session_id: Research session to mark complete and snapshot (see blob_store.py)
+        on_complete: Optional callback(result) run in the "save" stage, e.g. memory writes;
+                     entries it adds to `result` are stored with the job
+        backend: PDF backend ("weasyprint", "text" or "auto"; see research_to_pdf.html_to_pdf())
+
+    Returns:
+        Job ID for get_status()
+    """
+    return _queue(topic, urls, session_id, on_complete, backend)
+
+
+def submit_rebuild(session_id, topic: str, urls: list, backend: str = None) -> str:
+    """
+    Queue an offline rebuild of a session's PDF and return its job ID.
+
+    The "fetch" stage loads the session's stored sources instead of
+    downloading them; URLs with nothing stored are left out and listed in
+    the result's "missing". The session itself is not touched.
+    """
+    return _queue(topic, urls, session_id, None, backend, offline=True)
+
+
+def _queue(topic, urls, session_id, on_complete, backend, offline=False) -> str:
+    job_id = uuid.uuid4().hex[:12]
+    stages = {name: {"status": "pending", "done": 0, "total": 0, "seconds": None} for name, _ in STAGES}
+    with _lock, get_jobs_db() as conn:
+        conn.cursor().execute("""
+            INSERT INTO pdf_jobs (id, session_id, topic, urls, status, worker_pid, stages, created_at)
+            VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)
+        """, (job_id, session_id, topic, json.dumps(urls), os.getpid(), json.dumps(stages), time.time()))
+    _executor.submit(_run, job_id, topic, list(urls), session_id, on_complete, stages, backend, offline)
+    print(f"Queued {'offline rebuild' if offline else 'PDF job'} {job_id}: {len(urls)} sources")
+    return job_id
+
+
+def _run(job_id, topic, urls, session_id, on_complete, stages, backend=None, offline=False):
+    current = {"stage": None, "started": None}
+
+    def start(stage, total=1):
+        now = time.time()
+        current.update(stage=stage, started=now)
+        stages[stage].update(status="running", total=total)
+        _update(job_id, stage=stage, stages=stages)
+
+    def progress(done, total):
+        stages[current["stage"]].update(done=done, total=total)
+        _update(job_id, stages=stages)
+
+    def finish():
+        stage = stages[current["stage"]]
+        stage.update(status="done", done=stage["total"], seconds=time.time() - current["started"])
+        _update(job_id, stages=stages)
+
+    _update(job_id, status="running", started_at=time.time())
+    try:
+        start("fetch", len(urls))
+        fetch_stats, missing = {}, []
+        if offline:
+            # Already cleaned and deduplicated when the session's PDF was first built
+            sources, duplicates, missing = blob_store.load_session(session_id, urls)
+            progress(len(urls), len(urls))
+        else:
+            sources = fetch_pages_parallel(urls, stats=fetch_stats, on_progress=progress)
+        finish()
+        if not sources:
+            if offline:
+                raise RuntimeError("No stored content for this session, so it can't be rebuilt offline.")
+            raise RuntimeError("No content could be fetched. Please try different sources.")
+
+        start("dedupe")
+        if not offline:
+            sources, duplicates = content_dedupe.dedupe_sources(sources)
+        finish()
+
+        start("render", len(sources))
+        output_pdf = output_filename(topic, job_id)
+        render_stats = build_pack_pdf(topic, sources, output_pdf, duplicates, on_progress=progress,
+                                      backend=backend)
+        finish()
+
+        result = {
+            "sources": len(sources),
+            "full_bytes": sum(st['full_bytes'] for st in fetch_stats.values()),
+            "saved_bytes": sum(st['saved_bytes'] for st in fetch_stats.values()),
+            "cached_fragments": render_stats['cached'],
+            "backend": render_stats['backend'],
+            "duplicates": [[url, dup_url, similarity] for url, merged in duplicates.items()
+                           for dup_url, similarity in merged],
+        }
+        if offline:
+            result.update(offline=True, missing=missing)
+
+        start("save")
+        if session_id and not offline:
+            db.mark_session_complete(session_id)
+            # Keep the exact sources so the PDF can be rebuilt offline from /session/<id>
+            blob_store.save_session(session_id, sources, duplicates)
+        if on_complete:
+            on_complete(result)
+        finish()
+
+        _update(job_id, status="done", stage=None, output_pdf=output_pdf, result=result,
+                finished_at=time.time())
+        print(f"✓ PDF job {job_id} done: {output_pdf}")
+    except Exception as e:
+        if current["stage"]:
+            stages[current["stage"]]["status"] = "failed"
+        _update(job_id, status="failed", stages=stages, error=str(e), finished_at=time.time())
+        print(f"PDF job {job_id} failed: {e}")
+
+
+def _stage_seconds_per_source() -> dict:
+    """Average seconds per source for each stage over recent completed jobs"""
+    with get_jobs_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT urls, stages, result FROM pdf_jobs WHERE status = 'done'
+            ORDER BY finished_at DESC LIMIT ?
+        """, (ETA_HISTORY_JOBS,))
+        rows = cursor.fetchall()
+
+    totals = {name: [] for name, _ in STAGES}
+    for row in rows:
+        # Offline rebuilds skip the network, so their timings would skew the estimate
+        if row['result'] and json.loads(row['result']).get('offline'):
+            continue
+        count = max(len(json.loads(row['urls'])), 1)
+        for name, stage in json.loads(row['stages']).items():
+            if name in totals and stage.get('seconds') is not None:
+                totals[name].append(stage['seconds'] / count)
+    return {name: (sum(values) / len(values) if values else DEFAULT_STAGE_SECONDS[name])
+            for name, values in totals.items()}
+
+
+def get_status(job_id: str):
+    """
+    Job status for polling (None for unknown IDs).
+
+    Returns:
+        {"id", "topic", "session_id", "sources" (number of URLs),
+         "status" (queued/running/done/failed), "stage", "stages": [{"name", "label", "status", "done", "total"}],
+         "progress" (0-1), "elapsed", "eta_seconds", "output_pdf", "result", "error"}
+    """
+    with get_jobs_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM pdf_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+    if not row:
+        return None
+
+    stages = json.loads(row['stages'])
+    sources = len(json.loads(row['urls']))
+    count = max(sources, 1)
+    per_source = _stage_seconds_per_source()
+
+    # Expected time per stage; finished stages count as their actual time
+    expected = {name: per_source[name] * count for name, _ in STAGES}
+    total = remaining = 0.0
+    for name, _ in STAGES:
+        stage = stages[name]
+        if stage['status'] == 'done':
+            total += stage['seconds'] or 0
+            continue
+        fraction = stage['done'] / stage['total'] if stage['status'] == 'running' and stage['total'] else 0
+        total += expected[name]
+        remaining += expected[name] * (1 - fraction)
+
+    if row['status'] == 'done':
+        progress, eta = 1.0, 0
+    elif row['status'] == 'failed':
+        progress, eta = (1 - remaining / total) if total else 0, None
+    else:
+        progress, eta = (1 - remaining / total) if total else 0, round(remaining)
+
+    started = row['started_at']
+    end = row['finished_at'] or time.time()
+    return {
+        'id': row['id'],
+        'topic': row['topic'],
+        'session_id': row['session_id'],
+        'sources': sources,
+        'status': row['status'],
+        'stage': row['stage'],
+        'stages': [{'name': name, 'label': label, 'status': stages[name]['status'],
+                    'done': stages[name]['done'], 'total': stages[name]['total']}
+                   for name, label in STAGES],
+        'progress': round(progress, 3),
+        'elapsed': round(end - started, 1) if started else 0,
+        'eta_seconds': eta,
+        'output_pdf': row['output_pdf'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'error': row['error']
+    }
+
+
+# Initialize job database on module import
+init_jobs()
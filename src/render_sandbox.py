@@ -0,0 +1,109 @@
+"""
+Render Sandbox
+URL fetcher for WeasyPrint that never touches the network. Scraped HTML can
+carry <img>, @import or @font-face URLs; with the default fetcher each one is
+a download in the middle of a render. This fetcher serves only files under
+the local asset directories (bundled fonts and CSS) and data: URIs, refuses
+everything else, and stops serving once the render has spent its fetch time
+budget, so render time no longer depends on remote servers.
+"""
+import os
+import time
+import mimetypes
+from urllib.parse import urlsplit, unquote
+from urllib.request import url2pathname, pathname2url
+
+# Base directory of the project
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bundled pack stylesheet (assets/pack.css) and the system font directories,
+# for @font-face rules pointing at installed fonts
+DEFAULT_ASSET_DIRS = [os.path.join(BASE_DIR, 'assets')] + [
+    d for d in ("/usr/share/fonts", "/usr/local/share/fonts", "/Library/Fonts",
+                os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"))
+    if os.path.isdir(d)
+]
+
+# Sandbox settings (override via env)
+# Directories whose files renders may load, separated by os.pathsep; the first
+# one is the base for relative links and has to hold pack.css
+PDF_ASSET_DIRS = [os.path.abspath(d) for d in os.environ.get(
+    "PDF_ASSET_DIRS", os.pathsep.join(DEFAULT_ASSET_DIRS)).split(os.pathsep) if d]
+# Total time a render may spend loading resources
+PDF_FETCH_BUDGET_SECONDS = float(os.environ.get("PDF_FETCH_BUDGET_SECONDS", 2))
+# Largest single resource served
+PDF_FETCH_MAX_BYTES = int(os.environ.get("PDF_FETCH_MAX_BYTES", 5 * 1024 * 1024))
+
+
+class ResourceBlocked(Exception):
+    """The render sandbox refused a resource"""
+
+
+def base_url() -> str:
+    """file:// URL of the first asset directory, so relative links resolve inside the sandbox"""
+    return "file:" + pathname2url(PDF_ASSET_DIRS[0]) + "/" if PDF_ASSET_DIRS else None
+
+
+class SandboxFetcher:
+    """
+    url_fetcher for one render.
+
+    Usage:
+        fetcher = SandboxFetcher()
+        HTML(string=html, base_url=base_url(), url_fetcher=fetcher).write_pdf(path)
+        fetcher.stats  # {"served", "blocked", "over_budget", "seconds"}
+
+    WeasyPrint treats an exception from the fetcher as a missing resource
+    and carries on without it.
+    """
+
+    def __init__(self, asset_dirs: list = None, budget_seconds: float = None):
+        self.asset_dirs = [os.path.realpath(d) for d in (PDF_ASSET_DIRS if asset_dirs is None else asset_dirs)]
+        self.budget_seconds = PDF_FETCH_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+        self.stats = {"served": 0, "blocked": 0, "over_budget": 0, "seconds": 0.0}
+        self.blocked_urls = []
+
+    def _block(self, url: str, reason: str, counter: str = "blocked"):
+        self.stats[counter] += 1
+        if len(self.blocked_urls) < 20:
+            self.blocked_urls.append(url)
+        raise ResourceBlocked(f"{reason}: {url[:200]}")
+
+    def _local_path(self, url: str):
+        """Real path of a file:// URL inside an asset directory (None otherwise)"""
+        parts = urlsplit(url)
+        if parts.scheme != "file" or parts.netloc not in ("", "localhost"):
+            return None
+        path = os.path.realpath(url2pathname(unquote(parts.path)))
+        for directory in self.asset_dirs:
+            if os.path.commonpath([path, directory]) == directory and os.path.isfile(path):
+                return path
+        return None
+
+    def __call__(self, url: str, timeout: float = 10, ssl_context=None, **kwargs):
+        if self.stats["seconds"] >= self.budget_seconds:
+            self._block(url, "Render fetch budget spent", "over_budget")
+
+        started = time.perf_counter()
+        try:
+            if url.startswith("data:"):
+                # Inline data never touches the network
+                from weasyprint import default_url_fetcher
+                result = default_url_fetcher(url)
+            else:
+                path = self._local_path(url)
+                if path is None:
+                    self._block(url, "Blocked by render sandbox")
+                if os.path.getsize(path) > PDF_FETCH_MAX_BYTES:
+                    self._block(url, "Resource too large")
+                mime_type, _ = mimetypes.guess_type(path)
+                with open(path, "rb") as f:
+                    result = {"string": f.read(), "mime_type": mime_type,
+                              "redirected_url": url, "filename": os.path.basename(path)}
+                # "encoding" is the charset; bundled text assets are UTF-8
+                if mime_type and mime_type.startswith("text/"):
+                    result["encoding"] = "utf-8"
+            self.stats["served"] += 1
+            return result
+        finally:
+            self.stats["seconds"] += time.perf_counter() - started
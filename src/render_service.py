@@ -0,0 +1,263 @@
+"""
+Render Service
+Runs WeasyPrint renders in a pool of worker processes, so a CPU-bound render
+never holds the GIL of the web server and several users' PDFs render in
+parallel across cores. Concurrent renders are capped; each render has a time
+limit (enforced inside the worker, with the pool recycled if a worker stops
+answering) and each worker has an address-space limit. Renders load no
+remote resources (see render_sandbox.py).
+"""
+import os
+import sys
+import time
+import types
+import signal
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import render_sandbox
+
+# Pool settings (override via env)
+# Worker processes; 0 renders in the calling process (CLI, debugging)
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", os.cpu_count() or 1))
+# Renders running or queued at once; further callers wait for a slot
+RENDER_MAX_CONCURRENT = int(os.environ.get("RENDER_MAX_CONCURRENT", max(RENDER_WORKERS, 1) * 2))
+RENDER_TIMEOUT_SECONDS = float(os.environ.get("RENDER_TIMEOUT_SECONDS", 120))
+# Address-space limit per worker (0 = unlimited)
+RENDER_MEMORY_LIMIT_MB = int(os.environ.get("RENDER_MEMORY_LIMIT_MB", 2048))
+# Workers are replaced after this many renders, returning memory WeasyPrint keeps cached
+RENDER_MAX_TASKS_PER_WORKER = int(os.environ.get("RENDER_MAX_TASKS_PER_WORKER", 50))
+
+# Extra time the parent waits past the worker's own timeout before recycling the pool
+TIMEOUT_GRACE_SECONDS = 10
+
+_pool = None
+_pool_lock = threading.Lock()
+_start_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(RENDER_MAX_CONCURRENT, 1))
+_stats_lock = threading.Lock()
+_stats = {'renders': 0, 'failures': 0, 'timeouts': 0, 'pool_restarts': 0, 'active': 0, 'render_seconds': 0.0,
+          'fetches_served': 0, 'fetches_blocked': 0}
+
+
+class RenderError(Exception):
+    """A render failed in its worker (bad input, out of memory, worker crash)"""
+
+
+class RenderTimeout(RenderError):
+    """A render took longer than its time limit"""
+
+
+# ---------- WORKER SIDE ----------
+
+def _init_worker(memory_limit_mb: int):
+    global RENDER_MEMORY_LIMIT_MB
+    RENDER_MEMORY_LIMIT_MB = memory_limit_mb
+    # Ctrl+C goes to the server; it shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource and memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            print(f"Render worker: could not set memory limit: {e}")
+
+
+def _on_alarm(signum, frame):
+    raise RenderTimeout("Render timed out")
+
+
+def _run_task(func, args, timeout: float):
+    """Run one render in a worker, interrupted by SIGALRM after `timeout` seconds"""
+    use_alarm = hasattr(signal, "SIGALRM") and timeout > 0
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    except MemoryError:
+        raise RenderError(f"Render exceeded the {RENDER_MEMORY_LIMIT_MB} MB memory limit")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _sandboxed(html_str: str):
+    """WeasyPrint document whose resources come only from the render sandbox"""
+    from weasyprint import HTML
+    fetcher = render_sandbox.SandboxFetcher()
+    return HTML(string=html_str, base_url=render_sandbox.base_url(), url_fetcher=fetcher), fetcher
+
+
+def _write_pdf(html_str: str, output_path: str) -> tuple:
+    document, fetcher = _sandboxed(html_str)
+    document.write_pdf(output_path)
+    return output_path, fetcher.stats
+
+
+def _pdf_bytes(html_str: str) -> tuple:
+    document, fetcher = _sandboxed(html_str)
+    return document.write_pdf(), fetcher.stats
+
+
+# ---------- POOL ----------
+
+_spawn = multiprocessing.get_context("spawn")
+
+
+class _WorkerProcess(_spawn.Process):
+    """
+    Spawned worker that does not re-run the script that started the server.
+
+    A spawned child normally imports the parent's __main__ again (as
+    __mp_main__). Under `python research_ui_flask.py` that is the whole app:
+    the memory layer and its Qdrant lock, every DB initializer and executor.
+    The child is started while __main__ is a blank module, so it imports
+    only what unpickling the worker needs (render_service).
+    """
+
+    def start(self):
+        # Also covers workers the pool starts from its own thread to replace recycled ones
+        with _start_lock:
+            main = sys.modules['__main__']
+            sys.modules['__main__'] = types.ModuleType('__main__')
+            try:
+                super().start()
+            finally:
+                sys.modules['__main__'] = main
+
+
+class _WorkerContext(type(_spawn)):
+    Process = _WorkerProcess
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            options = {}
+            if sys.version_info >= (3, 11) and RENDER_MAX_TASKS_PER_WORKER > 0:
+                options['max_tasks_per_child'] = RENDER_MAX_TASKS_PER_WORKER
+            # Spawned workers don't inherit the server's threads, sockets or locks
+            _pool = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=_WorkerContext(),
+                initializer=_init_worker,
+                initargs=(RENDER_MEMORY_LIMIT_MB,),
+                **options
+            )
+            print(f"✓ Render pool started ({RENDER_WORKERS} workers)")
+        return _pool
+
+
+def _restart_pool(pool: ProcessPoolExecutor):
+    """Kill a pool whose worker hung or died; the next render starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool = None
+    for process in list(getattr(pool, '_processes', {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+    with _stats_lock:
+        _stats['pool_restarts'] += 1
+
+
+def shutdown():
+    """Stop the worker processes (a later render starts them again)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run(func, *args, timeout: float = None):
+    """
+    Run a render callable in the pool and wait for its result.
+
+    `func` and `args` must be picklable: a module-level function of an
+    importable module (workers don't load __main__). Blocks
+    while RENDER_MAX_CONCURRENT renders are already in flight.
+
+    Raises:
+        RenderTimeout: the render ran past `timeout` (default RENDER_TIMEOUT_SECONDS)
+        RenderError: the render failed or its worker died
+    """
+    timeout = RENDER_TIMEOUT_SECONDS if timeout is None else timeout
+    started = time.time()
+    with _slots:
+        with _stats_lock:
+            _stats['active'] += 1
+        try:
+            if RENDER_WORKERS <= 0:
+                result = func(*args)
+            else:
+                pool = _get_pool()
+                future = pool.submit(_run_task, func, args, timeout)
+                try:
+                    result = future.result(timeout=timeout + TIMEOUT_GRACE_SECONDS if timeout > 0 else None)
+                except FutureTimeout:
+                    # The worker ignored its alarm (stuck in native code)
+                    _restart_pool(pool)
+                    raise RenderTimeout(f"Render timed out after {timeout:.0f}s")
+                except BrokenProcessPool:
+                    # A worker was killed, e.g. by the OOM killer
+                    _restart_pool(pool)
+                    raise RenderError("Render worker crashed")
+        except RenderTimeout:
+            with _stats_lock:
+                _stats['timeouts'] += 1
+            raise
+        except Exception as e:
+            with _stats_lock:
+                _stats['failures'] += 1
+            if isinstance(e, RenderError):
+                raise
+            raise RenderError(str(e)) from e
+        finally:
+            with _stats_lock:
+                _stats['active'] -= 1
+
+    with _stats_lock:
+        _stats['renders'] += 1
+        _stats['render_seconds'] += time.time() - started
+    return result
+
+
+def _count_fetches(fetch_stats: dict):
+    with _stats_lock:
+        _stats['fetches_served'] += fetch_stats.get('served', 0)
+        _stats['fetches_blocked'] += fetch_stats.get('blocked', 0) + fetch_stats.get('over_budget', 0)
+
+
+def render_pdf(html_str: str, output_path: str, timeout: float = None) -> str:
+    """Render an HTML document to a PDF file in a worker process"""
+    output_path, fetch_stats = run(_write_pdf, html_str, output_path, timeout=timeout)
+    _count_fetches(fetch_stats)
+    return output_path
+
+
+def render_pdf_bytes(html_str: str, timeout: float = None) -> bytes:
+    """Render an HTML document to PDF bytes in a worker process"""
+    pdf, fetch_stats = run(_pdf_bytes, html_str, timeout=timeout)
+    _count_fetches(fetch_stats)
+    return pdf
+
+
+def get_render_stats() -> dict:
+    """Get render counts, failures and average render time"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['workers'] = RENDER_WORKERS
+    stats['max_concurrent'] = RENDER_MAX_CONCURRENT
+    stats['avg_render_seconds'] = round(stats.pop('render_seconds') / stats['renders'], 2) if stats['renders'] else 0
+    return stats
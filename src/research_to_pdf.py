@@ -1,9 +1,28 @@
 import os
+import re
+import json
+import asyncio
 import textwrap
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
-from bs4 import BeautifulSoup
-from weasyprint import HTML
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import search_cache
+import host_scheduler
+import page_cache
+import blob_store
+import url_normalizer
+import content_extractor
+import content_dedupe
+import score_cache
+import local_scorer
+import embedding_cache
+import render_service
+import pdf_fragments
+import text_pdf
+import numpy as np
 
 # ---------- CONFIG ----------
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -87,20 +106,246 @@ def search_web_duckduckgo(query: str, num_results: int = 10):
         raise RuntimeError("Install ddgs: pip install ddgs")
 
 
-# Choose your search provider here
-def search_web(query: str, num_results: int = 10):
+# ---------- SEARCH PROVIDER REGISTRY ----------
+SEARCH_PROVIDERS = {
+    "duckduckgo": search_web_duckduckgo,  # Free, no API key
+    "tavily": search_web_tavily,          # Good for research
+    "serpapi": search_web_serpapi,        # Most reliable, paid
+}
+
+# Ordered fallback chain, e.g. SEARCH_PROVIDER_CHAIN="tavily,duckduckgo"
+SEARCH_PROVIDER_CHAIN = [
+    p.strip() for p in os.environ.get("SEARCH_PROVIDER_CHAIN", "duckduckgo").split(",")
+    if p.strip()
+]
+
+# A provider that hasn't answered within this many seconds counts as failed
+SEARCH_TIMEOUT_SECONDS = float(os.environ.get("SEARCH_TIMEOUT_SECONDS", 20))
+
+# Hedged mode: if the primary is slower than its p95 latency, fire the next
+# provider in the chain too and take whichever answers first
+SEARCH_HEDGE = os.environ.get("SEARCH_HEDGE", "0") == "1"
+SEARCH_HEDGE_DEFAULT_BUDGET = float(os.environ.get("SEARCH_HEDGE_DEFAULT_BUDGET", 3.0))
+SEARCH_HEDGE_MIN_SAMPLES = 10
+
+# Max simultaneous in-flight searches per provider (shared by all sessions).
+# DuckDuckGo rate-limits aggressively, so keep its cap low.
+SEARCH_CONCURRENCY = {
+    "duckduckgo": int(os.environ.get("DDG_SEARCH_CONCURRENCY", 3)),
+    "tavily": int(os.environ.get("TAVILY_SEARCH_CONCURRENCY", 5)),
+    "serpapi": int(os.environ.get("SERPAPI_SEARCH_CONCURRENCY", 5)),
+}
+
+_provider_semaphores = {}
+_provider_semaphores_lock = threading.Lock()
+
+# Recent successful latencies per provider (seconds), used for the hedge budget
+_provider_latencies = {}
+
+# Provider calls run here so they can be timed out and hedged
+_search_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="search")
+
+
+def _provider_semaphore(provider: str):
+    """Get (or lazily create) the concurrency-limiting semaphore for a provider"""
+    with _provider_semaphores_lock:
+        if provider not in _provider_semaphores:
+            limit = max(1, SEARCH_CONCURRENCY.get(provider, 3))
+            _provider_semaphores[provider] = threading.BoundedSemaphore(limit)
+        return _provider_semaphores[provider]
+
+
+def _record_latency(provider: str, seconds: float):
+    with _provider_semaphores_lock:
+        _provider_latencies.setdefault(provider, deque(maxlen=100)).append(seconds)
+
+
+def get_hedge_budget(provider: str) -> float:
+    """p95 latency of recent successful calls to a provider (or a default until warmed up)"""
+    with _provider_semaphores_lock:
+        samples = sorted(_provider_latencies.get(provider, []))
+    if len(samples) < SEARCH_HEDGE_MIN_SAMPLES:
+        return SEARCH_HEDGE_DEFAULT_BUDGET
+    return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def _resolve_provider_chain(provider=None) -> list:
+    """Build the provider chain, putting a per-request provider first"""
+    chain = list(SEARCH_PROVIDER_CHAIN) or ["duckduckgo"]
+    if provider:
+        chain = [provider] + [p for p in chain if p != provider]
+
+    unknown = [p for p in chain if p not in SEARCH_PROVIDERS]
+    if unknown:
+        raise ValueError(f"Unknown search provider(s): {', '.join(unknown)}")
+    return chain
+
+
+class _EmptySearchResults(Exception):
+    """A provider answered but found nothing (often soft rate limiting)"""
+
+
+def _call_provider(provider: str, query: str, num_results: int):
+    """Run one provider under its concurrency cap; empty results count as failure"""
+    with _provider_semaphore(provider):
+        started = time.time()
+        results = SEARCH_PROVIDERS[provider](query, num_results)
+        _record_latency(provider, time.time() - started)
+
+    if not results:
+        raise _EmptySearchResults(f"{provider} returned no results")
+    return results
+
+
+def _search_with_fallback(chain: list, query: str, num_results: int, hedge: bool):
+    """
+    Try providers in order until one succeeds.
+
+    Returns (provider, results). In hedged mode the next provider is started
+    as soon as the current one exceeds its p95 budget, and the first
+    successful answer wins. If every provider merely came back empty,
+    returns (None, []).
+    """
+    errors = []
+    all_empty = True
+    pending = {}  # future -> provider
+    remaining = list(chain)
+    deadline = None
+
+    def launch_next():
+        nonlocal deadline
+        provider = remaining.pop(0)
+        future = _search_executor.submit(_call_provider, provider, query, num_results)
+        pending[future] = provider
+        deadline = time.time() + SEARCH_TIMEOUT_SECONDS
+        return provider
+
+    current = launch_next()
+
+    while pending:
+        if hedge and remaining:
+            wait_for = min(get_hedge_budget(current), max(0.0, deadline - time.time()))
+        else:
+            wait_for = max(0.0, deadline - time.time())
+
+        done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            provider = pending.pop(future)
+            try:
+                return provider, future.result()
+            except Exception as e:
+                all_empty = all_empty and isinstance(e, _EmptySearchResults)
+                errors.append(f"{provider}: {e}")
+                print(f"Search provider {provider} failed for '{query}': {e}")
+
+        if done:
+            # Something failed - move on to the next provider if nothing else is running
+            if not pending and remaining:
+                current = launch_next()
+            continue
+
+        if time.time() >= deadline:
+            # Timed out - abandon everything still running (threads finish in background)
+            all_empty = False
+            for provider in pending.values():
+                errors.append(f"{provider}: timed out after {SEARCH_TIMEOUT_SECONDS}s")
+                print(f"Search provider {provider} timed out for '{query}'")
+            pending.clear()
+            if remaining:
+                current = launch_next()
+        elif hedge and remaining:
+            print(f"Hedging '{query}': {current} slower than {get_hedge_budget(current):.1f}s")
+            current = launch_next()
+
+    if all_empty:
+        return None, []
+    raise RuntimeError("All search providers failed: " + "; ".join(errors))
+
+
+def search_web(query: str, num_results: int = 10, use_cache: bool = True,
+               provider: str = None, hedge: bool = None):
     """
-    Main search function - change this to use your preferred provider
+    Main search function - dispatches to the configured search providers
+
+    Providers are tried in SEARCH_PROVIDER_CHAIN order (a per-request
+    `provider` goes first), falling back on error, timeout or empty results.
+    With hedge=True (default: SEARCH_HEDGE) a slow provider is raced against
+    the next one in the chain.
 
-    Uncomment one of these:
+    Results are served from the on-disk search cache when available
+    (see search_cache.py); pass use_cache=False to force a live search.
     """
-    return search_web_duckduckgo(query, num_results)  # Free, no API key
-    # return search_web_tavily(query, num_results)      # Good for research
-    # return search_web_serpapi(query, num_results)     # Most reliable, paid
+    chain = _resolve_provider_chain(provider)
+    use_cache = use_cache and search_cache.SEARCH_CACHE_ENABLED
+    if hedge is None:
+        hedge = SEARCH_HEDGE
+
+    if use_cache:
+        for name in chain:
+            cached = search_cache.get_cached_results(name, query, num_results)
+            if cached is not None:
+                print(f"Search cache hit ({name}): {query}")
+                return cached
+
+    answered_by, results = _search_with_fallback(chain, query, num_results, hedge)
+
+    # Don't cache empty responses - they are usually rate limiting, not real answers
+    if use_cache and results:
+        search_cache.save_results(answered_by, query, num_results, results)
 
-    # raise NotImplementedError(
-    #     "Choose a search provider by uncommenting one of the options above in search_web()"
-    # )
+    return results
+
+
+def search_queries_parallel(queries: list, num_results: int = 10,
+                            provider: str = None, hedge: bool = None) -> list:
+    """
+    Run search_web() for several queries concurrently and merge the results.
+
+    Each query runs in its own worker thread; the per-provider semaphore in
+    search_web() caps how many actually hit the provider at once. Results are
+    merged in query order, so deduplication keeps the first-seen URL and its
+    'query' attribution exactly as a sequential loop would. URL variants of
+    the same page are collapsed (see url_normalizer.collapse_duplicates()).
+
+    Args:
+        queries: Search queries to run
+        num_results: Results requested per query
+        provider: Optional provider to try first (see SEARCH_PROVIDERS)
+        hedge: Race slow providers against the next in the chain
+
+    Returns:
+        List of unique {"title", "url", "query", "aliases"} dicts
+    """
+    if not queries:
+        return []
+
+    def run_query(query):
+        print(f"Searching query: {query}")
+        try:
+            return search_web(query, num_results=num_results, provider=provider, hedge=hedge)
+        except Exception as e:
+            print(f"Error searching '{query}': {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        results_per_query = list(executor.map(run_query, queries))
+
+    all_results = []
+    for query, search_results in zip(queries, results_per_query):
+        for r in search_results:
+            if r.get("url"):
+                all_results.append({
+                    "title": r.get("title", "No title"),
+                    "url": r["url"],
+                    "query": query  # Track which query found this
+                })
+
+    # Variants of the same page (http/https, www., utm_*, AMP, mobile) count once
+    unique = url_normalizer.collapse_duplicates(all_results)
+    if len(unique) < len(all_results):
+        print(f"Collapsed {len(all_results) - len(unique)} duplicate URL variants")
+    return unique
 
 
 def generate_search_queries(topic: str, num_queries: int = 3):
@@ -267,20 +512,9 @@ Just the raw search query text on each line."""
     return queries[:num_queries]
 
 
-def score_result_relevance(topic: str, title: str, url: str) -> dict:
-    """
-    Use OpenAI to score how relevant a search result is to the topic.
-    Returns a dict with score (0-100) and reasoning.
-    """
-    prompt = f"""You are evaluating the relevance of a search result for a research topic.
-
-Research Topic: {topic}
-
-Search Result:
-Title: {title}
-URL: {url}
+SCORING_SYSTEM_PROMPT = "You are an expert research evaluator who assesses source quality and relevance."
 
-Evaluate this search result on a scale of 0-100 based on:
+SCORING_RUBRIC = """Evaluate {target} on a scale of 0-100 based on:
 1. Relevance to the topic (0-40 points)
 2. Likely quality and authority (0-30 points)
 3. Depth and comprehensiveness (0-30 points)
@@ -288,73 +522,496 @@ Evaluate this search result on a scale of 0-100 based on:
 Consider:
 - Is this likely to be authoritative? (educational sites, research, official docs = higher)
 - Does it appear to be in-depth? (guides, papers, documentation = higher)
-- Is it likely spam or low-quality? (random blogs, ads, listicles = lower)
+- Is it likely spam or low-quality? (random blogs, ads, listicles = lower)"""
+
+
+def _single_score_request(topic: str, title: str, url: str) -> dict:
+    """Chat completion kwargs for scoring one result"""
+    prompt = f"""You are evaluating the relevance of a search result for a research topic.
+
+Research Topic: {topic}
+
+Search Result:
+Title: {title}
+URL: {url}
+
+{SCORING_RUBRIC.format(target="this search result")}
 
 Respond with ONLY a JSON object in this exact format:
 {{"score": 85, "reasoning": "Brief explanation"}}"""
 
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": SCORING_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.3,  # Lower for more consistent scoring
+        "max_tokens": 150
+    }
+
+
+def _batch_score_request(topic: str, results: list) -> dict:
+    """Chat completion kwargs for scoring several results in one call"""
+    listing = "\n".join(
+        f"{i}. Title: {r.get('title', 'No title')}\n   URL: {r.get('url', '')}"
+        for i, r in enumerate(results, 1)
+    )
+
+    prompt = f"""You are evaluating the relevance of search results for a research topic.
+
+Research Topic: {topic}
+
+Search Results:
+{listing}
+
+{SCORING_RUBRIC.format(target="EACH search result")}
+
+Respond with ONLY a JSON array containing one object per result, in this exact format:
+[{{"index": 1, "score": 85, "reasoning": "Brief explanation"}}, {{"index": 2, "score": 40, "reasoning": "Brief explanation"}}]"""
+
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": SCORING_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.3,
+        "max_tokens": 60 * len(results) + 50
+    }
+
+
+def _parse_single_score(text: str) -> dict:
+    result = json.loads(text)
+    return {
+        "score": result.get("score", 50),
+        "reasoning": result.get("reasoning", "")
+    }
+
+
+def score_result_relevance(topic: str, title: str, url: str) -> dict:
+    """
+    Use OpenAI to score how relevant a search result is to the topic.
+    Returns a dict with score (0-100) and reasoning.
+    """
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert research evaluator who assesses source quality and relevance."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Lower for more consistent scoring
-            max_tokens=150
-        )
+        response = client.chat.completions.create(**_single_score_request(topic, title, url))
+        return _parse_single_score(response.choices[0].message.content)
+    except Exception as e:
+        print(f"Error scoring result: {e}")
+        return {"score": 50, "reasoning": "Unable to score"}
 
-        import json
-        result = json.loads(response.choices[0].message.content)
-        return {
-            "score": result.get("score", 50),
-            "reasoning": result.get("reasoning", "")
-        }
+
+# Results sent per chat completion in batched scoring (1 = one call per result)
+SCORING_BATCH_SIZE = int(os.environ.get("SCORING_BATCH_SIZE", 10))
+
+
+def _parse_batch_scores(text: str, count: int) -> dict:
+    """
+    Parse a batch scoring response into {index: {"score", "reasoning"}}.
+
+    Raises ValueError if the response isn't a JSON array covering every index.
+    """
+    text = text.strip()
+    # Tolerate ```json fences around the array
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+
+    items = json.loads(text)
+    if isinstance(items, dict):
+        items = items.get("results") or items.get("scores") or []
+    if not isinstance(items, list):
+        raise ValueError("Batch response is not a JSON array")
+
+    scores = {}
+    for item in items:
+        index = int(item["index"])
+        if 1 <= index <= count:
+            scores[index] = {
+                "score": max(0, min(100, int(item.get("score", 50)))),
+                "reasoning": item.get("reasoning", "")
+            }
+
+    if len(scores) != count:
+        raise ValueError(f"Batch response scored {len(scores)} of {count} results")
+    return scores
+
+
+def score_results_batch(topic: str, results: list) -> list:
+    """
+    Score several search results in a single chat completion.
+
+    Sends numbered title/URL pairs with one copy of the rubric and expects a
+    JSON array of {index, score, reasoning}. If the response can't be parsed,
+    the batch is split in half and each half retried; single results fall
+    back to score_result_relevance().
+
+    Returns a list of {"score", "reasoning"} dicts aligned with `results`.
+    """
+    if not results:
+        return []
+    if len(results) == 1:
+        r = results[0]
+        return [score_result_relevance(topic, r.get('title', 'No title'), r.get('url', ''))]
+
+    try:
+        response = client.chat.completions.create(**_batch_score_request(topic, results))
+        scores = _parse_batch_scores(response.choices[0].message.content, len(results))
+        return [scores[i] for i in range(1, len(results) + 1)]
+    except Exception as e:
+        mid = len(results) // 2
+        print(f"Batch of {len(results)} failed ({e}), retrying as {mid} + {len(results) - mid}")
+        return score_results_batch(topic, results[:mid]) + score_results_batch(topic, results[mid:])
+
+
+# ---------- EMBEDDING SCORING ----------
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Cosine similarities mapped linearly onto the relevance part of the score
+# (text-embedding-3-small puts unrelated text around 0.1-0.2, close matches 0.6+)
+EMBEDDING_SIM_LOW = float(os.environ.get("EMBEDDING_SIM_LOW", 0.15))
+EMBEDDING_SIM_HIGH = float(os.environ.get("EMBEDDING_SIM_HIGH", 0.65))
+
+# Max inputs per embeddings request (API limit is 2048)
+EMBEDDING_BATCH_LIMIT = 2048
+
+
+def _embed_texts(texts: list) -> dict:
+    """Embed texts, serving repeats from the on-disk cache; one API call per 2048 new texts"""
+    unique = list(dict.fromkeys(texts))
+    vectors = embedding_cache.get_embeddings(EMBEDDING_MODEL, unique)
+    missing = [t for t in unique if t not in vectors]
+
+    if missing:
+        print(f"Embedding {len(missing)} texts ({len(vectors)} cached)...")
+        fresh = {}
+        for start in range(0, len(missing), EMBEDDING_BATCH_LIMIT):
+            chunk = missing[start:start + EMBEDDING_BATCH_LIMIT]
+            response = client.embeddings.create(model=EMBEDDING_MODEL, input=chunk)
+            for text, item in zip(chunk, response.data):
+                fresh[text] = np.asarray(item.embedding, dtype=np.float32)
+        embedding_cache.save_embeddings(EMBEDDING_MODEL, fresh)
+        vectors.update(fresh)
+
+    return vectors
+
+
+def score_results_embedding(topic: str, results: list) -> list:
+    """
+    Score search results by embedding similarity to the topic.
+
+    The topic and all result title/URL texts are embedded in a single batched
+    embeddings call (cached texts are skipped), compared by cosine similarity
+    and mapped to 0-70 relevance points; up to 30 authority points come from
+    the local scorer's domain priors, mirroring the LLM rubric.
+
+    Returns a list of {"score", "reasoning"} dicts aligned with `results`.
+    """
+    if not results:
+        return []
+
+    texts = [f"{r.get('title', '')}\n{r.get('url', '')}" for r in results]
+    try:
+        vectors = _embed_texts([topic] + texts)
+    except Exception as e:
+        print(f"Error embedding results: {e}")
+        return [{"score": 50, "reasoning": "Unable to score"} for _ in results]
+
+    topic_vector = vectors[topic]
+    matrix = np.vstack([vectors[t] for t in texts])
+    similarity = matrix @ topic_vector / (
+        np.linalg.norm(matrix, axis=1) * np.linalg.norm(topic_vector) + 1e-9
+    )
+
+    relevance = np.clip((similarity - EMBEDDING_SIM_LOW) / (EMBEDDING_SIM_HIGH - EMBEDDING_SIM_LOW), 0, 1)
+    priors = [local_scorer.domain_prior(r.get('url', '')) for r in results]
+    authority = np.clip(15 + 0.75 * np.array([p for p, _ in priors]), 0, 30)
+    scores = np.rint(70 * relevance + authority).astype(int)
+
+    scored = []
+    for i, (points, label) in enumerate(priors):
+        reasoning = f"Semantic similarity {similarity[i]:.2f}"
+        if label:
+            reasoning += f", {label} {points:+d}"
+        scored.append({"score": int(scores[i]), "reasoning": reasoning})
+    return scored
+
+
+# ---------- ASYNC SCORING ENGINE ----------
+# Max scoring requests in flight at once, and an approximate token budget
+# (prompt + completion) per minute so bursts stay under the account's TPM limit
+SCORING_MAX_IN_FLIGHT = int(os.environ.get("SCORING_MAX_IN_FLIGHT", 8))
+SCORING_TOKENS_PER_MINUTE = int(os.environ.get("SCORING_TOKENS_PER_MINUTE", 150000))
+
+
+class TokenRateLimiter:
+    """Token bucket for tokens-per-minute limits, shared by the coroutines of one run"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = max(1, tokens_per_minute)
+        self.tokens = float(self.capacity)
+        self.refill_per_second = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.refill_per_second)
+
+
+def _estimate_tokens(request: dict) -> int:
+    """Rough token count for a request (~4 chars per token) plus its completion budget"""
+    chars = sum(len(m["content"]) for m in request["messages"])
+    return chars // 4 + request["max_tokens"]
+
+
+async def _complete_async(async_client, request: dict, semaphore, limiter) -> str:
+    await limiter.acquire(_estimate_tokens(request))
+    async with semaphore:
+        response = await async_client.chat.completions.create(**request)
+    return response.choices[0].message.content
+
+
+async def _score_one_async(async_client, topic: str, result: dict, semaphore, limiter) -> dict:
+    try:
+        request = _single_score_request(topic, result.get('title', 'No title'), result.get('url', ''))
+        return _parse_single_score(await _complete_async(async_client, request, semaphore, limiter))
     except Exception as e:
         print(f"Error scoring result: {e}")
         return {"score": 50, "reasoning": "Unable to score"}
 
 
-def filter_results_by_quality(topic: str, results: list, min_score: int = 60, max_to_score: int = 30) -> list:
+async def _score_batch_async(async_client, topic: str, results: list, semaphore, limiter) -> list:
+    """Async score_results_batch(): same split-and-retry, halves run concurrently"""
+    if len(results) == 1:
+        return [await _score_one_async(async_client, topic, results[0], semaphore, limiter)]
+
+    try:
+        text = await _complete_async(async_client, _batch_score_request(topic, results), semaphore, limiter)
+        scores = _parse_batch_scores(text, len(results))
+        return [scores[i] for i in range(1, len(results) + 1)]
+    except Exception as e:
+        mid = len(results) // 2
+        print(f"Batch of {len(results)} failed ({e}), retrying as {mid} + {len(results) - mid}")
+        first, second = await asyncio.gather(
+            _score_batch_async(async_client, topic, results[:mid], semaphore, limiter),
+            _score_batch_async(async_client, topic, results[mid:], semaphore, limiter)
+        )
+        return first + second
+
+
+async def score_results_async(topic: str, results: list, batch_size: int = None,
+                              max_in_flight: int = None, tokens_per_minute: int = None,
+                              async_client=None) -> list:
     """
-    Filter search results using AI to remove low-quality sources.
+    Score results concurrently with AsyncOpenAI.
 
-    Args:
-        topic: Research topic
-        results: List of search results with 'title' and 'url'
-        min_score: Minimum relevance score (0-100) to keep
-        max_to_score: Maximum number of results to score (to prevent timeouts)
+    Results are chunked into batches of `batch_size` (1 = one result per
+    request) and all chunks are scored concurrently, with at most
+    `max_in_flight` requests outstanding and a tokens-per-minute budget.
+    Pass `async_client` to reuse one client across calls on the same event
+    loop (the caller closes it); otherwise one is created for this call.
 
-    Returns:
-        Filtered list with scores added
+    Returns a list of {"score", "reasoning"} dicts aligned with `results`.
     """
-    filtered = []
+    if not results:
+        return []
+    if batch_size is None:
+        batch_size = SCORING_BATCH_SIZE
+    batch_size = max(1, batch_size)
 
-    # Limit how many we score to prevent timeouts
-    results_to_score = results[:max_to_score]
-    remaining_results = results[max_to_score:]
+    semaphore = asyncio.Semaphore(max(1, max_in_flight or SCORING_MAX_IN_FLIGHT))
+    limiter = TokenRateLimiter(tokens_per_minute or SCORING_TOKENS_PER_MINUTE)
 
-    print(f"Scoring {len(results_to_score)} sources (limit: {max_to_score})...")
+    # The async client's connection pool is bound to this event loop
+    owns_client = async_client is None
+    if owns_client:
+        async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    try:
+        chunks = [results[i:i + batch_size] for i in range(0, len(results), batch_size)]
+        chunk_scores = await asyncio.gather(*[
+            _score_batch_async(async_client, topic, chunk, semaphore, limiter) for chunk in chunks
+        ])
+    finally:
+        if owns_client:
+            await async_client.close()
 
-    for i, result in enumerate(results_to_score, 1):
-        title = result.get('title', 'No title')
-        url = result.get('url', '')
+    return [score for chunk in chunk_scores for score in chunk]
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion from sync code, even inside a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Called from an async route - run on a fresh loop in a helper thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def _score_with_cache(topic: str, results: list, batch_size: int, use_cache: bool = True,
+                            async_client=None) -> list:
+    """Serve cross-session cached scores first, then score the rest with the async engine"""
+    # Cache lookups hit SQLite (and the embeddings API for similar topics), so run them off the loop
+    cached = await asyncio.to_thread(score_cache.lookup_scores, topic, results, _embed_texts) if use_cache else {}
+    to_score = [r for i, r in enumerate(results) if i not in cached]
+
+    if cached:
+        print(f"Score cache: {len(cached)} cached, {len(to_score)} to score")
+
+    fresh = await score_results_async(topic, to_score, batch_size=batch_size, async_client=async_client)
+    if use_cache:
+        await asyncio.to_thread(score_cache.store_scores, topic, to_score, fresh, _embed_texts)
+
+    fresh_iter = iter(fresh)
+    return [cached[i] if i in cached else next(fresh_iter) for i in range(len(results))]
+
+
+# ---------- CASCADED SCORING ----------
+# Local scores in [LOW, HIGH) are "uncertain" and escalated to the LLM scorer;
+# below LOW is confidently junk, HIGH and above confidently good
+SCORING_CASCADE = os.environ.get("SCORING_CASCADE", "1") == "1"
+SCORING_CASCADE_LOW = int(os.environ.get("SCORING_CASCADE_LOW", 40))
+SCORING_CASCADE_HIGH = int(os.environ.get("SCORING_CASCADE_HIGH", 80))
+
+# ---------- EARLY-TERMINATING TOP-K ----------
+# With top_k set, candidates are LLM-scored best-prior-first in waves of this size
+SCORING_WAVE_SIZE = int(os.environ.get("SCORING_WAVE_SIZE", 10))
+# How far an LLM score may land above a candidate's local prior; bounds what
+# an unscored candidate could still reach when deciding whether to stop
+SCORING_TOPK_MARGIN = int(os.environ.get("SCORING_TOPK_MARGIN", 20))
 
-        print(f"[{i}/{len(results_to_score)}] Scoring: {title[:50]}...")
 
-        # Score the result
-        score_data = score_result_relevance(topic, title, url)
+def _top_k_settled(confirmed: list, top_k: int, next_prior) -> bool:
+    """True once top_k confirmed scores exist that the next candidate can't beat"""
+    if len(confirmed) < top_k:
+        return False
+    if next_prior is None:
+        return True
+    kth_best = sorted(confirmed, reverse=True)[top_k - 1]
+    return min(100, next_prior + SCORING_TOPK_MARGIN) <= kth_best
+
+
+async def _score_in_waves(topic: str, results: list, candidates: list, priors: list, limit: int,
+                          batch_size: int, use_cache: bool, min_score: int, top_k: int,
+                          confirmed: list, metrics: dict) -> dict:
+    """
+    LLM-score results[i] for i in candidates, at most `limit` of them.
+
+    Without top_k everything is scored in one go (in candidate order). With
+    top_k, candidates are scored best-prior-first in waves of SCORING_WAVE_SIZE,
+    stopping once top_k results at or above min_score are confirmed (including
+    the ones passed in via `confirmed`) and no remaining candidate could
+    displace them.
+
+    Returns {index: score dict} for the candidates that were scored.
+    """
+    if top_k:
+        candidates = sorted(candidates, key=lambda i: priors[i], reverse=True)
+    candidates = candidates[:limit]
+    wave_size = SCORING_WAVE_SIZE if top_k else max(len(candidates), 1)
+
+    scored = {}
+    waves = 0
+    position = 0
+    # One client (and connection pool) for every wave
+    async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    try:
+        while position < len(candidates):
+            if top_k and _top_k_settled(confirmed, top_k, priors[candidates[position]]):
+                break
+            wave = candidates[position:position + wave_size]
+            position += len(wave)
+            waves += 1
+
+            wave_scores = await _score_with_cache(topic, [results[i] for i in wave], batch_size,
+                                                  use_cache=use_cache, async_client=async_client)
+            for i, score in zip(wave, wave_scores):
+                scored[i] = dict(score, stage='llm')
+                if score['score'] >= min_score:
+                    confirmed.append(score['score'])
+    finally:
+        await async_client.close()
+
+    if top_k:
+        skipped = len(candidates) - position
+        metrics.update({'waves': waves, 'stopped_early': skipped > 0, 'skipped': skipped})
+        if skipped:
+            print(f"Top-{top_k} settled after {waves} wave(s); skipped {skipped} candidates")
+    return scored
+
+
+async def _score_cascade(topic: str, results: list, max_to_score: int, batch_size: int,
+                         use_cache: bool, queries: list, min_score: int, top_k: int,
+                         metrics: dict) -> list:
+    """
+    Score every result locally, then send only the uncertain band to the LLM.
+
+    At most max_to_score results are escalated; uncertain results that are
+    not escalated keep their local score.
+    """
+    scores = local_scorer.score_results_local(topic, results, queries)
+    for score in scores:
+        score['stage'] = 'local'
+
+    priors = [s['score'] for s in scores]
+    uncertain = [i for i, p in enumerate(priors) if SCORING_CASCADE_LOW <= p < SCORING_CASCADE_HIGH]
+    # Confidently good local scores already count towards the top-k
+    confirmed = [p for p in priors if p >= SCORING_CASCADE_HIGH and p >= min_score]
+
+    print(f"Cascade: {len(results) - len(uncertain)} decided locally, "
+          f"{len(uncertain)} uncertain (band {SCORING_CASCADE_LOW}-{SCORING_CASCADE_HIGH})")
+
+    llm_scores = await _score_in_waves(topic, results, uncertain, priors, max_to_score, batch_size,
+                                       use_cache, min_score, top_k, confirmed, metrics)
+    for i, score in llm_scores.items():
+        scores[i] = score
+
+    # Only fresh LLM scores cost anything; score cache hits are counted separately
+    cache_hits = sum(1 for score in llm_scores.values() if score.get('cached'))
+    escalated = len(llm_scores) - cache_hits
+    metrics.update({
+        'cascade_band': [SCORING_CASCADE_LOW, SCORING_CASCADE_HIGH],
+        'uncertain': len(uncertain),
+        'escalated': escalated,
+        'escalated_fraction': escalated / len(results) if results else 0.0,
+        'cache_hits': cache_hits
+    })
+    score_cache.record_cascade(local=len(results) - len(llm_scores), escalated=escalated)
+    return scores
+
+
+def _apply_scores(results_to_score: list, scores: list, remaining_results: list, min_score: int) -> list:
+    """Attach scores, drop results below min_score, append unscored results, sort"""
+    filtered = []
+
+    for i, (result, score_data) in enumerate(zip(results_to_score, scores), 1):
+        title = result.get('title', 'No title')
 
         # Add score to result
         result['relevance_score'] = score_data['score']
         result['score_reasoning'] = score_data['reasoning']
+        if score_data.get('stage'):
+            result['score_stage'] = score_data['stage']
+        if score_data.get('cached'):
+            result['score_cached'] = True
+            result['score_age_days'] = score_data['age_days']
 
         # Keep if meets threshold
         if score_data['score'] >= min_score:
             filtered.append(result)
-            print(f"  ✓ Score {score_data['score']}: KEEP")
+            print(f"  [{i}] ✓ Score {score_data['score']}: KEEP - {title[:50]}")
         else:
-            print(f"  ✗ Score {score_data['score']}: FILTERED OUT")
+            print(f"  [{i}] ✗ Score {score_data['score']}: FILTERED OUT - {title[:50]}")
 
     # Add remaining unscored results without filtering (they won't have scores)
     if remaining_results:
@@ -367,6 +1024,133 @@ def filter_results_by_quality(topic: str, results: list, min_score: int = 60, ma
     return filtered
 
 
+async def filter_results_by_quality_async(topic: str, results: list, min_score: int = 60,
+                                          max_to_score: int = 30, batch_size: int = None,
+                                          use_cache: bool = True, scorer: str = "llm",
+                                          queries: list = None, cascade: bool = None,
+                                          top_k: int = None, metrics: dict = None) -> list:
+    """
+    Async version of filter_results_by_quality() for use inside async routes.
+    """
+    if metrics is None:
+        metrics = {}
+    metrics.update({'scorer': scorer, 'total': len(results), 'escalated': 0, 'escalated_fraction': 0.0})
+    started = time.time()
+
+    if scorer == "local":
+        # Free and fast enough to rank every result, so max_to_score doesn't apply
+        print(f"Scoring {len(results)} sources locally...")
+        filtered = _apply_scores(results, local_scorer.score_results_local(topic, results, queries), [], min_score)
+
+    elif scorer == "embedding":
+        # One embeddings call covers every result, so max_to_score doesn't apply
+        print(f"Scoring {len(results)} sources by embedding similarity...")
+        # Blocking embeddings request (and cache reads), so keep it off the event loop
+        scores = await asyncio.to_thread(score_results_embedding, topic, results)
+        filtered = _apply_scores(results, scores, [], min_score)
+
+    else:
+        if batch_size is None:
+            batch_size = SCORING_BATCH_SIZE
+        if cascade is None:
+            cascade = SCORING_CASCADE
+
+        if cascade:
+            scores = await _score_cascade(topic, results, max_to_score, batch_size, use_cache, queries,
+                                          min_score, top_k, metrics)
+            filtered = _apply_scores(results, scores, [], min_score)
+        elif top_k:
+            # Best local prior first, stopping once the top-k is settled
+            priors = [s['score'] for s in local_scorer.score_results_local(topic, results, queries)]
+            print(f"Scoring up to {min(max_to_score, len(results))} sources for the top {top_k} "
+                  f"(waves of {SCORING_WAVE_SIZE}, batch size: {batch_size})...")
+
+            scored = await _score_in_waves(topic, results, list(range(len(results))), priors, max_to_score,
+                                           batch_size, use_cache, min_score, top_k, [], metrics)
+            order = sorted(range(len(results)), key=lambda i: priors[i], reverse=True)
+            results_to_score = [results[i] for i in order if i in scored]
+            remaining_results = [results[i] for i in order if i not in scored]
+            fresh = sum(1 for score in scored.values() if not score.get('cached'))
+            metrics.update({
+                'escalated': fresh,
+                'escalated_fraction': fresh / len(results) if results else 0.0,
+                'cache_hits': len(scored) - fresh
+            })
+            filtered = _apply_scores(results_to_score, [scored[i] for i in order if i in scored],
+                                     remaining_results, min_score)
+        else:
+            # Limit how many we score to prevent timeouts
+            results_to_score = results[:max_to_score]
+            remaining_results = results[max_to_score:]
+
+            print(f"Scoring {len(results_to_score)} sources (limit: {max_to_score}, batch size: {batch_size}, "
+                  f"max in flight: {SCORING_MAX_IN_FLIGHT})...")
+
+            scores = await _score_with_cache(topic, results_to_score, batch_size, use_cache=use_cache)
+            fresh = sum(1 for score in scores if not score.get('cached'))
+            metrics.update({
+                'escalated': fresh,
+                'escalated_fraction': fresh / len(results) if results else 0.0,
+                'cache_hits': len(scores) - fresh
+            })
+            filtered = _apply_scores(results_to_score, scores, remaining_results, min_score)
+
+    metrics['kept'] = len(filtered)
+    metrics['seconds'] = round(time.time() - started, 2)
+    return filtered
+
+
+def filter_results_by_quality(topic: str, results: list, min_score: int = 60, max_to_score: int = 30,
+                              batch_size: int = None, use_cache: bool = True, scorer: str = "llm",
+                              queries: list = None, cascade: bool = None, top_k: int = None,
+                              metrics: dict = None) -> list:
+    """
+    Filter search results using AI to remove low-quality sources.
+
+    With the LLM scorer and cascade enabled (default SCORING_CASCADE), every
+    result is first scored locally; only results in the uncertain band
+    (SCORING_CASCADE_LOW..SCORING_CASCADE_HIGH) are escalated to the LLM,
+    up to max_to_score of them. Without the cascade, the first max_to_score
+    results are LLM-scored and the rest appended unscored.
+
+    With top_k (typically max_sources), LLM scoring streams in waves ordered
+    by the local score and stops as soon as top_k results at or above
+    min_score are confirmed and no remaining candidate could displace them,
+    so good topics cost roughly top_k scores instead of max_to_score.
+
+    Cached scores from earlier sessions (see score_cache.py) are used first;
+    the rest are scored concurrently on the async scoring engine
+    (see score_results_async()). scorer="local" ranks every result with the
+    zero-cost local scorer instead (see local_scorer.py), and
+    scorer="embedding" ranks every result by embedding similarity
+    (see score_results_embedding()).
+
+    Args:
+        topic: Research topic
+        results: List of search results with 'title' and 'url'
+        min_score: Minimum relevance score (0-100) to keep
+        max_to_score: Maximum number of results to score with the LLM (to prevent timeouts)
+        batch_size: Results per scoring request (default SCORING_BATCH_SIZE, 1 = unbatched)
+        use_cache: Reuse scores from earlier sessions
+        scorer: "llm" (AI scoring), "embedding" (one embeddings call) or
+                "local" (BM25 + domain priors, no API calls)
+        queries: Generated search queries, used as extra match terms by the local scorer
+        cascade: Pre-filter with the local scorer before LLM scoring
+        top_k: Stop LLM scoring early once this many keepers are settled
+        metrics: Optional dict filled with scoring metrics (total, escalated
+                 (fresh LLM scores), escalated_fraction, cache_hits, kept,
+                 seconds; waves, stopped_early and skipped with top_k)
+
+    Returns:
+        Filtered list with scores added
+    """
+    return _run_coroutine(filter_results_by_quality_async(
+        topic, results, min_score=min_score, max_to_score=max_to_score,
+        batch_size=batch_size, use_cache=use_cache, scorer=scorer, queries=queries,
+        cascade=cascade, top_k=top_k, metrics=metrics
+    ))
+
+
 def summarize_content(topic: str, content: str, url: str) -> str:
     """
     Use OpenAI to create a concise summary of scraped content.
@@ -454,52 +1238,387 @@ Output exactly 3 search queries, one per line, with NO bullets, numbers, or extr
         return []
 
 
-def fetch_and_clean(url: str, max_chars: int = 15000):
+# ---------- PAGE FETCHING ----------
+# Max simultaneous page downloads overall (per-host limits, delays and timeouts: host_scheduler.py)
+FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", 8))
+
+# Bodies are streamed and cut off after this many bytes
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", 2 * 1024 * 1024))
+# Content types worth downloading (a missing Content-Type is allowed through)
+FETCH_ALLOWED_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+_http_session = None
+_fetch_lock = threading.Lock()
+
+# Politeness, circuit breaker and adaptive timeouts per host
+fetch_scheduler = host_scheduler.HostScheduler(
+    failure_types=(requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+
+def get_http_session():
+    """Shared requests.Session with a keep-alive connection pool sized for FETCH_CONCURRENCY"""
+    global _http_session
+    with _fetch_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=FETCH_CONCURRENCY,
+                                                    pool_maxsize=FETCH_CONCURRENCY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(FETCH_HEADERS)
+            _http_session = session
+        return _http_session
+
+
+class _RejectedContent(Exception):
+    """A page that isn't worth downloading (wrong Content-Type)"""
+
+
+# Failures where the page may still exist, so a stored copy is worth serving
+_NETWORK_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                   requests.exceptions.ChunkedEncodingError, host_scheduler.HostUnavailable)
+
+
+def _decode_body(body: bytes, content_type: str) -> str:
+    """Decode a (possibly truncated) body: header charset, then <meta charset>, then UTF-8"""
+    encoding = 'utf-8'
+    match = re.search(r'charset=["\']?([\w-]+)', content_type or '', re.I)
+    if match:
+        encoding = match.group(1)
+    else:
+        meta = re.search(rb'<meta[^>]+charset=["\']?([\w-]+)', body[:4096], re.I)
+        if meta:
+            encoding = meta.group(1).decode('ascii')
+    try:
+        return body.decode(encoding, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+def _download(url: str, headers: dict = None):
+    """
+    Stream a page with a hard byte cap.
+
+    The Content-Type is checked from the response headers before any of the
+    body is read; non-HTML responses are closed unread. Bodies longer than
+    FETCH_MAX_BYTES are cut off (the tail would be truncated away anyway).
+
+    Runs in a fetch_scheduler slot: per-host concurrency cap and spacing,
+    a timeout adapted to the host's recent latency, and a fast failure
+    (host_scheduler.HostUnavailable) while the host's circuit is open.
+
+    Returns (response, text); text is None for a 304 Not Modified.
+    Raises on HTTP errors, timeouts and rejected content types.
+    """
+    with fetch_scheduler.slot(url) as timeout:
+        resp = get_http_session().get(url, timeout=timeout, headers=headers or {}, stream=True)
+        try:
+            if resp.status_code == 304:
+                return resp, None
+            resp.raise_for_status()
+
+            content_type = resp.headers.get('Content-Type', '')
+            mime = content_type.split(';')[0].strip().lower()
+            if mime and mime not in FETCH_ALLOWED_TYPES:
+                raise _RejectedContent(f"skipping non-HTML content ({mime})")
+
+            body = bytearray()
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                body.extend(chunk)
+                if len(body) >= FETCH_MAX_BYTES:
+                    print(f"  Capped download at {FETCH_MAX_BYTES // 1024} KB: {url}")
+                    del body[FETCH_MAX_BYTES:]
+                    break
+        finally:
+            resp.close()
+
+    return resp, _decode_body(bytes(body), content_type)
+
+
+def fetch_and_clean(url: str, max_chars: int = 15000, use_cache: bool = True,
+                    mode: str = None, stats: dict = None):
     """
     Download a page and extract readable text.
     This is simple and not perfect, but good enough for a first version.
+
+    Pages are served from the page cache (see page_cache.py) while fresh,
+    skipping both the download and HTML parsing; stale entries are
+    revalidated with If-None-Match / If-Modified-Since. Every fetched body
+    is also recorded in the blob store's URL index (see blob_store.py). If
+    the host can't be reached, the stale entry or that stored copy is used
+    instead; HTTP errors and rejected content types return "".
+
+    mode="main" keeps only the main article instead of every heading and
+    paragraph (see content_extractor.py, default EXTRACTION_MODE). Pass a
+    dict as `stats` to get the full and kept sizes in bytes.
     """
+    mode = content_extractor.resolve_mode(mode)
+    use_cache = use_cache and page_cache.PAGE_CACHE_ENABLED
+    cached = page_cache.get_page(url) if use_cache else None
+    if cached and cached['fresh']:
+        print(f"Fetching: {url} (cached)")
+        return _select_content(url, cached['content'], _cached_main_content(url, cached, mode),
+                               mode, max_chars, stats)
+
+    headers = {}
+    if cached:
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
     try:
-        print(f"Fetching: {url}")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        resp = requests.get(url, timeout=15, headers=headers)
-        resp.raise_for_status()
+        print(f"Fetching: {url}" + (" (revalidating)" if headers else ""))
+        resp, html = _download(url, headers)
+    except _NETWORK_ERRORS as e:
+        print(f"Error fetching {url}: {e}")
+        return _offline_fallback(url, cached, mode, max_chars, stats) if use_cache else ""
     except Exception as e:
         print(f"Error fetching {url}: {e}")
         return ""
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # Remove script/style/nav/footer, etc.
-    for tag in soup(["script", "style", "nav", "header", "footer", "noscript", "svg", "form"]):
-        tag.decompose()
+    if html is None:
+        if not cached:
+            return ""
+        page_cache.mark_revalidated(url)
+        blob_store.put_url(url, cached['content'])
+        return _select_content(url, cached['content'], _cached_main_content(url, cached, mode),
+                               mode, max_chars, stats)
+
+    content = extract_content(html, mode="all")
+    main_content = extract_content(html, mode="main") if mode == "main" else None
+    if use_cache:
+        page_cache.save_page(url, html, content,
+                             etag=resp.headers.get('ETag'),
+                             last_modified=resp.headers.get('Last-Modified'),
+                             main_content=main_content)
+    blob_store.put_url(url, content)
+    return _select_content(url, content, main_content, mode, max_chars, stats)
+
+
+def _offline_fallback(url: str, cached, mode: str, max_chars: int, stats: dict) -> str:
+    """Content for a host that couldn't be reached: the stale cache entry, else the blob store's last copy"""
+    if cached:
+        print(f"  Using stale cached copy of {url}")
+        return _select_content(url, cached['content'], _cached_main_content(url, cached, mode),
+                               mode, max_chars, stats)
+    stored = blob_store.get_url(url)
+    if not stored:
+        return ""
+    print(f"  Using stored copy of {url}")
+    return _select_content(url, stored, stored, mode, max_chars, stats)
+
+
+def _cached_main_content(url: str, cached: dict, mode: str):
+    """Main-article content of a cached page, extracting (and caching) it from the raw body if needed"""
+    if mode != "main":
+        return None
+    if cached['main_content'] is None:
+        raw = page_cache.get_raw(url)
+        cached['main_content'] = extract_content(raw, mode="main") if raw else cached['content']
+        page_cache.save_main_content(url, cached['main_content'])
+    return cached['main_content']
+
+
+def _select_content(url: str, content: str, main_content, mode: str, max_chars: int, stats: dict) -> str:
+    """Pick the content for the mode, report the bytes saved, and truncate"""
+    chosen = main_content if mode == "main" else content
+    full_bytes = len(content.encode('utf-8'))
+    kept_bytes = len(chosen.encode('utf-8'))
+
+    if mode == "main" and full_bytes:
+        print(f"  Main content: kept {kept_bytes / 1024:.1f} KB of {full_bytes / 1024:.1f} KB "
+              f"({(full_bytes - kept_bytes) / full_bytes:.0%} saved) - {url}")
+    if stats is not None:
+        stats.update({
+            'mode': mode,
+            'full_bytes': full_bytes,
+            'bytes': kept_bytes,
+            'saved_bytes': full_bytes - kept_bytes
+        })
+    return truncate_content(chosen, max_chars)
+
+
+def extract_content(html: str, max_chars: int = None, backend: str = None, mode: str = None) -> str:
+    """
+    Turn raw page HTML into the simplified <h3>/<p> body used in the PDF.
 
-    # Basic heuristic: join all <p> and <h1-3> text
-    parts = []
-    for el in soup.find_all(["h1", "h2", "h3", "p", "li"]):
-        text = el.get_text(" ", strip=True)
-        if not text:
-            continue
+    backend picks the parser and mode "all" or "main" content
+    (see content_extractor.py, defaults EXTRACTION_BACKEND / EXTRACTION_MODE).
+    """
+    return truncate_content(content_extractor.extract_content(html, backend, mode), max_chars)
 
-        if el.name.startswith("h"):
-            parts.append(f"<h3>{text}</h3>")
-        elif el.name in ["p", "li"]:
-            parts.append(f"<p>{text}</p>")
 
-    content = "\n".join(parts)
-    # Truncate to avoid huge PDFs
-    if len(content) > max_chars:
+def truncate_content(content: str, max_chars: int = None) -> str:
+    """Truncate cleaned content to avoid huge PDFs (max_chars=None keeps it all)"""
+    if max_chars is not None and len(content) > max_chars:
         content = content[:max_chars] + "<p>[Truncated]</p>"
-
     return content
 
 
-def build_html_document(topic: str, sources: list):
+def _fetch_after_prefetch(url: str, max_chars: int, mode: str, stats: dict) -> str:
+    _join_prefetch(url)
+    return fetch_and_clean(url, max_chars, mode=mode, stats=stats)
+
+
+def fetch_pages_parallel(urls: list, max_chars: int = 15000, max_workers: int = None,
+                         mode: str = None, stats: dict = None, on_progress=None) -> list:
+    """
+    Fetch and clean several pages concurrently on the shared HTTP session.
+
+    At most max_workers (default FETCH_CONCURRENCY) downloads run at once, and
+    per-host politeness is enforced by fetch_scheduler. A URL whose prefetch
+    is already running (see prefetch_pages()) is waited for instead of
+    downloaded twice. Results keep the order of `urls`, so source numbering in the PDF
+    is stable; pages that fail or come back empty are dropped.
+
+    Args:
+        urls: Page URLs to fetch
+        max_chars: Per-page content limit (see fetch_and_clean())
+        max_workers: Global concurrency limit
+        mode: "all" or "main" content (see fetch_and_clean())
+        stats: Optional dict filled with {url: size stats} for each fetched page
+        on_progress: Optional callback(pages_done, total) called as each page finishes
+
+    Returns:
+        List of (url, content_html) tuples
+    """
+    if not urls:
+        return []
+
+    workers = min(max_workers or FETCH_CONCURRENCY, len(urls))
+    page_stats = [{} for _ in urls]
+    started = time.time()
+    done = [0]
+    progress_lock = threading.Lock()
+
+    def fetch(url, st):
+        try:
+            return _fetch_after_prefetch(url, max_chars, mode, st)
+        finally:
+            if on_progress:
+                with progress_lock:
+                    done[0] += 1
+                    on_progress(done[0], len(urls))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as executor:
+        contents = list(executor.map(fetch, urls, page_stats))
+
+    sources = [(url, content) for url, content in zip(urls, contents) if content]
+    print(f"✓ Fetched {len(sources)}/{len(urls)} pages in {time.time() - started:.1f}s ({workers} workers)")
+    if stats is not None:
+        stats.update({url: st for url, st, content in zip(urls, page_stats, contents) if content})
+    return sources
+
+
+# ---------- SPECULATIVE PREFETCH ----------
+# While the user picks sources, warm the page cache with the likely picks
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_MAX_URLS = int(os.environ.get("PREFETCH_MAX_URLS", 12))
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", 4))
+# How long a real fetch waits for an in-flight prefetch of the same URL
+PREFETCH_JOIN_TIMEOUT = float(os.environ.get("PREFETCH_JOIN_TIMEOUT", 30))
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_prefetch_jobs = {}      # job key -> {url: Future}
+_prefetch_inflight = {}  # canonical URL -> Future
+_prefetch_lock = threading.Lock()
+
+
+def pick_prefetch_urls(urls: list, max_urls: int = None) -> list:
+    """
+    URLs worth prefetching from a sources list (sorted best first):
+    the pre-checked ones (preferred, or top 10 not rejected, minus known
+    duplicates), then the highest-scored of the rest.
+    """
+    max_urls = max_urls or PREFETCH_MAX_URLS
+    prechecked = [u['url'] for i, u in enumerate(urls)
+                  if (u.get('is_preferred') or (i < 10 and not u.get('is_rejected'))) and not u.get('duplicate_of')]
+    rest = sorted((u for u in urls if u['url'] not in prechecked
+                   and not u.get('is_rejected') and not u.get('duplicate_of')),
+                  key=lambda u: u.get('relevance_score', 0), reverse=True)
+    return (prechecked + [u['url'] for u in rest])[:max_urls]
+
+
+def prefetch_pages(job_key, urls: list):
+    """
+    Start fetching pages into the page cache in the background (returns immediately).
+
+    job_key identifies the research session so the job can be cancelled with
+    cancel_prefetch(); starting a new job for the same key cancels the old one.
+    """
+    if not PREFETCH_ENABLED or not page_cache.PAGE_CACHE_ENABLED or not urls:
+        return
+    cancel_prefetch(job_key)
+
+    def warm(url):
+        try:
+            fetch_and_clean(url)
+        finally:
+            with _prefetch_lock:
+                _prefetch_inflight.pop(url_normalizer.url_key(url), None)
+
+    futures = {}
+    with _prefetch_lock:
+        for url in urls:
+            key = url_normalizer.url_key(url)
+            if key in _prefetch_inflight:
+                continue
+            future = _prefetch_executor.submit(warm, url)
+            futures[url] = future
+            _prefetch_inflight[key] = future
+        _prefetch_jobs[job_key] = futures
+    print(f"Prefetching {len(futures)} sources in the background")
+
+
+def cancel_prefetch(job_key):
+    """
+    Cancel a prefetch job's queued fetches; running ones finish.
+
+    Queued fetches of sources the user did pick are cancelled too: the real
+    fetch downloads them straight away rather than waiting in the prefetch queue.
+    """
+    with _prefetch_lock:
+        futures = _prefetch_jobs.pop(job_key, {})
+        cancelled = 0
+        for url, future in futures.items():
+            # Skips fetches already cancelled by _join_prefetch()
+            if not future.done() and future.cancel():
+                _prefetch_inflight.pop(url_normalizer.url_key(url), None)
+                cancelled += 1
+    if cancelled:
+        print(f"Cancelled {cancelled} queued prefetches")
+
+
+def _join_prefetch(url: str):
+    """
+    Wait for a running prefetch of this URL so the real fetch hits the cache.
+    A prefetch still queued is cancelled instead, and the caller fetches the page itself.
+    """
+    key = url_normalizer.url_key(url)
+    with _prefetch_lock:
+        future = _prefetch_inflight.get(key)
+        if future is not None and future.cancel():
+            _prefetch_inflight.pop(key, None)
+            return
+    if future is not None:
+        try:
+            future.result(timeout=PREFETCH_JOIN_TIMEOUT)
+        except Exception:
+            pass
+
+
+def build_html_document(topic: str, sources: list, duplicates: dict = None):
     """
     sources: list of (url, html_body_str)
+    duplicates: optional {url: [(duplicate_url, similarity), ...]} of mirrors
+                merged into a source (see content_dedupe.dedupe_sources())
     """
+    duplicates = duplicates or {}
     html_parts = [
         "<html>",
         "<head>",
@@ -525,15 +1644,77 @@ def build_html_document(topic: str, sources: list):
         html_parts.append("<hr/>")
         html_parts.append(f"<h2>Source {i}</h2>")
         html_parts.append(f"<div class='source-url'>{url}</div>")
+        if duplicates.get(url):
+            mirrors = ", ".join(dup_url for dup_url, _ in duplicates[url])
+            html_parts.append(f"<div class='source-url'>Also published at: {mirrors}</div>")
         html_parts.append(body_html)
 
     html_parts.append("</body></html>")
     return "\n".join(html_parts)
 
 
-def html_to_pdf(html_str: str, output_path: str):
-    HTML(string=html_str).write_pdf(output_path)
-    print(f"Saved PDF to: {output_path}")
+# ---------- PDF BACKENDS ----------
+# "weasyprint" (full CSS layout), "text" (text_pdf.py: headings and paragraphs
+# only, much faster and smaller) or "auto" (text for large documents it can
+# lay out); see tests/benchmark_pdf_backends.py
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "weasyprint")
+PDF_BACKENDS = ("weasyprint", "text", "auto")
+PDF_AUTO_TEXT_MIN_CHARS = int(os.environ.get("PDF_AUTO_TEXT_MIN_CHARS", 250000))
+
+
+def resolve_pdf_backend(backend: str = None, html_str: str = None) -> str:
+    """Pick "weasyprint" or "text" for a document"""
+    backend = (backend or PDF_BACKEND).lower()
+    if backend == "auto":
+        large = html_str is not None and len(html_str) >= PDF_AUTO_TEXT_MIN_CHARS
+        return "text" if large and text_pdf.supports(html_str) else "weasyprint"
+    if backend not in PDF_BACKENDS:
+        print(f"Unknown PDF backend '{backend}', using weasyprint")
+        return "weasyprint"
+    return backend
+
+
+def html_to_pdf(html_str: str, output_path: str, backend: str = None):
+    backend = resolve_pdf_backend(backend, html_str)
+    # Both backends run in a worker process (see render_service.py)
+    if backend == "text":
+        render_service.run(text_pdf.write_pdf, html_str, output_path)
+    else:
+        render_service.render_pdf(html_str, output_path)
+    print(f"Saved PDF to: {output_path} ({backend})")
+
+
+def build_pack_pdf(topic: str, sources: list, output_path: str, duplicates: dict = None,
+                   on_progress=None, backend: str = None) -> dict:
+    """
+    Render a research pack to a PDF file.
+
+    With WeasyPrint, sources are rendered as cached per-source fragments and
+    merged (see pdf_fragments.py), so a regenerated pack only renders new
+    sources; without pypdf the whole document is rendered at once. The text
+    backend always renders the whole document.
+
+    Returns:
+        {"backend", "fragments", "cached", "rendered", "pages"} (pages is
+        None for whole-document renders)
+    """
+    html_doc = None
+    if (backend or PDF_BACKEND).lower() != "weasyprint":
+        html_doc = build_html_document(topic, sources, duplicates)
+        backend = resolve_pdf_backend(backend, html_doc)
+    else:
+        backend = "weasyprint"
+
+    if backend == "weasyprint" and pdf_fragments.available():
+        stats = pdf_fragments.build_pack(topic, sources, output_path, duplicates, on_progress)
+        print(f"Saved PDF to: {output_path}")
+        return {'backend': backend, **stats}
+    if backend == "weasyprint" and pdf_fragments.PdfWriter is None:
+        print("⚠️  pypdf is not installed; rendering the whole pack without the fragment cache "
+              "(pip install pypdf)")
+
+    html_to_pdf(html_doc or build_html_document(topic, sources, duplicates), output_path, backend)
+    return {'backend': backend, 'fragments': len(sources), 'cached': 0, 'rendered': len(sources), 'pages': None}
 
 
 def main():
@@ -566,25 +1747,23 @@ def main():
         print(" -", u)
 
     # Fetch content
-    sources = []
-    for u in urls:
-        content_html = fetch_and_clean(u)
-        if content_html:
-            sources.append((u, content_html))
+    sources = fetch_pages_parallel(urls)
 
     if not sources:
         print("No content fetched, exiting.")
         return
 
-    # Build HTML + convert to PDF
-    html_doc = build_html_document(topic, sources)
+    # Syndicated copies of the same article only need to be in the pack once
+    sources, duplicates = content_dedupe.dedupe_sources(sources)
+
+    # Render to PDF
     safe_topic = "".join(c for c in topic if c.isalnum() or c in (" ", "_", "-")).strip()
     if not safe_topic:
         safe_topic = "research"
     output_pdf = f"{safe_topic.replace(' ', '_')}.pdf"
 
     print("\nConverting to PDF with WeasyPrint...")
-    html_to_pdf(html_doc, output_pdf)
+    build_pack_pdf(topic, sources, output_pdf, duplicates)
 
     print("\nDone!")
     print("You can now upload that PDF into NotebookLM (or your favorite LLM notebook)")
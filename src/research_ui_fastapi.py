@@ -3,8 +3,9 @@ FastAPI-based Research UI Application
 Migrated from Flask with identical functionality
 """
 from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, JSONResponse
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.concurrency import run_in_threadpool
 import os
 import secrets
 import json
@@ -13,11 +14,18 @@ from typing import Optional, List
 from research_to_pdf import (
     generate_search_queries,
     search_web,
+    search_queries_parallel,
     fetch_and_clean,
-    build_html_document,
-    html_to_pdf
+    pick_prefetch_urls,
+    prefetch_pages,
+    cancel_prefetch
 )
 import database as db
+import score_cache
+import content_dedupe
+import blob_store
+import pdf_jobs
+import render_service
 import memory_layer as mem
 import ai_assistant as ai
 import ai_research_agent as ai_agent
@@ -35,6 +43,12 @@ async def startup_event():
     db.init_database()
     print("FastAPI startup complete")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop PDF render worker processes
+    render_service.shutdown()
+
 # User ID tracking for mem0
 def get_user_id(request: Request) -> str:
     """Get or create user ID for memory tracking"""
@@ -438,6 +452,16 @@ async def index(request: Request):
                     </select>
                 </div>
 
+                <div style="margin: 15px 0;">
+                    <label style="display: block; margin-bottom: 5px; font-weight: 600;">Search Provider:</label>
+                    <select name="search_provider" style="width: 100%; padding: 8px; border: 2px solid #ddd; border-radius: 4px; font-size: 14px;">
+                        <option value="" selected>Default (configured provider chain)</option>
+                        <option value="duckduckgo">DuckDuckGo (free)</option>
+                        <option value="tavily">Tavily (needs TAVILY_API_KEY)</option>
+                        <option value="serpapi">SerpAPI (needs SERPAPI_API_KEY)</option>
+                    </select>
+                </div>
+
                 <div style="margin: 15px 0;">
                     <label style="display: block; margin-bottom: 5px; font-weight: 600;">Query Focus:</label>
                     <select name="query_focus" style="width: 100%; padding: 8px; border: 2px solid #ddd; border-radius: 4px; font-size: 14px;">
@@ -457,6 +481,8 @@ async def index(request: Request):
                         <select name="ai_enhancement" style="width: 100%; padding: 8px; border: 2px solid #ddd; border-radius: 4px; font-size: 14px;">
                             <option value="none">None (Fastest, free search only)</option>
                             <option value="basic" selected>Basic (AI query generation only)</option>
+                            <option value="fast">Fast Scoring (free local ranking of all sources)</option>
+                            <option value="semantic">Semantic Scoring (embeddings, ranks all sources)</option>
                             <option value="quality">Quality Filtering (AI scores sources)</option>
                             <option value="premium">Premium (AI scoring + summaries)</option>
                         </select>
@@ -532,7 +558,8 @@ async def start_research(
     query_focus: str = Form("balanced"),
     ai_enhancement: str = Form("basic"),
     min_quality_score: int = Form(60),
-    max_to_score: int = Form(30)
+    max_to_score: int = Form(30),
+    search_provider: str = Form("")
 ):
     """Route research to either AI Agent or Web Search based on mode"""
     topic = topic.strip()
@@ -556,6 +583,7 @@ async def start_research(
         request.session['ai_enhancement'] = ai_enhancement
         request.session['min_quality_score'] = min_quality_score
         request.session['max_to_score'] = max_to_score
+        request.session['search_provider'] = search_provider
         return await generate_queries(request)
 
 
@@ -853,7 +881,8 @@ async def generate_queries_post(
     query_focus: str = Form("balanced"),
     ai_enhancement: str = Form("basic"),
     min_quality_score: int = Form(60),
-    max_to_score: int = Form(30)
+    max_to_score: int = Form(30),
+    search_provider: str = Form("")
 ):
     """POST handler for generate queries"""
     request.session['topic'] = topic.strip()
@@ -864,6 +893,7 @@ async def generate_queries_post(
     request.session['ai_enhancement'] = ai_enhancement
     request.session['min_quality_score'] = min_quality_score
     request.session['max_to_score'] = max_to_score
+    request.session['search_provider'] = search_provider
     return await generate_queries(request)
 
 
@@ -909,6 +939,7 @@ async def search_route(request: Request):
     ai_enhancement = request.session.get('ai_enhancement', 'basic')
     min_quality_score = request.session.get('min_quality_score', 60)
     max_to_score = request.session.get('max_to_score', 30)
+    search_provider = request.session.get('search_provider') or None
 
     print(f"Selected queries: {len(selected_queries)}")
     print(f"AI mode: {ai_enhancement}")
@@ -929,34 +960,33 @@ async def search_route(request: Request):
         db.save_queries(session_id, all_queries, selected_queries)
 
     try:
-        # Search across selected queries
-        all_results = []
-        seen_urls = set()
-
+        # Search across selected queries (concurrently, deduplicated)
         print(f"\nSearching {len(selected_queries)} selected queries...")
 
-        for query in selected_queries:
-            print(f"Searching query: {query}")
-            search_results = search_web(query, num_results=results_per_query)
-
-            for r in search_results:
-                url = r.get("url")
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    all_results.append({
-                        "title": r.get("title", "No title"),
-                        "url": url,
-                        "query": query
-                    })
+        all_results = await run_in_threadpool(search_queries_parallel, selected_queries,
+                                              num_results=results_per_query, provider=search_provider)
 
         print(f"\nFound {len(all_results)} unique results")
 
         # Apply AI quality filtering if enabled
+        scoring_metrics = {}
         if ai_enhancement in ['quality', 'premium']:
-            from research_to_pdf import filter_results_by_quality
+            from research_to_pdf import filter_results_by_quality_async
             print(f"\nApplying AI quality filtering...")
-            all_results = filter_results_by_quality(topic, all_results, min_score=min_quality_score, max_to_score=max_to_score)
-            print(f"Filtered to {len(all_results)} results")
+            all_results = await filter_results_by_quality_async(topic, all_results, min_score=min_quality_score,
+                                                                max_to_score=max_to_score, top_k=max_sources,
+                                                                queries=selected_queries, metrics=scoring_metrics)
+        elif ai_enhancement == 'fast':
+            from research_to_pdf import filter_results_by_quality_async
+            print(f"\nApplying local relevance ranking...")
+            all_results = await filter_results_by_quality_async(topic, all_results, min_score=min_quality_score,
+                                                                scorer='local', queries=selected_queries)
+        elif ai_enhancement == 'semantic':
+            from research_to_pdf import filter_results_by_quality_async
+            print(f"\nApplying embedding relevance scoring...")
+            all_results = await filter_results_by_quality_async(topic, all_results, min_score=min_quality_score,
+                                                                scorer='embedding')
+        print(f"Filtered to {len(all_results)} results")
 
         # Limit to configured max sources
         urls = all_results[:max_sources]
@@ -965,11 +995,19 @@ async def search_route(request: Request):
         user_id = get_user_id(request)
         urls = ai.highlight_preferred_sources(user_id, urls)
 
+        # Flag results already known (from earlier sessions) to mirror a higher-ranked one
+        urls = content_dedupe.mark_known_duplicates(urls)
+
         # Save sources to database
         if session_id:
             db.save_sources(session_id, urls)
 
         request.session['urls'] = urls
+        request.session['scoring_metrics'] = scoring_metrics
+
+        # Warm the page cache with the likely picks while the user is choosing
+        if session_id:
+            prefetch_pages(session_id, pick_prefetch_urls(urls))
 
         # Count preferred sources
         preferred_count = sum(1 for u in urls if u.get('is_preferred'))
@@ -990,12 +1028,23 @@ async def search_route(request: Request):
             is_rejected = url_data.get('is_rejected', False)
             preference_note = url_data.get('preference_note', '')
 
-            checked = 'checked' if (is_preferred or (i < 10 and not is_rejected)) else ''
+            duplicate_of = url_data.get('duplicate_of')
+            checked = 'checked' if (is_preferred or (i < 10 and not is_rejected)) and not duplicate_of else ''
             border_color = '#4caf50' if is_preferred else ('#f44336' if is_rejected else '#ddd')
             bg_color = '#f1f8f4' if is_preferred else ('#fff5f5' if is_rejected else '#fff')
             query_display = query_source if len(query_source) <= 60 else query_source[:57] + "..."
+            aliases = url_data.get('aliases') or []
+            aliases_note = f" &middot; {len(aliases)} URL variant{'s' if len(aliases) != 1 else ''} merged" if aliases else ''
+            duplicate_html = f'''
+                        <div style="font-size: 11px; color: #b26a00; margin-top: 3px;">
+                            Same article as {duplicate_of} (seen in an earlier session)
+                        </div>''' if duplicate_of else ''
 
             score_html = ''
+            cached_html = ''
+            if url_data.get('score_cached'):
+                cached_html = f' <span style="color: #888;">(cached score, {url_data.get("score_age_days", 0)} days old)</span>'
+
             if relevance_score is not None:
                 if relevance_score >= 80:
                     score_color, score_badge = '#4caf50', 'G'
@@ -1008,7 +1057,7 @@ async def search_route(request: Request):
 
                 score_html = f'''
                 <div style="margin-top: 8px; padding: 8px; background: #f5f5f5; border-radius: 4px; font-size: 12px;">
-                    <strong style="color: {score_color};">[{score_badge}] AI Quality Score: {relevance_score}/100</strong>
+                    <strong style="color: {score_color};">[{score_badge}] AI Quality Score: {relevance_score}/100</strong>{cached_html}
                     <div style="color: #666; margin-top: 4px; font-style: italic;">{score_reasoning}</div>
                 </div>'''
 
@@ -1027,8 +1076,8 @@ async def search_route(request: Request):
                             </a>
                         </div>
                         <div style="font-size: 11px; color: #888; font-style: italic;">
-                            Found by: {query_display}
-                        </div>
+                            Found by: {query_display}{aliases_note}
+                        </div>{duplicate_html}
                         {score_html}
                     </div>
                 </div>
@@ -1045,11 +1094,16 @@ async def search_route(request: Request):
             <strong>{rejected_count} sources from domains you typically skip</strong>
         </div>''' if rejected_count > 0 else ''
 
+        cascade_html = f'''
+        <p style="color: #666; font-size: 13px;">Cascade: {scoring_metrics['escalated']}/{scoring_metrics['total']} sources
+        ({scoring_metrics['escalated_fraction']:.0%}) escalated to AI scoring, {scoring_metrics.get('cache_hits', 0)} from the score cache, the rest ranked locally{'; top sources settled early' if scoring_metrics.get('stopped_early') else ''}</p>''' if 'cascade_band' in scoring_metrics else ''
+
         content = f'''
         <h2>Step 3: Select Sources</h2>
         <p><strong>Topic:</strong> {topic}</p>
         <p><strong>Searched:</strong> {len(selected_queries)} queries</p>
         <p>Found <strong>{len(urls)}</strong> unique sources. Select which ones to include:</p>
+        {cascade_html}
 
         {preferred_html}
         {rejected_html}
@@ -1069,6 +1123,15 @@ async def search_route(request: Request):
         <form method="POST" action="/generate_pdf">
             {sources_html}
 
+            <div style="margin-top: 20px;">
+                <label style="display: block; margin-bottom: 5px; font-weight: 600;">PDF Layout:</label>
+                <select name="pdf_backend" style="padding: 8px; border: 2px solid #ddd; border-radius: 4px; font-size: 14px;">
+                    <option value="weasyprint">Full layout (styled, slower)</option>
+                    <option value="text">Text only (fast, small file)</option>
+                    <option value="auto">Automatic (text only for large packs)</option>
+                </select>
+            </div>
+
             <div style="margin-top: 20px;">
                 <button type="submit">Generate PDF</button>
                 <button type="button" class="secondary" onclick="window.location.href='/'">Start Over</button>
@@ -1100,13 +1163,14 @@ async def search_route(request: Request):
         return render_template(content)
 
 
-@app.post("/generate_pdf", response_class=HTMLResponse)
+@app.post("/generate_pdf")
 async def generate_pdf(request: Request):
-    """Generate PDF from selected sources"""
+    """Queue PDF generation for the selected sources and send the user to the job page"""
     form_data = await request.form()
     selected_urls = form_data.getlist('selected_urls')
 
     topic = request.session.get('topic', 'research')
+    session_id = request.session.get('session_id')
 
     if not selected_urls:
         content = '''
@@ -1116,165 +1180,236 @@ async def generate_pdf(request: Request):
         return render_template(content)
 
     request.session['selected_urls'] = selected_urls
-
-    content = f'''
-    <h2>Step 4: Generating PDF</h2>
-    <p><strong>Topic:</strong> {topic}</p>
-    <p><strong>Sources:</strong> {len(selected_urls)}</p>
-
-    <div class="progress">
-        <div class="progress-bar" style="width: 10%;">Starting...</div>
-    </div>
-
-    <div id="status">Fetching content...</div>
-
-    <meta http-equiv="refresh" content="2;url=/generate_pdf_process?urls={len(selected_urls)}">
-    '''
-
-    return render_template(content)
-
-
-@app.get("/generate_pdf_process", response_class=HTMLResponse)
-async def generate_pdf_process(request: Request):
-    """Process PDF generation"""
-    topic = request.session.get('topic', 'research')
-    selected_urls = request.session.get('selected_urls', [])
-    session_id = request.session.get('session_id')
-
-    if not selected_urls:
-        return RedirectResponse(url="/", status_code=303)
+    user_id = get_user_id(request)
+    all_urls = request.session.get('urls', [])
 
     # Update database with final selected URLs
     if session_id:
-        all_urls = request.session.get('urls', [])
         db.save_sources(session_id, all_urls, selected_urls)
 
         # Track source preferences in mem0
-        user_id = get_user_id(request)
         for url_data in all_urls:
             if url_data['url'] in selected_urls:
                 mem.add_source_preference(user_id, url_data, "selected", topic)
 
-    try:
-        sources = []
-        for url in selected_urls:
-            content_html = fetch_and_clean(url)
-            if content_html:
-                sources.append((url, content_html))
-
-        if not sources:
-            content = '''
-            <div class="error">No content could be fetched. Please try different sources.</div>
-            <button onclick="window.location.href='/'">Start Over</button>
-            '''
-            return render_template(content)
-
-        # Build PDF
-        html_doc = build_html_document(topic, sources)
-        safe_topic = "".join(c for c in topic if c.isalnum() or c in (" ", "_", "-")).strip()
-        if not safe_topic:
-            safe_topic = "research"
-        output_pdf = f"{safe_topic.replace(' ', '_')}.pdf"
-
-        html_to_pdf(html_doc, output_pdf)
-
-        # Mark session as completed
+        # Stop queued prefetches; the job joins the ones already running
+        cancel_prefetch(session_id)
+
+    # The job runs outside this request, so capture what the memory write needs now
+    session_data = {
+        'session_id': session_id,
+        'topic': topic,
+        'ai_mode': request.session.get('ai_enhancement', 'basic'),
+        'query_focus': request.session.get('query_focus', 'balanced'),
+        'num_queries': request.session.get('num_queries', 0),
+        'total_sources': len(all_urls),
+        'top_queries': request.session.get('selected_queries', [])[:3],
+        'min_quality_score': request.session.get('min_quality_score', 60)
+    }
+
+    def on_complete(result):
         if session_id:
-            db.mark_session_complete(session_id)
-
-            # Add to mem0 memory
-            user_id = get_user_id(request)
-            mem.add_research_memory(
-                user_id=user_id,
-                session_data={
-                    'session_id': session_id,
-                    'topic': topic,
-                    'date': datetime.now().isoformat(),
-                    'ai_mode': request.session.get('ai_enhancement', 'basic'),
-                    'query_focus': request.session.get('query_focus', 'balanced'),
-                    'num_queries': request.session.get('num_queries', 0),
-                    'total_sources': len(request.session.get('urls', [])),
-                    'selected_sources': len(sources),
-                    'top_queries': request.session.get('selected_queries', [])[:3],
-                    'min_quality_score': request.session.get('min_quality_score', 60)
-                }
-            )
-
-        request.session['pdf_path'] = output_pdf
-        request.session['source_count'] = len(sources)
-
-        # Get personalized completion insights
-        user_id = get_user_id(request)
-        completion_insights = ai.generate_personalized_summary(user_id, {
+            mem.add_research_memory(user_id=user_id, session_data={
+                **session_data,
+                'date': datetime.now().isoformat(),
+                'selected_sources': result['sources']
+            })
+        # Computed once and stored with the job, so reloading the result page costs nothing
+        result['insights'] = ai.generate_personalized_summary(user_id, {
             'topic': topic,
-            'selected_sources': len(sources),
-            'total_sources': len(request.session.get('urls', []))
+            'selected_sources': result['sources'],
+            'total_sources': session_data['total_sources']
         })
-        next_research = ai.suggest_next_research(user_id)
-        coaching_tips = ai.get_ai_coaching(user_id, 'complete')
-
-        insights_html = ''
-        if completion_insights:
-            insights_html = '''
-            <div style="background: #e3f2fd; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #2196f3;">
-                <strong>Your Research Insights:</strong>
-                <ul style="margin: 8px 0 0 0; padding-left: 20px; font-size: 14px;">''' + chr(10).join([f'<li>{insight}</li>' for insight in completion_insights]) + '''
-                </ul>
-            </div>'''
-
-        next_html = ''
-        if next_research:
-            next_html = f'''
-            <div style="background: #e8f5e9; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #4caf50;">
-                <strong>Suggested Next Research:</strong>
-                <p style="margin: 8px 0 0 0; font-size: 14px;">{next_research}</p>
-            </div>'''
+        result['next_research'] = ai.suggest_next_research(user_id)
+        result['coaching_tips'] = ai.get_ai_coaching(user_id, 'complete')
 
-        content = f'''
-        <h2>Success!</h2>
+    job_id = pdf_jobs.submit(topic, selected_urls, session_id, on_complete,
+                             backend=form_data.get('pdf_backend'))
+    request.session['pdf_job_id'] = job_id
+    return RedirectResponse(url=f"/jobs/{job_id}", status_code=303)
 
-        <div class="success">
-            Your research PDF has been generated successfully!
-        </div>
 
-        <p><strong>Topic:</strong> {topic}</p>
-        <p><strong>Sources included:</strong> {len(sources)}</p>
-        <p><strong>Filename:</strong> <code>{output_pdf}</code></p>
+@app.get("/generate_pdf_process")
+async def generate_pdf_process(request: Request):
+    """Old progress URL: send bookmarks and reloads to the current job"""
+    job_id = request.session.get('pdf_job_id')
+    return RedirectResponse(url=f"/jobs/{job_id}" if job_id else "/", status_code=303)
 
-        {insights_html}
-        {next_html}
 
-        <div style="background: #fff3cd; padding: 12px 15px; border-radius: 6px; margin-bottom: 20px; border-left: 4px solid #ffc107;">
-            <strong>What's Next:</strong>
-            <ul style="margin: 8px 0 0 0; padding-left: 20px; font-size: 14px;">
-                {chr(10).join([f'<li>{tip}</li>' for tip in coaching_tips])}
-            </ul>
-        </div>
+@app.get("/jobs/{job_id}/status")
+async def pdf_job_status(job_id: str):
+    """Job status as JSON, polled by the job page"""
+    status = pdf_jobs.get_status(job_id)
+    if not status:
+        return JSONResponse({'error': 'Job not found'}, status_code=404)
+    return status
 
-        <div style="margin: 20px 0;">
-            <button onclick="window.location.href='/download?file={output_pdf}'">Download PDF</button>
-            <button class="secondary" onclick="window.location.href='/'">Research Another Topic</button>
-        </div>
 
-        <div class="next-steps">
-            <h3>Next Steps:</h3>
-            <ul>
-                <li><strong>Upload to NotebookLM:</strong> Go to <a href="https://notebooklm.google.com" target="_blank">notebooklm.google.com</a></li>
-                <li><strong>Generate audio summaries:</strong> Let NotebookLM create podcast-style explanations</li>
-                <li><strong>Ask questions:</strong> Chat with your research content</li>
-            </ul>
-        </div>
+@app.get("/jobs/{job_id}", response_class=HTMLResponse)
+async def pdf_job(request: Request, job_id: str):
+    """Progress page for a PDF job; becomes the result page once the job finishes"""
+    job = pdf_jobs.get_status(job_id)
+    if not job:
+        content = '''
+        <div class="error">PDF job not found.</div>
+        <button onclick="window.location.href='/'">Start Over</button>
         '''
-
         return render_template(content)
 
-    except Exception as e:
+    topic = job['topic']
+
+    if job['status'] == 'failed':
         content = f'''
-        <div class="error">Error generating PDF: {str(e)}</div>
+        <div class="error">Error generating PDF: {job['error']}</div>
         <button onclick="window.location.href='/'">Start Over</button>
         '''
         return render_template(content)
 
+    if job['status'] != 'done':
+        stage_items = ''.join(
+            f'<li id="stage-{stage["name"]}">{stage["label"]}: <span>{stage["status"]}</span></li>'
+            for stage in job['stages']
+        )
+        content = f'''
+        <h2>Step 4: Generating PDF</h2>
+        <p><strong>Topic:</strong> {topic}</p>
+        <p><strong>Sources:</strong> {job['sources']}</p>
+
+        <div class="progress">
+            <div class="progress-bar" id="job-progress" style="width: {job['progress']:.0%};">{job['progress']:.0%}</div>
+        </div>
+
+        <div id="status">Estimated time left: <span id="job-eta">calculating...</span></div>
+        <ul id="job-stages" style="font-size: 14px;">{stage_items}</ul>
+        <p style="font-size: 13px; color: #666;">You can leave or reload this page; the PDF keeps being generated.</p>
+
+        <script>
+        function pollJob() {{
+            fetch('/jobs/{job_id}/status').then(r => r.json()).then(job => {{
+                if (job.status === 'done' || job.status === 'failed') {{
+                    window.location.reload();
+                    return;
+                }}
+                const bar = document.getElementById('job-progress');
+                bar.style.width = Math.round(job.progress * 100) + '%';
+                bar.textContent = Math.round(job.progress * 100) + '%';
+                document.getElementById('job-eta').textContent =
+                    job.eta_seconds === null ? 'calculating...' : job.eta_seconds + 's';
+                job.stages.forEach(stage => {{
+                    const count = stage.total > 1 ? ' (' + stage.done + '/' + stage.total + ')' : '';
+                    document.querySelector('#stage-' + stage.name + ' span').textContent = stage.status + count;
+                }});
+                setTimeout(pollJob, 1000);
+            }}).catch(() => setTimeout(pollJob, 3000));
+        }}
+        pollJob();
+        </script>
+        '''
+        return render_template(content)
+
+    result = job['result']
+    output_pdf = job['output_pdf']
+    source_count = result['sources']
+
+    duplicates_html = ''
+    if result['duplicates']:
+        merged_items = ''.join(
+            f'<li>{dup_url} ({similarity:.0%} similar to {url})</li>'
+            for url, dup_url, similarity in result['duplicates']
+        )
+        duplicates_html = f'''
+        <p><strong>Duplicate sources merged:</strong> {len(result['duplicates'])}</p>
+        <ul style="font-size: 13px; color: #666;">{merged_items}</ul>'''
+
+    # Report how much main-content extraction trimmed
+    full_bytes = result['full_bytes']
+    saved_bytes = result['saved_bytes']
+    extraction_html = ''
+    if saved_bytes > 0:
+        extraction_html = f'''
+        <p><strong>Main-content extraction:</strong> kept {(full_bytes - saved_bytes) / 1024:.0f} KB of
+        {full_bytes / 1024:.0f} KB ({saved_bytes / full_bytes:.0%} boilerplate removed)</p>'''
+
+    # Sources already rendered for an earlier pack (see pdf_fragments.py)
+    fragments_html = ''
+    if result.get('cached_fragments'):
+        fragments_html = f'''
+        <p><strong>Reused renders:</strong> {result['cached_fragments']} of {source_count} sources</p>'''
+
+    # Offline rebuilds (pdf_jobs.submit_rebuild()) leave out sources with nothing stored
+    missing_html = ''
+    if result.get('missing'):
+        missing_html = f'''
+        <p><strong>Not stored (left out):</strong> {len(result['missing'])} sources</p>
+        <ul style="font-size: 13px; color: #666;">{''.join(f'<li>{url}</li>' for url in result['missing'])}</ul>'''
+
+    request.session['pdf_path'] = output_pdf
+    request.session['source_count'] = source_count
+
+    # Personalized completion insights (computed when the job finished)
+    completion_insights = result.get('insights')
+    next_research = result.get('next_research')
+    coaching_tips = result.get('coaching_tips', [])
+
+    insights_html = ''
+    if completion_insights:
+        insights_html = '''
+        <div style="background: #e3f2fd; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #2196f3;">
+            <strong>Your Research Insights:</strong>
+            <ul style="margin: 8px 0 0 0; padding-left: 20px; font-size: 14px;">''' + chr(10).join([f'<li>{insight}</li>' for insight in completion_insights]) + '''
+            </ul>
+        </div>'''
+
+    next_html = ''
+    if next_research:
+        next_html = f'''
+        <div style="background: #e8f5e9; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #4caf50;">
+            <strong>Suggested Next Research:</strong>
+            <p style="margin: 8px 0 0 0; font-size: 14px;">{next_research}</p>
+        </div>'''
+
+    content = f'''
+    <h2>Success!</h2>
+
+    <div class="success">
+        {'Rebuilt from stored content, nothing was downloaded.' if result.get('offline') else 'Your research PDF has been generated successfully!'}
+    </div>
+
+    <p><strong>Topic:</strong> {topic}</p>
+    <p><strong>Sources included:</strong> {source_count}</p>
+    {extraction_html}
+    {fragments_html}
+    {missing_html}
+    {duplicates_html}
+    <p><strong>Filename:</strong> <code>{output_pdf}</code></p>
+
+    {insights_html}
+    {next_html}
+
+    <div style="background: #fff3cd; padding: 12px 15px; border-radius: 6px; margin-bottom: 20px; border-left: 4px solid #ffc107;">
+        <strong>What's Next:</strong>
+        <ul style="margin: 8px 0 0 0; padding-left: 20px; font-size: 14px;">
+            {chr(10).join([f'<li>{tip}</li>' for tip in coaching_tips])}
+        </ul>
+    </div>
+
+    <div style="margin: 20px 0;">
+        <button onclick="window.location.href='/download?file={output_pdf}'">Download PDF</button>
+        <button class="secondary" onclick="window.location.href='/'">Research Another Topic</button>
+    </div>
+
+    <div class="next-steps">
+        <h3>Next Steps:</h3>
+        <ul>
+            <li><strong>Upload to NotebookLM:</strong> Go to <a href="https://notebooklm.google.com" target="_blank">notebooklm.google.com</a></li>
+            <li><strong>Generate audio summaries:</strong> Let NotebookLM create podcast-style explanations</li>
+            <li><strong>Ask questions:</strong> Chat with your research content</li>
+        </ul>
+    </div>
+    '''
+
+    return render_template(content)
+
 
 @app.post("/cancel_session", response_class=HTMLResponse)
 async def cancel_session_route(request: Request):
@@ -1287,6 +1422,7 @@ async def cancel_session_route(request: Request):
         sess = db.get_session_details(session_id)
         topic = sess.get('topic', 'Unknown')
         db.cancel_session(session_id)
+        cancel_prefetch(session_id)
     else:
         session_id = request.session.get('session_id')
         topic = request.session.get('topic', 'Unknown')
@@ -1294,6 +1430,7 @@ async def cancel_session_route(request: Request):
 
         if session_id:
             db.cancel_session(session_id)
+            cancel_prefetch(session_id)
 
         # Clear session data but keep user_id
         for key in list(request.session.keys()):
@@ -1439,6 +1576,12 @@ async def view_session(request: Request, session_id: int):
     else:
         status_badge = 'In Progress'
 
+    # Completed packs can be rebuilt from stored content
+    rebuild_button_html = ''
+    if completed or blob_store.has_session(session_id):
+        rebuild_button_html = f'''
+        <button class="secondary" onclick="window.location.href='/session/{session_id}/rebuild'">Rebuild PDF (offline)</button>'''
+
     queries_html = ""
     if queries:
         for query in queries:
@@ -1475,6 +1618,7 @@ async def view_session(request: Request, session_id: int):
     <div style="margin: 20px 0;">
         <button onclick="window.location.href='/history'">Back to History</button>
         <button class="secondary" onclick="window.location.href='/'">Home</button>
+        {rebuild_button_html}
     </div>
 
     <div style="background: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
@@ -1501,6 +1645,25 @@ async def view_session(request: Request, session_id: int):
     return render_template(content)
 
 
+@app.get("/session/{session_id}/rebuild")
+async def rebuild_session_pdf(request: Request, session_id: int):
+    """Queue a rebuild of a session's PDF from stored content, without any network I/O"""
+    try:
+        sess = db.get_session_details(session_id)
+    except:
+        content = '''
+        <div class="error">Session not found.</div>
+        <button onclick="window.location.href='/history'">Back to History</button>
+        '''
+        return render_template(content)
+
+    selected_urls = [s['url'] for s in sess.get('sources', []) if s.get('selected')]
+    job_id = pdf_jobs.submit_rebuild(session_id, sess['topic'], selected_urls,
+                                     backend=request.query_params.get('backend'))
+    request.session['pdf_job_id'] = job_id
+    return RedirectResponse(url=f"/jobs/{job_id}", status_code=303)
+
+
 @app.get("/mem0-monitor", response_class=HTMLResponse)
 async def mem0_monitor(request: Request):
     """Mem0 usage monitoring dashboard"""
@@ -1509,6 +1672,7 @@ async def mem0_monitor(request: Request):
     total_stats = mem.get_total_stats()
     cost_breakdown = mem.get_cost_breakdown()
     usage_stats = mem.get_usage_stats(days=7)
+    score_stats = score_cache.get_score_cache_stats()
 
     cost_html = ""
     for item in cost_breakdown:
@@ -1587,6 +1751,43 @@ async def mem0_monitor(request: Request):
         {usage_html}
     </div>
 
+    <h3>Relevance Score Cache</h3>
+    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 15px; margin: 20px 0;">
+        <div style="background: #e8f5e9; padding: 15px; border-radius: 8px; text-align: center;">
+            <div style="font-size: 32px; font-weight: 600; color: #388e3c;">{score_stats['hits'] + score_stats['semantic_hits']}</div>
+            <div style="color: #666; font-size: 13px;">Cache Hits ({score_stats['semantic_hits']} similar-topic)</div>
+        </div>
+        <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; text-align: center;">
+            <div style="font-size: 32px; font-weight: 600; color: #555;">{score_stats['hit_rate']:.1f}%</div>
+            <div style="color: #666; font-size: 13px;">Hit Rate ({score_stats['misses']} misses)</div>
+        </div>
+        <div style="background: #e3f2fd; padding: 15px; border-radius: 8px; text-align: center;">
+            <div style="font-size: 32px; font-weight: 600; color: #1976d2;">{score_stats['tokens_saved']:,}</div>
+            <div style="color: #666; font-size: 13px;">Tokens Saved (est.)</div>
+        </div>
+        <div style="background: #fce4ec; padding: 15px; border-radius: 8px; text-align: center;">
+            <div style="font-size: 32px; font-weight: 600; color: #c2185b;">${score_stats['cost_saved']:.4f}</div>
+            <div style="color: #666; font-size: 13px;">Cost Saved (est.)</div>
+        </div>
+    </div>
+    <p style="color: #666; font-size: 13px;">{score_stats['entries']} cached scores</p>
+
+    <h3>Cascaded Scoring</h3>
+    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 15px; margin: 20px 0;">
+        <div style="background: #e8f5e9; padding: 15px; border-radius: 8px; text-align: center;">
+            <div style="font-size: 32px; font-weight: 600; color: #388e3c;">{score_stats['cascade_local']}</div>
+            <div style="color: #666; font-size: 13px;">Decided Locally</div>
+        </div>
+        <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; text-align: center;">
+            <div style="font-size: 32px; font-weight: 600; color: #555;">{score_stats['escalation_rate']:.1f}%</div>
+            <div style="color: #666; font-size: 13px;">Escalated to AI ({score_stats['cascade_escalated']})</div>
+        </div>
+        <div style="background: #fce4ec; padding: 15px; border-radius: 8px; text-align: center;">
+            <div style="font-size: 32px; font-weight: 600; color: #c2185b;">${score_stats['cascade_cost_saved']:.4f}</div>
+            <div style="color: #666; font-size: 13px;">Cost Saved (est.)</div>
+        </div>
+    </div>
+
     <div style="margin-top: 20px;">
         <button onclick="window.location.href='/history'">Back to History</button>
     </div>
@@ -0,0 +1,255 @@
+"""
+Relevance Score Cache
+Reuses AI relevance scores across sessions, keyed by normalized topic + canonical URL
+Optionally reuses scores from semantically near-identical topics (embedding similarity;
+callers pass the embedder, e.g. research_to_pdf._embed_texts, which caches vectors)
+"""
+import os
+import re
+import time
+from datetime import datetime
+import numpy as np
+import database as db
+import url_normalizer
+
+# Scores older than this are re-scored
+SCORE_CACHE_MAX_AGE_DAYS = float(os.environ.get("SCORE_CACHE_MAX_AGE_DAYS", 30))
+
+# Cosine similarity above which another topic's scores are reused (0 = exact topic only)
+SCORE_CACHE_SEMANTIC_THRESHOLD = float(os.environ.get("SCORE_CACHE_SEMANTIC_THRESHOLD", 0))
+
+# Approximate cost of scoring one result with gpt-4o-mini (used for savings estimates)
+TOKENS_PER_SCORE = 400
+COST_PER_SCORE = (350 / 1_000_000) * 0.15 + (50 / 1_000_000) * 0.60
+
+
+def init_score_cache():
+    """Create score cache tables and backfill from previously scored sources"""
+    with db.get_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS score_cache (
+                topic_key TEXT NOT NULL,
+                url_key TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                reasoning TEXT,
+                scored_at REAL NOT NULL,
+                PRIMARY KEY (topic_key, url_key)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS score_cache_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hits INTEGER DEFAULT 0,
+                semantic_hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO score_cache_stats (id) VALUES (1)")
+
+        # Cascade counters were added after the table; migrate older databases
+        cursor.execute("PRAGMA table_info(score_cache_stats)")
+        columns = [col[1] for col in cursor.fetchall()]
+        for column in ('cascade_local', 'cascade_escalated'):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE score_cache_stats ADD COLUMN {column} INTEGER DEFAULT 0")
+
+        # One-time backfill: every source we've ever scored is a cache entry
+        cursor.execute("SELECT COUNT(*) FROM score_cache")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("""
+                SELECT rs.topic, rs.date, src.url, src.ai_score, src.score_reasoning
+                FROM sources src
+                JOIN research_sessions rs ON rs.id = src.session_id
+                WHERE src.ai_score IS NOT NULL
+                ORDER BY rs.date ASC
+            """)
+            rows = cursor.fetchall()
+            for row in rows:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO score_cache (topic_key, url_key, score, reasoning, scored_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (normalize_topic(row['topic']), url_normalizer.url_key(row['url']),
+                      row['ai_score'], row['score_reasoning'], _parse_timestamp(row['date'])))
+            if rows:
+                print(f"✓ Backfilled score cache with {len(rows)} previously scored sources")
+
+
+def _parse_timestamp(value) -> float:
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    topic = re.sub(r'[^\w\s]', ' ', (topic or '').lower())
+    return re.sub(r'\s+', ' ', topic).strip()
+
+
+def _similar_topic(topic_key: str, embed):
+    """Most similar previously scored topic above the semantic threshold (or None)"""
+    with db.get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT topic_key FROM score_cache WHERE topic_key != ?", (topic_key,))
+        topics = [row['topic_key'] for row in cursor.fetchall()]
+    if not topics:
+        return None
+
+    try:
+        # Scored topics were embedded when their scores were stored, so this is mostly cache reads
+        vectors = embed([topic_key] + topics)
+    except Exception as e:
+        print(f"Error embedding topic for score cache: {e}")
+        return None
+
+    matrix = np.vstack([vectors[t] for t in topics])
+    vector = vectors[topic_key]
+    similarity = matrix @ vector / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector) + 1e-9)
+    best = int(np.argmax(similarity))
+    if similarity[best] < SCORE_CACHE_SEMANTIC_THRESHOLD:
+        return None
+
+    print(f"Score cache: reusing scores from similar topic '{topics[best]}' ({similarity[best]:.3f})")
+    return topics[best]
+
+
+def _fetch_scores(cursor, topic_key: str, url_keys: list, min_scored_at: float) -> dict:
+    placeholders = ",".join("?" * len(url_keys))
+    cursor.execute(f"""
+        SELECT url_key, score, reasoning, scored_at FROM score_cache
+        WHERE topic_key = ? AND scored_at >= ? AND url_key IN ({placeholders})
+    """, (topic_key, min_scored_at, *url_keys))
+    return {row['url_key']: dict(row) for row in cursor.fetchall()}
+
+
+def lookup_scores(topic: str, results: list, embed=None) -> dict:
+    """
+    Find cached scores for search results.
+
+    `embed` (list of texts -> {text: vector}) enables reuse from similar topics
+    when SCORE_CACHE_SEMANTIC_THRESHOLD is set.
+
+    Returns {index: {"score", "reasoning", "cached": True, "age_days", "cached_topic"}}
+    for every result in `results` that has a fresh cached score.
+    """
+    if not results:
+        return {}
+
+    topic_key = normalize_topic(topic)
+    url_keys = [url_normalizer.url_key(r.get('url', '')) for r in results]
+    min_scored_at = time.time() - SCORE_CACHE_MAX_AGE_DAYS * 86400
+
+    with db.get_db() as conn:
+        rows = _fetch_scores(conn.cursor(), topic_key, url_keys, min_scored_at)
+
+    semantic_rows = {}
+    if SCORE_CACHE_SEMANTIC_THRESHOLD > 0 and embed and len(rows) < len(set(url_keys)):
+        similar = _similar_topic(topic_key, embed)
+        if similar:
+            with db.get_db() as conn:
+                semantic_rows = _fetch_scores(conn.cursor(), similar, url_keys, min_scored_at)
+            semantic_rows = {k: dict(v, cached_topic=similar) for k, v in semantic_rows.items()}
+
+    now = time.time()
+    cached = {}
+    for i, url_key in enumerate(url_keys):
+        row = rows.get(url_key) or semantic_rows.get(url_key)
+        if row:
+            cached[i] = {
+                "score": row['score'],
+                "reasoning": row['reasoning'] or "",
+                "cached": True,
+                "age_days": round((now - row['scored_at']) / 86400, 1),
+                "cached_topic": row.get('cached_topic', topic_key)
+            }
+
+    semantic_hits = sum(1 for c in cached.values() if c['cached_topic'] != topic_key)
+    _record_stats(hits=len(cached) - semantic_hits, semantic_hits=semantic_hits,
+                  misses=len(results) - len(cached))
+    return cached
+
+
+def store_scores(topic: str, results: list, scores: list, embed=None):
+    """Save freshly computed scores (skips the 'Unable to score' fallbacks)"""
+    topic_key = normalize_topic(topic)
+    now = time.time()
+
+    rows = [
+        (topic_key, url_normalizer.url_key(r.get('url', '')), s['score'], s.get('reasoning', ''), now)
+        for r, s in zip(results, scores)
+        if s.get('reasoning') != "Unable to score"
+    ]
+    if not rows:
+        return
+
+    with db.get_db() as conn:
+        conn.cursor().executemany("""
+            INSERT OR REPLACE INTO score_cache (topic_key, url_key, score, reasoning, scored_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+
+    # Embed the topic now so later similar topics find these scores in the embedding cache
+    if SCORE_CACHE_SEMANTIC_THRESHOLD > 0 and embed:
+        try:
+            embed([topic_key])
+        except Exception as e:
+            print(f"Error embedding topic for score cache: {e}")
+
+
+def _record_stats(hits=0, semantic_hits=0, misses=0):
+    with db.get_db() as conn:
+        conn.cursor().execute("""
+            UPDATE score_cache_stats
+            SET hits = hits + ?, semantic_hits = semantic_hits + ?, misses = misses + ?
+            WHERE id = 1
+        """, (hits, semantic_hits, misses))
+
+
+def record_cascade(local=0, escalated=0):
+    """Count results decided by the local pre-filter vs. escalated to the LLM"""
+    with db.get_db() as conn:
+        conn.cursor().execute("""
+            UPDATE score_cache_stats
+            SET cascade_local = cascade_local + ?, cascade_escalated = cascade_escalated + ?
+            WHERE id = 1
+        """, (local, escalated))
+
+
+def get_score_cache_stats():
+    """Hit/miss counters and estimated savings for the monitor page"""
+    with db.get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT hits, semantic_hits, misses, cascade_local, cascade_escalated
+            FROM score_cache_stats WHERE id = 1
+        """)
+        row = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM score_cache")
+        entries = cursor.fetchone()[0]
+
+    hits, semantic_hits, misses = (row['hits'], row['semantic_hits'], row['misses']) if row else (0, 0, 0)
+    cascade_local, cascade_escalated = (row['cascade_local'] or 0, row['cascade_escalated'] or 0) if row else (0, 0)
+    total_hits = hits + semantic_hits
+    lookups = total_hits + misses
+    cascaded = cascade_local + cascade_escalated
+    return {
+        'entries': entries,
+        'hits': hits,
+        'semantic_hits': semantic_hits,
+        'misses': misses,
+        'hit_rate': (total_hits / lookups * 100) if lookups > 0 else 0.0,
+        'tokens_saved': total_hits * TOKENS_PER_SCORE,
+        'cost_saved': total_hits * COST_PER_SCORE,
+        'cascade_local': cascade_local,
+        'cascade_escalated': cascade_escalated,
+        'escalation_rate': (cascade_escalated / cascaded * 100) if cascaded > 0 else 0.0,
+        'cascade_cost_saved': cascade_local * COST_PER_SCORE
+    }
+
+
+# Initialize score cache on module import
+init_score_cache()
@@ -0,0 +1,185 @@
+"""
+Search Cache Module
+Disk-backed cache for search provider results (SQLite under data/)
+Keyed by provider + normalized query + num_results, with TTL and LRU eviction
+"""
+import sqlite3
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+# Base directory for data storage
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("RESEARCH_DATA_DIR", os.path.join(BASE_DIR, 'data'))
+SEARCH_CACHE_DB = os.path.join(DATA_DIR, 'search_cache.db')
+
+# Cache settings (override via env)
+SEARCH_CACHE_TTL_SECONDS = int(os.environ.get("SEARCH_CACHE_TTL_SECONDS", 24 * 3600))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 5000))
+SEARCH_CACHE_ENABLED = os.environ.get("SEARCH_CACHE_ENABLED", "1") != "0"
+
+
+@contextmanager
+def get_cache_db():
+    """Context manager for cache database connections"""
+    conn = sqlite3.connect(SEARCH_CACHE_DB, timeout=10)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+def init_cache():
+    """Initialize search cache database with schema"""
+    os.makedirs(os.path.dirname(SEARCH_CACHE_DB), exist_ok=True)
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                provider TEXT NOT NULL,
+                query_key TEXT NOT NULL,
+                num_results INTEGER NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                hit_count INTEGER DEFAULT 0,
+                PRIMARY KEY (provider, query_key, num_results)
+            )
+        """)
+
+        # Hit/miss counters per provider
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache_stats (
+                provider TEXT PRIMARY KEY,
+                hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0,
+                evictions INTEGER DEFAULT 0
+            )
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_search_cache_accessed
+            ON search_cache(last_accessed)
+        """)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache keying (case, whitespace, trailing punctuation)"""
+    query = re.sub(r'\s+', ' ', (query or '').strip().lower())
+    return query.rstrip('?.!')
+
+
+def _bump_stat(cursor, provider, column, amount=1):
+    cursor.execute("INSERT OR IGNORE INTO search_cache_stats (provider) VALUES (?)", (provider,))
+    cursor.execute(f"UPDATE search_cache_stats SET {column} = {column} + ? WHERE provider = ?",
+                   (amount, provider))
+
+
+def get_cached_results(provider: str, query: str, num_results: int):
+    """
+    Look up cached results for a search.
+
+    An entry cached with a larger num_results also satisfies a smaller request
+    (results are sliced). Returns the result list, or None on a miss.
+    """
+    now = time.time()
+    query_key = normalize_query(query)
+
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT num_results, results FROM search_cache
+            WHERE provider = ? AND query_key = ? AND num_results >= ? AND created_at >= ?
+            ORDER BY num_results ASC
+            LIMIT 1
+        """, (provider, query_key, num_results, now - SEARCH_CACHE_TTL_SECONDS))
+        row = cursor.fetchone()
+
+        if row is None:
+            _bump_stat(cursor, provider, 'misses')
+            return None
+
+        cursor.execute("""
+            UPDATE search_cache
+            SET last_accessed = ?, hit_count = hit_count + 1
+            WHERE provider = ? AND query_key = ? AND num_results = ?
+        """, (now, provider, query_key, row['num_results']))
+        _bump_stat(cursor, provider, 'hits')
+
+        return json.loads(row['results'])[:num_results]
+
+
+def save_results(provider: str, query: str, num_results: int, results: list):
+    """Store search results and evict expired / least-recently-used entries"""
+    now = time.time()
+    query_key = normalize_query(query)
+
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO search_cache
+            (provider, query_key, num_results, results, created_at, last_accessed, hit_count)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+        """, (provider, query_key, num_results, json.dumps(results), now, now))
+
+        _evict(cursor, provider, now)
+
+
+def _evict(cursor, provider, now):
+    """Drop expired rows, then the least recently used rows above the size cap"""
+    cursor.execute("DELETE FROM search_cache WHERE created_at < ?",
+                   (now - SEARCH_CACHE_TTL_SECONDS,))
+    evicted = cursor.rowcount
+
+    cursor.execute("SELECT COUNT(*) FROM search_cache")
+    overflow = cursor.fetchone()[0] - SEARCH_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        cursor.execute("""
+            DELETE FROM search_cache WHERE rowid IN (
+                SELECT rowid FROM search_cache ORDER BY last_accessed ASC LIMIT ?
+            )
+        """, (overflow,))
+        evicted += cursor.rowcount
+
+    if evicted > 0:
+        _bump_stat(cursor, provider, 'evictions', evicted)
+
+
+def get_cache_stats():
+    """Get hit/miss counters and size of the search cache"""
+    with get_cache_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT * FROM search_cache_stats ORDER BY provider")
+        providers = [dict(row) for row in cursor.fetchall()]
+
+        cursor.execute("SELECT COUNT(*) FROM search_cache")
+        entries = cursor.fetchone()[0]
+
+    hits = sum(p['hits'] for p in providers)
+    misses = sum(p['misses'] for p in providers)
+    return {
+        'entries': entries,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': (hits / (hits + misses) * 100) if (hits + misses) > 0 else 0.0,
+        'providers': providers
+    }
+
+
+def clear_cache():
+    """Remove all cached search results (counters are kept)"""
+    with get_cache_db() as conn:
+        conn.cursor().execute("DELETE FROM search_cache")
+
+
+# Initialize cache on module import
+init_cache()
@@ -0,0 +1,244 @@
+"""
+Text PDF Module
+A small PDF writer for the text-only documents this app produces: h1-h3
+headings, paragraphs and the source URL lines of research packs. It has no
+CSS engine; text is wrapped with the standard Helvetica metrics and set in
+the PDF base fonts (nothing embedded), so large packs render in a fraction
+of WeasyPrint's time and memory and come out much smaller.
+Anything else in the HTML (lists, tables, images, styling) is reduced to
+paragraphs; supports() tells whether a document fits the subset.
+"""
+import re
+import zlib
+from html import unescape
+
+# A4 in points, 2cm margins
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 57
+FOOTER_SIZE = 8
+
+# tag: (font, size, space before, gray level)
+STYLES = {
+    "h1": ("F2", 20, 6, 0),
+    "h2": ("F2", 16, 18, 0),
+    "h3": ("F2", 13, 12, 0),
+    "p": ("F1", 10.5, 6, 0),
+    "div": ("F1", 9, 2, 0.33),
+}
+LEADING = 1.35
+
+# Tags the writer lays out; documents with other tags are still written, as plain paragraphs
+SUPPORTED_TAGS = {"html", "head", "meta", "title", "style", "body", "h1", "h2", "h3", "p", "div", "hr", "br"}
+
+# Glyph widths (1/1000 em) of ASCII 32-126 in the base fonts
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+FONTS = {"F1": ("Helvetica", _HELVETICA), "F2": ("Helvetica-Bold", _HELVETICA_BOLD)}
+
+_BLOCK_RE = re.compile(r"<(h[1-3]|p|div)\b[^>]*>(.*?)</\1\s*>|<hr\b[^>]*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+_TAG_NAME_RE = re.compile(r"<\s*([a-zA-Z][a-zA-Z0-9]*)")
+_TITLE_RE = re.compile(r"<title>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+def supports(html_str: str) -> bool:
+    """Whether the document only uses tags this writer lays out faithfully, in text the base fonts can show"""
+    if not all(tag.lower() in SUPPORTED_TAGS for tag in _TAG_NAME_RE.findall(html_str)):
+        return False
+    try:
+        # The base fonts are set in WinAnsi (cp1252); anything else would come out as "?"
+        unescape(_TAG_RE.sub(" ", html_str)).encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def parse_blocks(html_str: str) -> list:
+    """(tag, text) blocks in document order; ("hr", "") for rules"""
+    body = re.sub(r"<(head|style|script)\b.*?</\1\s*>", "", html_str, flags=re.IGNORECASE | re.DOTALL)
+    blocks = []
+    for match in _BLOCK_RE.finditer(body):
+        if match.group(1) is None:
+            blocks.append(("hr", ""))
+            continue
+        text = unescape(_TAG_RE.sub(" ", match.group(2)))
+        text = " ".join(text.split())
+        if text:
+            blocks.append((match.group(1).lower(), text))
+    return blocks
+
+
+# ---------- LAYOUT ----------
+
+def _encode(text: str) -> bytes:
+    return text.encode("cp1252", errors="replace")
+
+
+def _width(data: bytes, font: str, size: float) -> float:
+    widths = FONTS[font][1]
+    return sum(widths[c - 32] if 32 <= c <= 126 else 556 for c in data) * size / 1000
+
+
+def _wrap(text: str, font: str, size: float, max_width: float) -> list:
+    """Greedy word wrap; words longer than a line (URLs) are broken anywhere"""
+    space = _width(b" ", font, size)
+    lines, line, line_width = [], [], 0.0
+    for word in text.split(" "):
+        data = _encode(word)
+        width = _width(data, font, size)
+        while width > max_width:
+            if line:
+                lines.append(b" ".join(line))
+                line, line_width = [], 0.0
+            cut = len(data)
+            while cut > 1 and _width(data[:cut], font, size) > max_width:
+                cut -= 1
+            lines.append(data[:cut])
+            data = data[cut:]
+            width = _width(data, font, size)
+        if line and line_width + space + width > max_width:
+            lines.append(b" ".join(line))
+            line, line_width = [], 0.0
+        if data:
+            line_width += (space if line else 0) + width
+            line.append(data)
+    if line:
+        lines.append(b" ".join(line))
+    return lines
+
+
+def _pdf_string(data: bytes) -> bytes:
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def layout(blocks: list) -> tuple:
+    """
+    Lay blocks out on pages.
+
+    Returns:
+        (pages, outline): pages as lists of PDF content operations, outline
+        as (title, page index, y) for each h1/h2
+    """
+    width = PAGE_WIDTH - 2 * MARGIN
+    bottom = MARGIN + FOOTER_SIZE * 2
+    pages, outline = [[]], []
+    y = PAGE_HEIGHT - MARGIN
+
+    for tag, text in blocks:
+        if tag == "hr":
+            y -= 12
+            if y < bottom:
+                pages.append([])
+                y = PAGE_HEIGHT - MARGIN
+                continue
+            pages[-1].append(b"0.7 G 0.5 w %d %.1f m %d %.1f l S" % (MARGIN, y, PAGE_WIDTH - MARGIN, y))
+            y -= 6
+            continue
+
+        font, size, space_before, gray = STYLES[tag]
+        line_height = size * LEADING
+        lines = _wrap(text, font, size, width)
+        # Keep headings with the first lines of what follows
+        needed = line_height * (len(lines) + (2 if tag.startswith("h") else 0))
+        y -= space_before
+        if y - min(needed, line_height * 3) < bottom and pages[-1]:
+            pages.append([])
+            y = PAGE_HEIGHT - MARGIN
+        if tag in ("h1", "h2"):
+            outline.append((text, len(pages) - 1, y))
+        for line in lines:
+            if y - line_height < bottom:
+                pages.append([])
+                y = PAGE_HEIGHT - MARGIN
+            y -= line_height
+            pages[-1].append(b"BT /%s %g Tf %g g %d %.1f Td %s Tj ET" % (
+                font.encode(), size, gray, MARGIN, y + (line_height - size) / 2, _pdf_string(line)))
+    return pages, outline
+
+
+# ---------- PDF ----------
+
+def build_pdf(html_str: str) -> bytes:
+    """Render a text-only HTML document to PDF bytes"""
+    blocks = parse_blocks(html_str)
+    pages, outline = layout(blocks)
+    title = _TITLE_RE.search(html_str)
+    title = unescape(title.group(1)).strip() if title else ""
+
+    objects = {}  # number -> body
+    # 1 catalog, 2 page tree, 3-4 fonts, 5 info, 6 outline root; pages and streams follow
+    next_number = 7
+    page_numbers = []
+    for index, ops in enumerate(pages):
+        footer = _encode(f"Page {index + 1} of {len(pages)}")
+        x = (PAGE_WIDTH - _width(footer, "F1", FOOTER_SIZE)) / 2
+        ops = ops + [b"BT /F1 %d Tf 0.53 g %.1f %d Td %s Tj ET" % (FOOTER_SIZE, x, MARGIN - FOOTER_SIZE,
+                                                                   _pdf_string(footer))]
+        stream = zlib.compress(b"\n".join(ops), 6)
+        page_number, stream_number = next_number, next_number + 1
+        next_number += 2
+        objects[stream_number] = (b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+                                  + stream + b"\nendstream")
+        objects[page_number] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                                % (PAGE_WIDTH, PAGE_HEIGHT, stream_number))
+        page_numbers.append(page_number)
+
+    # Bookmarks: a flat list of h1/h2 headings
+    item_numbers = list(range(next_number, next_number + len(outline)))
+    for i, (text, page_index, y) in enumerate(outline):
+        links = b""
+        if i > 0:
+            links += b" /Prev %d 0 R" % item_numbers[i - 1]
+        if i < len(outline) - 1:
+            links += b" /Next %d 0 R" % item_numbers[i + 1]
+        objects[item_numbers[i]] = (b"<< /Title %s /Parent 6 0 R /Dest [%d 0 R /XYZ 0 %.1f 0]%s >>"
+                                    % (_pdf_string(_encode(text[:120])), page_numbers[page_index], y, links))
+    if outline:
+        objects[6] = b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>" % (
+            item_numbers[0], item_numbers[-1], len(outline))
+    else:
+        objects[6] = b"<< /Type /Outlines /Count 0 >>"
+
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R /Outlines 6 0 R /PageMode /UseOutlines >>"
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % n for n in page_numbers), len(page_numbers))
+    for number, name in ((3, "F1"), (4, "F2")):
+        objects[number] = (b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>"
+                           % FONTS[name][0].encode())
+    objects[5] = b"<< /Title %s /Producer (text_pdf) >>" % _pdf_string(_encode(title))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+    xref = len(out)
+    count = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % count
+    for number in range(1, count):
+        out += b"%010d 00000 n \n" % offsets[number]
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, xref)
+    return bytes(out)
+
+
+def write_pdf(html_str: str, output_path: str) -> str:
+    """Render a text-only HTML document to a PDF file"""
+    with open(output_path, "wb") as f:
+        f.write(build_pdf(html_str))
+    return output_path
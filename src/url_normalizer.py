@@ -0,0 +1,146 @@
+"""
+URL Normalizer
+Canonical URLs so variants of the same page count as one source:
+http/https, www., trailing slashes, tracking params (utm_*, fbclid, ...),
+fragments, AMP pages and mobile hosts.
+
+canonical_url() gives a cleaned, fetchable URL; url_key() gives the identity
+key used for deduplication and by the score, page and source caches.
+"""
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the click, never change the page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref_src", "ref_url",
+    "cmpid", "at_medium", "at_campaign",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "oly_")
+
+# Query parameters that switch to the AMP rendering of a page
+AMP_PARAMS = {"amp", "amp_js_v", "amp_gsa", "usqp", "outputtype"}
+
+# Host labels of mobile variants (m.example.com, en.m.wikipedia.org)
+MOBILE_LABELS = {"m", "mobile", "amp"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# AMP caches wrap the original URL: google.com/amp/s/<host>/<path>, <x>.cdn.ampproject.org/c/s/<host>/<path>
+_AMP_CACHE_PATH = re.compile(r'^/(?:amp|[cvi])/(s/)?(.+)$')
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name in AMP_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _unwrap_amp_cache(parts):
+    """The original URL behind a Google AMP cache URL, or None"""
+    host = (parts.hostname or '').lower()
+    is_google_amp = re.match(r'^(www\.)?google\.[a-z.]+$', host) and parts.path.startswith('/amp/')
+    if not (is_google_amp or host.endswith('.cdn.ampproject.org')):
+        return None
+    match = _AMP_CACHE_PATH.match(parts.path)
+    if not match:
+        return None
+    scheme = "https" if match.group(1) else "http"
+    return urlsplit(f"{scheme}://{match.group(2)}" + (f"?{parts.query}" if parts.query else ""))
+
+
+def _clean(url: str):
+    """Split a URL and normalize every part except the scheme and www."""
+    parts = urlsplit((url or '').strip())
+    parts = _unwrap_amp_cache(parts) or parts
+
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower().rstrip('.')
+    labels = host.split('.')
+    # Drop mobile/AMP host labels, but never from the registrable domain itself (m.co)
+    host = '.'.join(label for i, label in enumerate(labels)
+                    if i >= len(labels) - 2 or label not in MOBILE_LABELS)
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    # AMP paths: /article/amp, /amp/article, /article.amp.html (a bare /amp is a real page)
+    path = re.sub(r'(?<=[^/])/amp/?$', '', path)
+    path = re.sub(r'^/amp/(?=[^/])', '/', path)
+    path = re.sub(r'\.amp(\.html?)$', r'\1', path)
+    path = path.rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)]
+    return scheme, netloc, path, query
+
+
+def canonical_url(url: str) -> str:
+    """
+    Cleaned URL for fetching and display: no tracking params, fragment,
+    trailing slash, AMP or mobile variant. Scheme and www. are kept
+    (some sites only answer on one of them).
+    """
+    if not url:
+        return url or ''
+    try:
+        scheme, netloc, path, query = _clean(url)
+    except ValueError:
+        return url
+    if not netloc:
+        return url
+    return urlunsplit((scheme, netloc, path or '/', urlencode(query), ''))
+
+
+def url_key(url: str) -> str:
+    """Identity key for a URL: canonical_url() without the scheme and www., query params sorted"""
+    if not url:
+        return ''
+    try:
+        _, netloc, path, query = _clean(url)
+    except ValueError:
+        return url
+    if not netloc:
+        return url
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    return urlunsplit(('', netloc, path, urlencode(sorted(query)), '')).lstrip('/')
+
+
+def collapse_duplicates(results: list) -> list:
+    """
+    Collapse results whose URLs are variants of the same page.
+
+    The first result for each page is kept (so its ranking and attribution
+    win), with its 'url' replaced by the canonical URL (https if any variant
+    was https) and every other spelling seen listed in 'aliases'.
+
+    Args:
+        results: Dicts with a 'url' key, in priority order
+
+    Returns:
+        The unique results, in the same order
+    """
+    unique = {}
+    for result in results:
+        url = result.get('url')
+        if not url:
+            continue
+        key = url_key(url)
+        kept = unique.get(key)
+        if kept is None:
+            kept = dict(result)
+            kept['url'] = canonical_url(url)
+            kept['aliases'] = list(result.get('aliases') or [])
+            unique[key] = kept
+        elif kept['url'].startswith('http://') and canonical_url(url).startswith('https://'):
+            previous, kept['url'] = kept['url'], canonical_url(url)
+            kept['aliases'] = [a for a in kept['aliases'] if a != kept['url']]
+            if previous not in kept['aliases']:
+                kept['aliases'].append(previous)
+        for alias in [url] + list(result.get('aliases') or []):
+            if alias.rstrip('/') != kept['url'].rstrip('/') and alias not in kept['aliases']:
+                kept['aliases'].append(alias)
+    return list(unique.values())
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for the HTML extraction backends (see content_extractor.py)
+
+Corpus: pages saved in the page cache (data/page_cache.db), plus any *.html
+files in a directory passed as the first argument. Falls back to synthetic
+pages when neither has anything.
+
+Usage: python tests/benchmark_extraction.py [html_dir] [repeats]
+"""
+import sys
+import os
+import glob
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import content_extractor
+import page_cache
+
+
+def synthetic_page(i: int) -> str:
+    """A typical article page: chrome, a long body, comments and a related list"""
+    paragraphs = "\n".join(
+        f"<p>Paragraph {j} of article {i}: <a href='/x/{j}'>link</a> with <b>bold</b> &amp; "
+        f"<em>emphasis</em>, some more words to make it realistic.</p>"
+        for j in range(120)
+    )
+    related = "".join(f"<li><a href='/r/{j}'>Related article {j}</a></li>" for j in range(40))
+    return f"""<!DOCTYPE html><html><head><title>Article {i}</title>
+    <style>body {{ margin: 0 }}</style><script>var x = {i};</script></head>
+    <body><header><nav><ul><li>Home</li><li>About</li></ul></nav></header>
+    <main><article><h1>Article {i}</h1><h2>Introduction</h2>{paragraphs}
+    <h2>Related</h2><ul>{related}</ul></article></main>
+    <div class="comments"><h3>Comments</h3><p>Great post!</p><!-- tracking --></div>
+    <footer><p>Copyright</p></footer></body></html>"""
+
+
+def load_corpus(html_dir: str = None) -> list:
+    pages = [raw for _, raw in page_cache.iter_raw_pages()]
+    if html_dir:
+        for path in sorted(glob.glob(os.path.join(html_dir, "*.html"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+    if not pages:
+        print("No saved pages found, using 50 synthetic pages")
+        pages = [synthetic_page(i) for i in range(50)]
+    return pages
+
+
+def benchmark(pages: list, backend: str, repeats: int):
+    """Best-of-`repeats` total time to extract every page, and the outputs"""
+    best = None
+    outputs = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        outputs = [content_extractor.extract_content(page, backend) for page in pages]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, outputs
+
+
+def main():
+    html_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    pages = load_corpus(html_dir)
+    total_kb = sum(len(p) for p in pages) / 1024
+
+    print("="*60)
+    print(f"🧪 Extraction benchmark: {len(pages)} pages, {total_kb:.0f} KB, best of {repeats}")
+    print("="*60)
+
+    reference_time, reference = benchmark(pages, "bs4", repeats)
+    print(f"{'bs4':<12} {reference_time * 1000 / len(pages):8.2f} ms/page   1.00x   (reference)")
+
+    for backend in content_extractor.available_backends()[1:]:
+        elapsed, outputs = benchmark(pages, backend, repeats)
+        identical = sum(1 for a, b in zip(reference, outputs) if a == b)
+        print(f"{backend:<12} {elapsed * 1000 / len(pages):8.2f} ms/page "
+              f"{reference_time / elapsed:6.2f}x   identical output: {identical}/{len(pages)}")
+
+    # Main-content mode: how much boilerplate it strips from the same corpus
+    fastest = content_extractor.available_backends()[-1]
+    main_outputs = [content_extractor.extract_content(page, fastest, mode="main") for page in pages]
+    full_bytes = sum(len(o.encode('utf-8')) for o in reference)
+    main_bytes = sum(len(o.encode('utf-8')) for o in main_outputs)
+    if full_bytes:
+        print(f"\nMain-content mode ({fastest}): {main_bytes / 1024:.0f} KB of {full_bytes / 1024:.0f} KB "
+              f"({(full_bytes - main_bytes) / full_bytes:.0%} saved)")
+
+    missing = {"lxml", "selectolax"} - set(content_extractor.available_backends())
+    if missing:
+        print(f"\nNot installed: {', '.join(sorted(missing))}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
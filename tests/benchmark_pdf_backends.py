@@ -0,0 +1,127 @@
+"""
+Benchmark for the PDF backends (see research_to_pdf.html_to_pdf())
+
+Renders a synthetic research pack (same structure as build_html_document(),
+bodies in the <h3>/<p> form fetch_and_clean() emits) with each backend, each
+run in a fresh process so peak RSS is the renderer's own. Reports best render
+time, peak RSS and file size.
+
+Usage: python tests/benchmark_pdf_backends.py [sources] [chars_per_source] [repeats]
+"""
+import sys
+import os
+import json
+import time
+import random
+import resource
+import subprocess
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+BACKENDS = ["weasyprint", "text"]
+
+
+def synthetic_body(seed: int, chars: int) -> str:
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(3000)] + ["the", "of", "and", "research", "data"]
+    parts, size = [], 0
+    while size < chars:
+        if rng.random() < 0.1:
+            block = f"<h3>{' '.join(rng.choice(vocab) for _ in range(5)).title()}</h3>"
+        else:
+            block = f"<p>{' '.join(rng.choice(vocab) for _ in range(rng.randint(40, 120)))}.</p>"
+        parts.append(block)
+        size += len(block)
+    return "\n".join(parts)[:chars]
+
+
+def synthetic_pack(sources: int, chars: int) -> str:
+    parts = ["<html>", "<head>", "<meta charset='utf-8'>", "<title>Benchmark</title>",
+             "<style>body { font-family: sans-serif; margin: 2em; } p { line-height: 1.5; font-size: 14px; }"
+             " .source-url { font-size: 12px; color: #555; }</style>",
+             "</head>", "<body>", "<h1>Research Pack: Benchmark</h1>"]
+    for i in range(1, sources + 1):
+        parts.append("<hr/>")
+        parts.append(f"<h2>Source {i}</h2>")
+        parts.append(f"<div class='source-url'>https://example{i}.com/articles/{i}</div>")
+        parts.append(synthetic_body(i, chars))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def render_once(backend: str, sources: int, chars: int) -> dict:
+    """Render in this process; run via --child so RSS isn't shared between backends"""
+    html_str = synthetic_pack(sources, chars)
+    output = os.path.join(tempfile.mkdtemp(), "pack.pdf")
+    started = time.perf_counter()
+    if backend == "text":
+        import text_pdf
+        text_pdf.write_pdf(html_str, output)
+    else:
+        from weasyprint import HTML
+        HTML(string=html_str).write_pdf(output)
+    elapsed = time.perf_counter() - started
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024  # bytes on macOS, KB elsewhere
+    size = os.path.getsize(output)
+    os.remove(output)
+    return {"seconds": elapsed, "peak_rss_kb": peak, "size": size}
+
+
+def run_child(backend: str, sources: int, chars: int):
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", backend, str(sources), str(chars)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        print(json.dumps(render_once(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))))
+        return 0
+
+    sources = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    chars = int(sys.argv[2]) if len(sys.argv) > 2 else 15000
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    print("="*60)
+    print(f"🧪 PDF backend benchmark: {sources} sources x {chars} chars, best of {repeats}")
+    print("="*60)
+
+    results = {}
+    for backend in BACKENDS:
+        runs = []
+        for _ in range(repeats):
+            run, error = run_child(backend, sources, chars)
+            if error:
+                print(f"{backend:<12} not available: {error}")
+                break
+            runs.append(run)
+        if runs:
+            results[backend] = {
+                "seconds": min(r["seconds"] for r in runs),
+                "peak_rss_kb": max(r["peak_rss_kb"] for r in runs),
+                "size": runs[0]["size"],
+            }
+
+    for backend, r in results.items():
+        print(f"{backend:<12} {r['seconds']:8.2f} s   peak RSS {r['peak_rss_kb'] / 1024:7.1f} MB   "
+              f"file {r['size'] / 1024:8.1f} KB")
+
+    if len(results) == 2:
+        ws, text = results["weasyprint"], results["text"]
+        print(f"\ntext vs weasyprint: {ws['seconds'] / text['seconds']:.1f}x faster, "
+              f"{ws['peak_rss_kb'] / text['peak_rss_kb']:.1f}x less memory, "
+              f"{ws['size'] / text['size']:.1f}x smaller")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,51 @@
+"""
+Shared pytest setup: keeps test databases out of the repo's data/ directory
+and undoes the module globals tests repoint or fake
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Cache modules create their databases on import, before a test can repoint them
+os.environ.setdefault("RESEARCH_DATA_DIR", tempfile.mkdtemp(prefix="research-test-data-"))
+
+# module: (database path attribute, init function), in dependency order
+DATABASES = {
+    "database": ("DB_PATH", "init_database"),
+    "score_cache": (None, "init_score_cache"),
+    "search_cache": ("SEARCH_CACHE_DB", "init_cache"),
+    "page_cache": ("PAGE_CACHE_DB", "init_cache"),
+    "blob_store": ("BLOB_STORE_DB", "init_store"),
+    "content_dedupe": ("CONTENT_INDEX_DB", "init_index"),
+    "embedding_cache": ("EMBEDDING_CACHE_DB", "init_cache"),
+    "pdf_fragments": ("FRAGMENT_CACHE_DB", "init_fragments"),
+    "pdf_jobs": ("PDF_JOBS_DB", "init_jobs"),
+}
+
+# Other globals tests override or replace with fakes
+GLOBALS = {
+    "render_service": ["RENDER_WORKERS", "RENDER_MEMORY_LIMIT_MB", "RENDER_MAX_TASKS_PER_WORKER", "_pdf_bytes"],
+    "pdf_fragments": ["STYLESHEET_VERSION"],
+    "pdf_jobs": ["build_pack_pdf", "fetch_pages_parallel"],
+}
+
+
+@pytest.fixture(autouse=True)
+def isolated_modules(monkeypatch, tmp_path):
+    """Point loaded modules at fresh databases under tmp_path; restore everything afterwards"""
+    for name, attributes in GLOBALS.items():
+        module = sys.modules.get(name)
+        for attribute in attributes if module else []:
+            monkeypatch.setattr(module, attribute, getattr(module, attribute))
+
+    for name, (path_attribute, init) in DATABASES.items():
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        if path_attribute:
+            filename = os.path.basename(getattr(module, path_attribute))
+            monkeypatch.setattr(module, path_attribute, str(tmp_path / filename))
+        getattr(module, init)()
+    yield
@@ -0,0 +1,151 @@
+"""
+Test the async scoring engine: in-flight bound, token bucket and result order
+(no API calls; AsyncOpenAI is stubbed)
+"""
+import sys
+import os
+import re
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+TOPIC = "quantum computing"
+SCORES = {f"https://site{i}.example/": 10 * i for i in range(1, 9)}
+
+
+class FakeAsyncClient:
+    """Async chat completions that answer from SCORES; later results answer faster"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request):
+        urls = re.findall(r"URL: (\S+)", request["messages"][-1]["content"])
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01 * (10 - list(SCORES).index(urls[0])))
+        finally:
+            self.in_flight -= 1
+        if len(urls) == 1 and "JSON array" not in request["messages"][-1]["content"]:
+            content = json.dumps({"score": SCORES[urls[0]], "reasoning": "single"})
+        else:
+            content = json.dumps([{"index": i, "score": SCORES[url], "reasoning": "batch"}
+                                  for i, url in enumerate(urls, 1)])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def close(self):
+        self.closed = True
+
+
+def results():
+    return [{"title": f"Result {i}", "url": url} for i, url in enumerate(SCORES, 1)]
+
+
+def score_with(fake, **kwargs):
+    original = research_to_pdf.AsyncOpenAI
+    research_to_pdf.AsyncOpenAI = lambda **client_kwargs: fake
+    try:
+        return asyncio.run(research_to_pdf.score_results_async(TOPIC, results(), **kwargs))
+    finally:
+        research_to_pdf.AsyncOpenAI = original
+
+
+def test_in_flight_bound_and_order():
+    """At most max_in_flight requests run at once, and scores line up with the input"""
+    fake = FakeAsyncClient()
+    scores = score_with(fake, batch_size=1, max_in_flight=3, tokens_per_minute=10 ** 6)
+    print(f"Calls: {fake.calls}, peak in flight: {fake.peak}")
+
+    assert [s['score'] for s in scores] == list(SCORES.values())
+    assert fake.calls == 8
+    assert fake.peak == 3
+    assert fake.closed
+
+
+def test_batches_keep_order():
+    """Chunks finish out of order but are reassembled in input order"""
+    fake = FakeAsyncClient()
+    scores = score_with(fake, batch_size=3, max_in_flight=8, tokens_per_minute=10 ** 6)
+    assert [s['score'] for s in scores] == list(SCORES.values())
+    assert fake.calls == 3
+    assert asyncio.run(research_to_pdf.score_results_async(TOPIC, [])) == []
+
+
+def test_waves_share_one_client():
+    """Top-k waves reuse one client instead of opening a connection pool per wave"""
+    fake = FakeAsyncClient()
+    created = []
+    original = (research_to_pdf.AsyncOpenAI, research_to_pdf.SCORING_WAVE_SIZE)
+    research_to_pdf.AsyncOpenAI = lambda **client_kwargs: created.append(fake) or fake
+    research_to_pdf.SCORING_WAVE_SIZE = 2
+    metrics = {}
+    try:
+        scored = asyncio.run(research_to_pdf._score_in_waves(
+            TOPIC, results(), list(range(8)), [80 - i for i in range(8)], limit=8, batch_size=2,
+            use_cache=False, min_score=90, top_k=3, confirmed=[], metrics=metrics))
+    finally:
+        research_to_pdf.AsyncOpenAI, research_to_pdf.SCORING_WAVE_SIZE = original
+
+    assert metrics['waves'] == 4
+    assert [scored[i]['score'] for i in range(8)] == list(SCORES.values())
+    assert len(created) == 1
+    assert fake.calls == 4
+    assert fake.closed
+
+
+def test_token_bucket_blocks_over_budget():
+    """Once the minute's budget is spent, acquire() waits for the bucket to refill"""
+    async def run():
+        limiter = research_to_pdf.TokenRateLimiter(600)  # refills 10 tokens per second
+        started = time.monotonic()
+        await limiter.acquire(600)
+        immediate = time.monotonic() - started
+        await limiter.acquire(3)
+        return immediate, time.monotonic() - started
+
+    immediate, total = asyncio.run(run())
+    print(f"First acquire: {immediate:.3f}s, second: {total:.3f}s")
+    assert immediate < 0.05
+    assert 0.25 <= total < 1.0
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Async Scoring")
+    print("="*60)
+
+    tests = [
+        ("In-flight bound and order", test_in_flight_bound_and_order),
+        ("Batches keep order", test_batches_keep_order),
+        ("Waves share one client", test_waves_share_one_client),
+        ("Token bucket blocks over budget", test_token_bucket_blocks_over_budget),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,135 @@
+"""
+Test batched relevance scoring and its split-and-retry path (no API calls; the client is stubbed)
+"""
+import sys
+import os
+import re
+import json
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+TOPIC = "quantum computing"
+SCORES = {f"https://site{i}.example/": 10 * i for i in range(1, 9)}
+
+
+class FakeClient:
+    """Answers chat completions with reply(urls in the prompt) and records each call's URLs"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        urls = re.findall(r"URL: (\S+)", request["messages"][-1]["content"])
+        self.calls.append(urls)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply(urls)))])
+
+
+def batch_reply(urls, skip=()):
+    return json.dumps([{"index": i, "score": SCORES[url], "reasoning": "ok"}
+                       for i, url in enumerate(urls, 1) if i not in skip])
+
+
+def single_reply(urls):
+    return json.dumps({"score": SCORES[urls[0]], "reasoning": "single"})
+
+
+def results(count):
+    return [{"title": f"Result {i}", "url": url} for i, url in enumerate(list(SCORES)[:count], 1)]
+
+
+def score_with(reply, count):
+    fake = FakeClient(reply)
+    original = research_to_pdf.client
+    research_to_pdf.client = fake
+    try:
+        scores = research_to_pdf.score_results_batch(TOPIC, results(count))
+    finally:
+        research_to_pdf.client = original
+    return scores, fake.calls
+
+
+def test_parse_fenced_and_wrapped_replies():
+    """Code fences and {"results": [...]} wrappers are accepted; scores are clamped to 0-100"""
+    fenced = "```json\n" + json.dumps([{"index": 1, "score": 140}, {"index": 2, "score": -5}]) + "\n```"
+    assert research_to_pdf._parse_batch_scores(fenced, 2) == {
+        1: {"score": 100, "reasoning": ""}, 2: {"score": 0, "reasoning": ""}}
+
+    wrapped = json.dumps({"results": [{"index": 2, "score": 70, "reasoning": "b"},
+                                      {"index": 1, "score": 60, "reasoning": "a"}]})
+    assert research_to_pdf._parse_batch_scores(wrapped, 2)[2] == {"score": 70, "reasoning": "b"}
+
+    for bad in ['{"score": 80}', '[{"index": 1, "score": 80}]', "not json"]:
+        try:
+            research_to_pdf._parse_batch_scores(bad, 2)
+            assert False, f"expected ValueError for {bad}"
+        except ValueError:
+            pass
+
+
+def test_malformed_batch_is_split():
+    """An unparseable batch reply is retried as two halves"""
+    def reply(urls):
+        return "Sorry, here are the scores: 1) 80" if len(urls) == 4 else batch_reply(urls)
+
+    scores, calls = score_with(reply, 4)
+    print(f"Calls: {[len(c) for c in calls]}")
+    assert [len(c) for c in calls] == [4, 2, 2]
+    assert [s["score"] for s in scores] == [10, 20, 30, 40]
+
+
+def test_missing_index_falls_back_to_single_scoring():
+    """A batch that keeps dropping an index is split down to single-result requests"""
+    def reply(urls):
+        if len(urls) == 1:
+            return single_reply(urls)
+        return batch_reply(urls, skip=(2,))
+
+    scores, calls = score_with(reply, 3)
+    print(f"Calls: {[len(c) for c in calls]}")
+    # 3 -> 1 + 2; the pair drops index 2 again -> 1 + 1
+    assert [len(c) for c in calls] == [3, 1, 2, 1, 1]
+    assert [s["score"] for s in scores] == [10, 20, 30]
+    assert scores[0]["reasoning"] == "single"
+
+
+def test_failed_single_score_is_neutral():
+    """A single result whose reply can't be parsed gets the neutral fallback score"""
+    scores, calls = score_with(lambda urls: "no idea", 2)
+    assert [len(c) for c in calls] == [2, 1, 1]
+    assert scores == [{"score": 50, "reasoning": "Unable to score"}] * 2
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Batch Scoring")
+    print("="*60)
+
+    tests = [
+        ("Parse fenced and wrapped replies", test_parse_fenced_and_wrapped_replies),
+        ("Malformed batch is split", test_malformed_batch_is_split),
+        ("Missing index falls back to single scoring", test_missing_index_falls_back_to_single_scoring),
+        ("Failed single score is neutral", test_failed_single_score_is_neutral),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,170 @@
+"""
+Test the content-addressed blob store (no network needed)
+"""
+import sys
+import os
+import tempfile
+import requests
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import blob_store
+import page_cache
+import research_to_pdf
+
+
+def use_temp_store():
+    """Point the store module at a fresh temporary database"""
+    blob_store.BLOB_STORE_DB = os.path.join(tempfile.mkdtemp(), 'blob_store.db')
+    blob_store.init_store()
+
+
+def test_session_roundtrip():
+    """A session snapshot rebuilds the same sources, in order, with merged duplicates"""
+    use_temp_store()
+    sources = [("https://a.example/1", "<p>First</p>"), ("https://b.example/2", "<p>Second</p>")]
+    blob_store.save_session(1, sources, {"https://b.example/2": [("https://mirror.example/2", 0.97)]})
+
+    loaded, duplicates, missing = blob_store.load_session(1)
+    assert loaded == sources
+    assert duplicates == {"https://b.example/2": [("https://mirror.example/2", None)]}
+    assert missing == []
+    assert blob_store.has_session(1)
+    assert not blob_store.has_session(2)
+
+    # Snapshots hold the PDF's (truncated) bodies; the URL index is only filled by fetches
+    assert blob_store.get_url("https://a.example/1") is None
+
+
+def test_shared_blobs_and_refcounts():
+    """Identical bodies are stored once; blobs go away with their last reference"""
+    use_temp_store()
+    shared = ("https://a.example/1", "<p>Shared</p>")
+    blob_store.put_url(*shared)
+    blob_store.save_session(1, [shared, ("https://b.example/2", "<p>Only in 1</p>")])
+    blob_store.save_session(2, [shared])
+
+    stats = blob_store.get_store_stats()
+    print(f"Stats: {stats}")
+    assert stats['blobs'] == 2
+    # shared: 2 sessions + URL index; other: session 1
+    assert stats['references'] == 4
+
+    blob_store.release_session(1)
+    assert blob_store.get_store_stats()['references'] == 2
+    assert blob_store.get_blob(blob_store.content_hash("<p>Only in 1</p>")) is None
+
+    # Re-saving a session with new content drops the old body once nothing else uses it
+    blob_store.release_session(2)
+    blob_store.save_session(3, [("https://c.example/3", "<p>Old</p>")])
+    blob_store.save_session(3, [("https://c.example/3", "<p>New</p>")])
+    assert blob_store.get_blob(blob_store.content_hash("<p>Old</p>")) is None
+
+    # A newer fetch of a URL replaces its index entry, under the canonical URL
+    blob_store.put_url("https://c.example/3", "<p>Fetched old</p>")
+    blob_store.put_url("http://www.c.example/3/", "<p>Fetched new</p>")
+    assert blob_store.get_url("https://c.example/3") == "<p>Fetched new</p>"
+    assert blob_store.get_blob(blob_store.content_hash("<p>Fetched old</p>")) is None
+
+
+def test_fallback_to_url_index():
+    """Sessions without a snapshot are rebuilt from the URL index, reporting what's missing"""
+    use_temp_store()
+    blob_store.put_url("https://a.example/1", "<p>Stored</p>")
+
+    loaded, duplicates, missing = blob_store.load_session(99, ["https://a.example/1", "https://z.example/"])
+    assert loaded == [("https://a.example/1", "<p>Stored</p>")]
+    assert missing == ["https://z.example/"]
+
+
+def test_lru_eviction_keeps_sessions():
+    """Above the size cap, least recently used URL entries go; session snapshots stay"""
+    use_temp_store()
+    original_max = blob_store.BLOB_STORE_MAX_BYTES
+    blob_store.BLOB_STORE_MAX_BYTES = 0
+    try:
+        blob_store.put_url("https://z.example/", os.urandom(2000).hex())
+        blob_store.save_session(1, [("https://a.example/1", os.urandom(2000).hex())])
+        stats = blob_store.get_store_stats()
+        assert stats['urls'] == 0
+        assert stats['blobs'] == 1
+        assert len(blob_store.load_session(1)[0]) == 1
+    finally:
+        blob_store.BLOB_STORE_MAX_BYTES = original_max
+
+
+class FakeResponse:
+    headers = {}
+
+
+def fetch_with(download, url="https://a.example/article"):
+    """fetch_and_clean with _download faked, on an empty page cache"""
+    original = research_to_pdf._download
+    research_to_pdf._download = download
+    try:
+        return research_to_pdf.fetch_and_clean(url, max_chars=50, mode="all")
+    finally:
+        research_to_pdf._download = original
+
+
+def test_fetch_stores_full_body():
+    """Fetched pages go into the URL index whole, before any truncation"""
+    use_temp_store()
+    page_cache.clear_cache()
+    html = "<html><body>" + "".join(f"<p>Paragraph number {i}</p>" for i in range(20)) + "</body></html>"
+
+    content = fetch_with(lambda url, headers=None: (FakeResponse(), html))
+    stored = blob_store.get_url("https://a.example/article")
+    assert content.endswith("<p>[Truncated]</p>")
+    assert "Paragraph number 19" in stored
+    assert "[Truncated]" not in stored
+
+
+def test_fallback_only_on_network_errors():
+    """A stored copy stands in for an unreachable host, but not for a 404 or rejected content"""
+    use_temp_store()
+    page_cache.clear_cache()
+    blob_store.put_url("https://a.example/article", "<p>Stored copy</p>")
+
+    def fail(error):
+        def download(url, headers=None):
+            raise error
+        return download
+
+    assert fetch_with(fail(requests.exceptions.ConnectionError("refused"))) == "<p>Stored copy</p>"
+    assert fetch_with(fail(requests.exceptions.Timeout("slow"))) == "<p>Stored copy</p>"
+    assert fetch_with(fail(requests.exceptions.HTTPError("404 Client Error"))) == ""
+    assert fetch_with(fail(research_to_pdf._RejectedContent("skipping non-HTML content"))) == ""
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Blob Store")
+    print("="*60)
+
+    tests = [
+        ("Session roundtrip", test_session_roundtrip),
+        ("Shared blobs and refcounts", test_shared_blobs_and_refcounts),
+        ("Fallback to URL index", test_fallback_to_url_index),
+        ("LRU eviction keeps sessions", test_lru_eviction_keeps_sessions),
+        ("Fetch stores full body", test_fetch_stores_full_body),
+        ("Fallback only on network errors", test_fallback_only_on_network_errors),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
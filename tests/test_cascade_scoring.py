@@ -0,0 +1,106 @@
+"""
+Test cascaded scoring: what is decided locally, what is escalated, and how it is counted
+(no API calls; local and LLM scores are faked)
+"""
+import sys
+import os
+import asyncio
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+import local_scorer
+import score_cache
+
+# Local scores: two confident (90, 10), four uncertain (50-65)
+LOCAL = [90, 10, 50, 55, 60, 65]
+RESULTS = [{"title": f"Result {i}", "url": f"https://site{i}.example/"} for i in range(len(LOCAL))]
+
+
+def fake_local(topic, results, queries=None):
+    return [{"score": LOCAL[RESULTS.index(r)], "reasoning": "local"} for r in results]
+
+
+def run_cascade(fake_score_with_cache, **kwargs):
+    """filter_results_by_quality_async() in cascade mode; returns (results, metrics, record_cascade counts)"""
+    recorded = {}
+    original = (local_scorer.score_results_local, research_to_pdf._score_with_cache, score_cache.record_cascade)
+    local_scorer.score_results_local = fake_local
+    research_to_pdf._score_with_cache = fake_score_with_cache
+    score_cache.record_cascade = lambda **counts: recorded.update(counts)
+    metrics = {}
+    try:
+        filtered = asyncio.run(research_to_pdf.filter_results_by_quality_async(
+            "topic", [dict(r) for r in RESULTS], min_score=60, batch_size=10, cascade=True,
+            metrics=metrics, **kwargs))
+    finally:
+        local_scorer.score_results_local, research_to_pdf._score_with_cache, score_cache.record_cascade = original
+    print(f"Metrics: {metrics}, recorded: {recorded}")
+    return filtered, metrics, recorded
+
+
+def test_only_uncertain_results_escalate():
+    """Confident local scores stand; the uncertain band goes to the LLM, up to max_to_score"""
+    escalated = []
+
+    async def fake_score_with_cache(topic, results, batch_size, use_cache=True, **kwargs):
+        escalated.extend(r['url'] for r in results)
+        return [{"score": 70, "reasoning": "llm"} for _ in results]
+
+    filtered, metrics, recorded = run_cascade(fake_score_with_cache, max_to_score=3)
+    stages = {r['url']: (r['score_stage'], r['relevance_score']) for r in filtered}
+
+    assert escalated == [RESULTS[i]['url'] for i in (2, 3, 4)]
+    assert stages[RESULTS[0]['url']] == ('local', 90)
+    # Uncertain results beyond max_to_score keep their local score
+    assert stages[RESULTS[5]['url']] == ('local', 65)
+    assert RESULTS[1]['url'] not in stages
+    assert metrics['uncertain'] == 4
+    assert metrics['escalated'] == 3
+    assert metrics['escalated_fraction'] == 0.5
+    assert recorded == {'local': 3, 'escalated': 3}
+
+
+def test_cache_hits_are_not_escalations():
+    """Uncertain results answered by the score cache don't count as LLM escalations"""
+    async def fake_score_with_cache(topic, results, batch_size, use_cache=True, **kwargs):
+        # The first two uncertain results come from the score cache
+        return [dict({"score": 70, "reasoning": "llm"}, **({"cached": True, "age_days": 1} if i < 2 else {}))
+                for i, _ in enumerate(results)]
+
+    filtered, metrics, recorded = run_cascade(fake_score_with_cache, max_to_score=30)
+    assert sorted(r['score_stage'] for r in filtered) == ['llm', 'llm', 'llm', 'llm', 'local']
+    assert metrics['uncertain'] == 4
+    assert metrics['escalated'] == 2
+    assert metrics['cache_hits'] == 2
+    assert metrics['escalated_fraction'] == 2 / 6
+    assert recorded == {'local': 2, 'escalated': 2}
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Cascade Scoring")
+    print("="*60)
+
+    tests = [
+        ("Only uncertain results escalate", test_only_uncertain_results_escalate),
+        ("Cache hits are not escalations", test_cache_hits_are_not_escalations),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,109 @@
+"""
+Test content-level near-duplicate detection (no network needed)
+"""
+import sys
+import os
+import random
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import content_dedupe
+
+
+def use_temp_index():
+    """Point the index module at a fresh temporary database"""
+    content_dedupe.CONTENT_INDEX_DB = os.path.join(tempfile.mkdtemp(), 'content_index.db')
+    content_dedupe.init_index()
+
+
+def article(seed: int, words: int = 600) -> str:
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(2000)]
+    sentences = [" ".join(rng.choice(vocab) for _ in range(20)) for _ in range(words // 20)]
+    return "\n".join(f"<p>{s}.</p>" for s in sentences)
+
+
+def test_simhash_similarity():
+    """Mirrors with different chrome are within the threshold; different articles are not"""
+    original = article(1)
+    mirror = "<h3>Syndicated from the original publisher</h3>\n" + original + "\n<p>Share this story</p>"
+    other = article(2)
+
+    fp_original, words = content_dedupe.simhash(original)
+    assert words == 600
+    near = content_dedupe.distance(fp_original, content_dedupe.simhash(mirror)[0])
+    far = content_dedupe.distance(fp_original, content_dedupe.simhash(other)[0])
+    print(f"Mirror distance: {near}, different article distance: {far}")
+    assert near <= content_dedupe.DEDUPE_MAX_DISTANCE
+    assert far > 10
+
+    assert content_dedupe.simhash("<p>too short</p>")[0] is None
+
+
+def test_dedupe_sources():
+    """Near-duplicates merge into one source at the first one's position, keeping the longest body"""
+    use_temp_index()
+    original = article(1)
+    truncated_mirror = original[:-100]
+    sources = [
+        ("https://mirror.example/story", truncated_mirror),
+        ("https://other.example/a", article(2)),
+        ("https://news.example/story", original),
+        ("https://short.example/", "<p>tiny</p>"),
+        ("https://short2.example/", "<p>tiny</p>"),
+    ]
+    unique, duplicates = content_dedupe.dedupe_sources(sources)
+    print(f"Kept: {[u for u, _ in unique]}, duplicates: {duplicates}")
+
+    assert [u for u, _ in unique] == ["https://news.example/story", "https://other.example/a",
+                                      "https://short.example/", "https://short2.example/"]
+    assert [u for u, _ in duplicates["https://news.example/story"]] == ["https://mirror.example/story"]
+
+    stats = content_dedupe.get_index_stats()
+    assert stats['duplicates_removed'] == 1
+    assert stats['entries'] == 3
+
+
+def test_known_duplicates_across_sessions():
+    """Fingerprints from an earlier session flag mirrors in a new results list"""
+    use_temp_index()
+    original = article(3)
+    content_dedupe.dedupe_sources([("https://a.example/post", original),
+                                   ("https://b.example/copy/", original + "<p>extra footer</p>")])
+
+    results = [{"url": "https://www.b.example/copy"}, {"url": "https://c.example/new"},
+               {"url": "https://a.example/post"}]
+    content_dedupe.mark_known_duplicates(results)
+    assert results[2]['duplicate_of'] == "https://www.b.example/copy"
+    assert 'duplicate_of' not in results[0]
+    assert 'duplicate_of' not in results[1]
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Content Dedupe")
+    print("="*60)
+
+    tests = [
+        ("SimHash similarity", test_simhash_similarity),
+        ("Dedupe sources", test_dedupe_sources),
+        ("Known duplicates across sessions", test_known_duplicates_across_sessions),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
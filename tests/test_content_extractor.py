@@ -0,0 +1,157 @@
+"""
+Test the HTML extraction backends and main-content mode (no network needed)
+"""
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import content_extractor
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>T</title><style>p { color: red }</style></head>
+<body>
+  <header><h1>Site name</h1></header>
+  <nav><ul><li>Home</li><li>About</li></ul></nav>
+  <article>
+    <h1>Main   title</h1>
+    <p>First <a href="/a">linked</a> paragraph with <b>bold</b> &amp; entities&nbsp;</p>
+    <p>Split<script>var x = 1;</script>by a script <!-- and a comment --> here</p>
+    <p>   </p>
+    <ul><li>Item one</li><li>Item <p>with nested paragraph</p></li></ul>
+    <h2>Multi
+        line heading</h2>
+    <form><p>Newsletter signup</p></form>
+  </article>
+  <footer><p>Copyright</p></footer>
+</body></html>"""
+
+
+def test_reference_output():
+    """The bs4 backend keeps headings and paragraphs outside removed chrome"""
+    content = content_extractor.extract_content(PAGE, "bs4")
+    print(content)
+    assert "<h3>Main   title</h3>" in content
+    assert "<p>First linked paragraph with bold & entities</p>" in content
+    assert "<p>Split by a script here</p>" in content
+    assert "<p>Item with nested paragraph</p>\n<p>with nested paragraph</p>" in content
+    assert "Site name" not in content
+    assert "Newsletter" not in content
+    assert "Copyright" not in content
+    assert "var x" not in content
+
+
+def test_backends_equivalent():
+    """Every installed backend gives exactly the reference output"""
+    reference = content_extractor.extract_content(PAGE, "bs4")
+    backends = content_extractor.available_backends()
+    print(f"Installed backends: {backends}")
+    for backend in backends[1:]:
+        assert content_extractor.extract_content(PAGE, backend) == reference, backend
+
+
+def test_empty_and_fallback():
+    """Empty pages give empty output; unknown backends fall back to bs4"""
+    for backend in content_extractor.available_backends():
+        assert content_extractor.extract_content("", backend) == ""
+    assert content_extractor.resolve_backend("nonexistent") == "bs4"
+
+
+def deep_page(depth):
+    return ("<html><body>" + "<div>" * depth + "<p>Deeply nested paragraph</p>" + "</div>" * depth
+            + "<p>After the nesting</p></body></html>")
+
+
+def test_deep_nesting():
+    """Pages nested past parser and recursion limits give the same output on every backend"""
+    expected = "<p>Deeply nested paragraph</p>\n<p>After the nesting</p>"
+    for depth in (300, 3000):
+        page = deep_page(depth)
+        for backend in content_extractor.available_backends():
+            assert content_extractor.extract_content(page, backend, mode="all") == expected, (backend, depth)
+
+
+ARTICLE_PAGE = """<!DOCTYPE html>
+<html><body>
+  <div id="cookie-banner"><p>We use cookies to improve your experience, please accept them all.</p></div>
+  <div class="layout">
+    <div class="post-content">
+      <h1>How transformers work</h1>
+      <p>Transformers replace recurrence with attention, letting every token look at every other token.</p>
+      <p>Each layer has multi-head self-attention, a feed-forward block, residual connections, and layer norm.</p>
+      <p>Positional encodings add order information, since attention itself is permutation invariant.</p>
+    </div>
+    <div class="sidebar">
+      <ul><li><a href="/1">Popular: ten tricks for faster training</a></li>
+          <li><a href="/2">Popular: a gentle intro to convolutions</a></li></ul>
+    </div>
+  </div>
+  <div class="comments">
+    <p>Great article, thanks a lot for writing this, it really helped me understand!</p>
+  </div>
+  <div class="related"><p><a href="/3">You might also like: attention is all you need, explained</a></p></div>
+</body></html>"""
+
+
+def test_main_content_mode():
+    """Main-content mode keeps the article and drops banners, sidebars, comments and related links"""
+    full = content_extractor.extract_content(ARTICLE_PAGE, "bs4", mode="all")
+    main = content_extractor.extract_content(ARTICLE_PAGE, "bs4", mode="main")
+    print(main)
+    print(f"Full: {len(full)} bytes, main: {len(main)} bytes")
+
+    assert "<h3>How transformers work</h3>" in main
+    assert "Positional encodings" in main
+    for boilerplate in ("cookies", "Popular", "Great article", "You might also like"):
+        assert boilerplate in full
+        assert boilerplate not in main, boilerplate
+
+    for backend in content_extractor.available_backends()[1:]:
+        assert content_extractor.extract_content(ARTICLE_PAGE, backend, mode="main") == main, backend
+
+
+def test_main_mode_fallback():
+    """Pages without scorable paragraphs keep every block in main-content mode"""
+    page = "<ul><li>Only</li><li>list items</li></ul>"
+    assert content_extractor.extract_content(page, "bs4", mode="main") == "<p>Only</p>\n<p>list items</p>"
+
+
+def test_main_mode_deep_nesting():
+    """Main-content mode walks deep pages without recursion and agrees across backends"""
+    page = deep_page(3000).replace("Deeply nested paragraph", "A deeply nested paragraph, long enough to vote")
+    expected = "<p>A deeply nested paragraph, long enough to vote</p>"
+    for backend in content_extractor.available_backends():
+        assert content_extractor.extract_content(page, backend, mode="main") == expected, backend
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Content Extractor")
+    print("="*60)
+
+    tests = [
+        ("Reference output", test_reference_output),
+        ("Backends equivalent", test_backends_equivalent),
+        ("Empty page and fallback", test_empty_and_fallback),
+        ("Deep nesting", test_deep_nesting),
+        ("Main-content mode", test_main_content_mode),
+        ("Main-content fallback", test_main_mode_fallback),
+        ("Main-content deep nesting", test_main_mode_deep_nesting),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
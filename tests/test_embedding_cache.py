@@ -0,0 +1,83 @@
+"""
+Test the disk-backed embedding cache (no API key needed)
+"""
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import embedding_cache
+
+MODEL = "text-embedding-3-small"
+
+
+def use_temp_cache():
+    """Point the cache module at a fresh temporary database"""
+    embedding_cache.EMBEDDING_CACHE_DB = os.path.join(tempfile.mkdtemp(), 'embedding_cache.db')
+    embedding_cache.init_cache()
+
+
+def test_hit_and_miss():
+    """Saved vectors come back for the same model and text only"""
+    use_temp_cache()
+    vector = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+
+    assert embedding_cache.get_embeddings(MODEL, ["quantum computing"]) == {}
+    embedding_cache.save_embeddings(MODEL, {"quantum computing": vector})
+
+    found = embedding_cache.get_embeddings(MODEL, ["quantum computing", "unseen text"])
+    print(f"Found: {list(found)}")
+    assert list(found) == ["quantum computing"]
+    assert np.array_equal(found["quantum computing"], vector)
+    # Vectors from another model are never mixed in
+    assert embedding_cache.get_embeddings("other-model", ["quantum computing"]) == {}
+
+
+def test_lru_eviction():
+    """Above the size cap the least recently used vectors are evicted"""
+    use_temp_cache()
+    original_max = embedding_cache.EMBEDDING_CACHE_MAX_ENTRIES
+    embedding_cache.EMBEDDING_CACHE_MAX_ENTRIES = 2
+    try:
+        embedding_cache.save_embeddings(MODEL, {"a": np.ones(3)})
+        embedding_cache.save_embeddings(MODEL, {"b": np.ones(3)})
+        # Reading "a" makes "b" the least recently used
+        embedding_cache.get_embeddings(MODEL, ["a"])
+        embedding_cache.save_embeddings(MODEL, {"c": np.ones(3)})
+    finally:
+        embedding_cache.EMBEDDING_CACHE_MAX_ENTRIES = original_max
+
+    found = embedding_cache.get_embeddings(MODEL, ["a", "b", "c"])
+    print(f"Kept: {sorted(found)}")
+    assert sorted(found) == ["a", "c"]
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Embedding Cache")
+    print("="*60)
+
+    tests = [
+        ("Hit and miss", test_hit_and_miss),
+        ("LRU eviction", test_lru_eviction),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
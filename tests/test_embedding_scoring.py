@@ -0,0 +1,96 @@
+"""
+Test embedding-similarity relevance scoring (no API calls; the embedder is stubbed)
+"""
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+TOPIC = "quantum computing"
+# url: cosine similarity of its title/URL text to the topic
+SIMILARITY = {
+    "https://b.example.com/": 0.4,
+    "https://a.example.com/": 0.9,
+    "https://c.example.com/": 0.1,
+    "https://cs.example.edu/": 0.4,
+}
+
+
+def results():
+    return [{"title": f"Page {i}", "url": url} for i, url in enumerate(SIMILARITY)]
+
+
+def fake_embed_texts(texts):
+    """The topic along the x axis; each result at its configured angle from it"""
+    vectors = {TOPIC: np.array([1.0, 0.0], dtype=np.float32)}
+    for text in texts[1:]:
+        similarity = SIMILARITY[text.split("\n")[1]]
+        vectors[text] = np.array([similarity, np.sqrt(1 - similarity ** 2)], dtype=np.float32)
+    return vectors
+
+
+def score_with(embed):
+    original = research_to_pdf._embed_texts
+    research_to_pdf._embed_texts = embed
+    try:
+        return research_to_pdf.score_results_embedding(TOPIC, results())
+    finally:
+        research_to_pdf._embed_texts = original
+
+
+def test_similarity_to_score_mapping():
+    """Similarity maps linearly onto 0-70 points between the bounds; domain priors add authority"""
+    scores = score_with(fake_embed_texts)
+    print(f"Scores: {scores}")
+
+    # Neutral domains get 15 authority points: 0.4 is halfway between 0.15 and 0.65,
+    # 0.9 is above the upper bound and 0.1 below the lower one
+    assert [s['score'] for s in scores] == [50, 85, 15, 64]
+    # Scores stay aligned with the input; higher similarity scores higher
+    assert scores[1]['score'] > scores[0]['score'] > scores[2]['score']
+    assert scores[0]['reasoning'] == "Semantic similarity 0.40"
+    # A .edu host adds its prior (15 + 0.75 * 18 authority points) at the same similarity
+    assert scores[3]['reasoning'] == "Semantic similarity 0.40, .edu +18"
+
+
+def test_embedding_failure_is_neutral():
+    """If embedding fails every result gets the neutral fallback score"""
+    def failing_embed(texts):
+        raise RuntimeError("embeddings unavailable")
+
+    scores = score_with(failing_embed)
+    assert scores == [{"score": 50, "reasoning": "Unable to score"}] * 4
+    assert research_to_pdf.score_results_embedding(TOPIC, []) == []
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Embedding Scoring")
+    print("="*60)
+
+    tests = [
+        ("Similarity to score mapping", test_similarity_to_score_mapping),
+        ("Embedding failure is neutral", test_embedding_failure_is_neutral),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
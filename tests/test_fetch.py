@@ -0,0 +1,185 @@
+"""
+Test page fetching: concurrency on the shared HTTP session, the streaming byte
+cap and the Content-Type check (no network; the session is faked)
+"""
+import sys
+import os
+import time
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+
+class FakeResponse:
+    def __init__(self, url, status_code, body, content_type='text/html; charset=utf-8'):
+        self.url = url
+        self.status_code = status_code
+        self.body = body.encode('utf-8')
+        self.text = body
+        self.headers = {'Content-Type': content_type}
+        self.read = 0
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise research_to_pdf.requests.exceptions.HTTPError(f"{self.status_code} Error for {self.url}")
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            self.read += 1
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Answers GETs after a per-URL delay and records how many were in flight at once"""
+
+    def __init__(self, pages):
+        self.pages = pages  # url: (delay, status, body[, content type])
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.requested = []
+
+    def get(self, url, timeout=None, **kwargs):
+        delay, status, body, *content_type = self.pages[url]
+        with self.lock:
+            self.requested.append(url)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(delay)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        self.last = FakeResponse(url, status, body, *content_type)
+        return self.last
+
+
+def fetch_with(session, urls, **kwargs):
+    original = research_to_pdf._http_session
+    research_to_pdf._http_session = session
+    try:
+        return research_to_pdf.fetch_pages_parallel(urls, **kwargs)
+    finally:
+        research_to_pdf._http_session = original
+
+
+def test_order_and_concurrency_cap():
+    """Pages come back in input order whatever order they finish in, with at most max_workers in flight"""
+    # Each page on its own host; earlier pages are slower
+    urls = [f"https://host{i}.example/page" for i in range(12)]
+    pages = {url: (0.02 * (12 - i), 200, f"<html><body><p>Page {i}</p></body></html>")
+             for i, url in enumerate(urls)}
+    # One page fails and one is empty: both are dropped
+    pages[urls[3]] = (0.01, 500, "")
+    pages[urls[7]] = (0.01, 200, "<html><body></body></html>")
+    session = FakeSession(pages)
+
+    sources = fetch_with(session, urls, max_workers=4)
+    print(f"Fetched {len(sources)} pages, peak in flight {session.peak}")
+
+    assert [url for url, _ in sources] == [url for i, url in enumerate(urls) if i not in (3, 7)]
+    assert all(f"Page {urls.index(url)}" in content for url, content in sources)
+    assert session.peak == 4
+    assert sorted(session.requested) == sorted(urls)
+
+
+def test_session_is_shared():
+    """get_http_session() builds one pooled session and hands it to every caller"""
+    original = research_to_pdf._http_session
+    research_to_pdf._http_session = None
+    try:
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(research_to_pdf.get_http_session()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        session = sessions[0]
+        assert all(s is session for s in sessions)
+        adapter = session.get_adapter("https://example.com/")
+        assert adapter._pool_maxsize == research_to_pdf.FETCH_CONCURRENCY
+        session.close()
+    finally:
+        research_to_pdf._http_session = original
+
+
+def download_with(session, url):
+    original = research_to_pdf._http_session
+    research_to_pdf._http_session = session
+    try:
+        return research_to_pdf._download(url)
+    finally:
+        research_to_pdf._http_session = original
+
+
+def test_oversized_body_is_capped():
+    """Streaming stops at FETCH_MAX_BYTES instead of reading the whole body"""
+    url = "https://big.example/page"
+    session = FakeSession({url: (0, 200, "<p>" + "x" * (300 * 1024) + "</p>")})
+    original = research_to_pdf.FETCH_MAX_BYTES
+    research_to_pdf.FETCH_MAX_BYTES = 100 * 1024
+    try:
+        _, text = download_with(session, url)
+    finally:
+        research_to_pdf.FETCH_MAX_BYTES = original
+
+    assert len(text) == 100 * 1024
+    # Two 64 KB chunks reach the cap; the remaining ~170 KB are never read
+    assert session.last.read == 2
+    assert session.last.closed
+
+
+def test_non_html_is_rejected_unread():
+    """A PDF response is refused from its headers, before any of the body is read"""
+    url = "https://files.example/report.pdf"
+    session = FakeSession({url: (0, 200, "%PDF-1.7 ...", "application/pdf")})
+    try:
+        download_with(session, url)
+    except research_to_pdf._RejectedContent as e:
+        assert "application/pdf" in str(e)
+    else:
+        assert False, "expected _RejectedContent"
+    assert session.last.read == 0
+    assert session.last.closed
+
+    # A missing Content-Type is let through
+    session = FakeSession({url: (0, 200, "<p>Untyped</p>", "")})
+    assert download_with(session, url)[1] == "<p>Untyped</p>"
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Page Fetching")
+    print("="*60)
+
+    tests = [
+        ("Order and concurrency cap", test_order_and_concurrency_cap),
+        ("Session is shared", test_session_is_shared),
+        ("Oversized body is capped", test_oversized_body_is_capped),
+        ("Non-HTML is rejected unread", test_non_html_is_rejected_unread),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
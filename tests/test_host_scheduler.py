@@ -0,0 +1,149 @@
+"""
+Test the per-host fetch scheduler: politeness, circuit breaker, adaptive timeouts (no network needed)
+"""
+import sys
+import os
+import time
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import host_scheduler
+from host_scheduler import HostScheduler, HostUnavailable
+
+
+def test_per_host_concurrency_and_delay():
+    """At most max_concurrency downloads per host, starts spaced by min_delay; other hosts unaffected"""
+    scheduler = HostScheduler(max_concurrency=2, min_delay=0.05)
+    running = {}
+    peak = {}
+    starts = {}
+    lock = threading.Lock()
+
+    def fetch(url):
+        host = scheduler.host_key(url)
+        with scheduler.slot(url):
+            with lock:
+                running[host] = running.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), running[host])
+                starts.setdefault(host, []).append(time.time())
+            time.sleep(0.1)
+            with lock:
+                running[host] -= 1
+
+    urls = [f"https://slow.example/{i}" for i in range(6)] + [f"https://other.example/{i}" for i in range(2)]
+    threads = [threading.Thread(target=fetch, args=(u,)) for u in urls]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"Peak per host: {peak}")
+    assert peak["slow.example"] == 2
+    assert peak["other.example"] == 2
+    slow_starts = sorted(starts["slow.example"])
+    gaps = [b - a for a, b in zip(slow_starts, slow_starts[1:])]
+    assert min(gaps) >= 0.045, gaps
+
+
+def test_circuit_breaker():
+    """Repeated timeouts open the circuit; the host then fails fast until a half-open trial succeeds"""
+    scheduler = HostScheduler(failure_types=(TimeoutError,), min_delay=0)
+    url = "https://dead.example/page"
+
+    for _ in range(host_scheduler.BREAKER_FAILURES):
+        try:
+            with scheduler.slot(url):
+                raise TimeoutError("read timed out")
+        except TimeoutError:
+            pass
+
+    started = time.time()
+    try:
+        with scheduler.slot(url):
+            assert False, "slot should not be granted while the circuit is open"
+        assert False, "expected HostUnavailable"
+    except HostUnavailable as e:
+        print(f"Fast-failed: {e}")
+    assert time.time() - started < 0.05
+    assert scheduler.get_stats()["dead.example"]["circuit"] == "open"
+
+    # Other hosts and non-timeout errors are unaffected
+    with scheduler.slot("https://alive.example/"):
+        pass
+    try:
+        with scheduler.slot("https://alive.example/404"):
+            raise ValueError("HTTP 404")
+    except ValueError:
+        pass
+    assert scheduler.get_stats()["alive.example"]["recent_failures"] == 0
+
+    # After the cooldown a single trial goes through and closes the circuit on success
+    scheduler._hosts["dead.example"].open_until = time.time() - 1
+    with scheduler.slot(url):
+        assert scheduler.get_stats()["dead.example"]["circuit"] == "half-open"
+    assert scheduler.get_stats()["dead.example"]["circuit"] == "closed"
+
+
+def test_failed_trial_reopens():
+    """A failing half-open trial re-opens the circuit immediately"""
+    scheduler = HostScheduler(failure_types=(TimeoutError,), min_delay=0)
+    url = "https://flaky.example/"
+    scheduler._hosts["flaky.example"] = host_scheduler._Host(1)
+    scheduler._hosts["flaky.example"].open_until = time.time() - 1
+
+    try:
+        with scheduler.slot(url):
+            raise TimeoutError()
+    except TimeoutError:
+        pass
+    assert scheduler.get_stats()["flaky.example"]["circuit"] == "open"
+
+
+def test_adaptive_timeout():
+    """Fast hosts get a short timeout from their latency history, clamped to the configured range"""
+    scheduler = HostScheduler(min_delay=0)
+    assert scheduler.timeout_for("fast.example") == host_scheduler.TIMEOUT_MAX_SECONDS
+
+    for _ in range(5):
+        with scheduler.slot("https://fast.example/") as timeout:
+            time.sleep(0.01)
+    print(f"Timeout after fast responses: {timeout}s -> {scheduler.timeout_for('fast.example')}s")
+    assert scheduler.timeout_for("fast.example") == host_scheduler.TIMEOUT_MIN_SECONDS
+
+    state = scheduler._hosts["fast.example"]
+    state.latencies.extend([2.0] * 10)
+    assert scheduler.timeout_for("fast.example") == min(host_scheduler.TIMEOUT_MAX_SECONDS,
+                                                        2.0 * host_scheduler.TIMEOUT_MULTIPLIER)
+    state.latencies.extend([60.0] * 10)
+    assert scheduler.timeout_for("fast.example") == host_scheduler.TIMEOUT_MAX_SECONDS
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Host Scheduler")
+    print("="*60)
+
+    tests = [
+        ("Per-host concurrency and delay", test_per_host_concurrency_and_delay),
+        ("Circuit breaker", test_circuit_breaker),
+        ("Failed trial re-opens", test_failed_trial_reopens),
+        ("Adaptive timeout", test_adaptive_timeout),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
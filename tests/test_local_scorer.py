@@ -0,0 +1,86 @@
+"""
+Test the local (no API) relevance scorer used by the 'fast' AI enhancement mode
+"""
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import local_scorer
+
+topic = "quantum computing"
+test_results = [
+    {"title": "Quantum Computing Basics - MIT", "url": "https://mit.edu/quantum-computing"},
+    {"title": "Introduction to Quantum", "url": "https://example.com/quantum"},
+    {"title": "Top 10 Quantum Stocks to Buy!", "url": "https://spam.com/buy"},
+    {"title": "Cooking pasta at home", "url": "https://pinterest.com/pasta"},
+]
+
+
+def test_scores_in_range_and_ranked():
+    """Scores are 0-100 and authoritative, on-topic results rank above spam"""
+    scores = local_scorer.score_results_local(topic, test_results)
+    for result, score in zip(test_results, scores):
+        print(f"  [{score['score']:3d}] {result['title']} - {score['reasoning']}")
+        assert 0 <= score['score'] <= 100
+        assert score['reasoning']
+
+    assert scores[0]['score'] > scores[1]['score'] > scores[2]['score']
+    assert scores[3]['score'] < 40
+
+
+def test_domain_prior():
+    """Domain priors recognize academic, docs and low-quality hosts"""
+    assert local_scorer.domain_prior("https://www.arxiv.org/abs/1234")[0] > 0
+    assert local_scorer.domain_prior("https://cs.stanford.edu/page")[1] == ".edu"
+    assert local_scorer.domain_prior("https://docs.python.org/3/")[1] == "docs site"
+    assert local_scorer.domain_prior("https://www.pinterest.com/pin/1")[0] < 0
+    assert local_scorer.domain_prior("https://example.com/")[0] == 0
+
+
+def test_empty_inputs():
+    """Empty topic or result lists don't fail"""
+    assert local_scorer.score_results_local(topic, []) == []
+    assert len(local_scorer.score_results_local("", test_results)) == len(test_results)
+
+
+def test_many_results_fast():
+    """Hundreds of results rank in well under a second"""
+    many = test_results * 150
+    start = time.time()
+    scores = local_scorer.score_results_local(topic, many, queries=["quantum computing tutorial"])
+    elapsed = time.time() - start
+    print(f"  Scored {len(many)} results in {elapsed * 1000:.1f}ms")
+    assert len(scores) == len(many)
+    assert elapsed < 1.0
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Local Relevance Scorer")
+    print("="*60)
+
+    tests = [
+        ("Scores in range and ranked", test_scores_in_range_and_ranked),
+        ("Domain priors", test_domain_prior),
+        ("Empty inputs", test_empty_inputs),
+        ("Many results", test_many_results_fast),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,115 @@
+"""
+Test the disk-backed fetched-page cache (no network needed)
+"""
+import sys
+import os
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import page_cache
+
+
+def use_temp_cache():
+    """Point the cache module at a fresh temporary database"""
+    page_cache.PAGE_CACHE_DB = os.path.join(tempfile.mkdtemp(), 'page_cache.db')
+    page_cache.init_cache()
+
+
+def test_hit_and_canonical_key():
+    """A saved page is found again under an equivalent URL, with raw and cleaned content"""
+    use_temp_cache()
+    raw = "<html><body><p>Hello</p></body></html>"
+    page_cache.save_page("https://Example.com/docs/", raw, "<p>Hello</p>", etag='"abc"')
+
+    assert page_cache.get_page("https://other.com/") is None
+
+    cached = page_cache.get_page("https://example.com/docs#intro")
+    print(f"Cached: {cached}")
+    assert cached['fresh']
+    assert cached['content'] == "<p>Hello</p>"
+    assert cached['etag'] == '"abc"'
+    assert page_cache.get_raw("https://example.com/docs") == raw
+
+    stats = page_cache.get_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+
+def test_stale_and_revalidated():
+    """Entries past the TTL are stale until revalidated"""
+    use_temp_cache()
+    page_cache.save_page("https://example.com/a", "raw", "<p>a</p>", last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    original_ttl = page_cache.PAGE_CACHE_TTL_SECONDS
+    page_cache.PAGE_CACHE_TTL_SECONDS = -1
+    try:
+        cached = page_cache.get_page("https://example.com/a")
+        assert not cached['fresh']
+        assert cached['last_modified'] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    finally:
+        page_cache.PAGE_CACHE_TTL_SECONDS = original_ttl
+
+    page_cache.mark_revalidated("https://example.com/a")
+    assert page_cache.get_page("https://example.com/a")['fresh']
+    assert page_cache.get_cache_stats()['revalidated'] == 1
+
+
+def test_size_capped_lru():
+    """Least recently used pages are evicted once the total size exceeds the cap"""
+    use_temp_cache()
+    # Incompressible-ish content so each entry has a predictable size
+    pages = {name: os.urandom(3000).hex() for name in ("first", "second", "third")}
+
+    page_cache.save_page("https://example.com/first", "", pages["first"])
+    size = page_cache.get_cache_stats()['size_bytes']
+
+    original_max = page_cache.PAGE_CACHE_MAX_BYTES
+    page_cache.PAGE_CACHE_MAX_BYTES = int(size * 2.5)
+    try:
+        time.sleep(0.01)
+        page_cache.save_page("https://example.com/second", "", pages["second"])
+        time.sleep(0.01)
+        # Touch "first" so "second" becomes least recently used
+        assert page_cache.get_page("https://example.com/first") is not None
+        time.sleep(0.01)
+        page_cache.save_page("https://example.com/third", "", pages["third"])
+
+        assert page_cache.get_page("https://example.com/second") is None
+        assert page_cache.get_page("https://example.com/first") is not None
+        assert page_cache.get_page("https://example.com/third") is not None
+        stats = page_cache.get_cache_stats()
+        assert stats['entries'] == 2
+        assert stats['evictions'] == 1
+    finally:
+        page_cache.PAGE_CACHE_MAX_BYTES = original_max
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Page Cache")
+    print("="*60)
+
+    tests = [
+        ("Hit and canonical key", test_hit_and_canonical_key),
+        ("Stale and revalidated", test_stale_and_revalidated),
+        ("Size-capped LRU", test_size_capped_lru),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
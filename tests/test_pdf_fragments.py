@@ -0,0 +1,184 @@
+"""
+Test pack assembly from cached per-source fragments (no WeasyPrint needed; renders are faked)
+"""
+import sys
+import os
+import io
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pypdf import PdfReader, PdfWriter
+import render_service
+import pdf_fragments
+
+rendered = []
+
+
+def fake_pdf_bytes(html_str):
+    """Blank A4 pages: one per overlay sheet, plus one per three paragraphs (at least one)"""
+    rendered.append(html_str)
+    pages = html_str.count('class="sheet"') + 1 + html_str.count('<p>') // 3
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(595, 842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue(), {'served': 0, 'blocked': 0, 'over_budget': 0}
+
+
+def use_fake_renderer():
+    """Render in-process with the fake renderer, into a fresh fragment cache"""
+    render_service.RENDER_WORKERS = 0
+    render_service._pdf_bytes = fake_pdf_bytes
+    pdf_fragments.FRAGMENT_CACHE_DB = os.path.join(tempfile.mkdtemp(), 'pdf_fragments.db')
+    pdf_fragments.init_fragments()
+    rendered.clear()
+
+
+def source(n, paragraphs=2):
+    return (f"https://site{n}.example/article", "".join(f"<p>Paragraph {i}</p>" for i in range(paragraphs)))
+
+
+def test_pack_pages_and_bookmarks():
+    """The pack has a cover, every fragment's pages and a bookmark per source"""
+    use_fake_renderer()
+    output = os.path.join(tempfile.mkdtemp(), 'pack.pdf')
+    sources = [source(1), source(2, paragraphs=7)]
+    stats = pdf_fragments.build_pack("Topic", sources, output,
+                                     {"https://site2.example/article": [("https://mirror.example/", 0.98)]})
+    print(f"Stats: {stats}")
+
+    reader = PdfReader(output)
+    # Cover (1) + source 1 (1) + source 2 (3)
+    assert len(reader.pages) == 5
+    assert stats == {'fragments': 2, 'cached': 0, 'rendered': 2, 'pages': 5}
+    titles = [item.title for item in reader.outline if not isinstance(item, list)]
+    assert titles == ["Contents", "Source 1: site1.example", "Source 2: site2.example"]
+
+    # One render for the cover and the overlay: the cover lists where each
+    # source starts, the overlay labels every fragment page
+    cover = rendered[-1]
+    assert "<h2>Contents</h2>" in cover
+    assert "<span class='page'>2</span>" in cover and "<span class='page'>3</span>" in cover
+    assert cover.count('class="sheet"') == 4
+    assert cover.count("Source 2 of 2") == 3
+    assert "Also published at: https://mirror.example/" in rendered[1]
+
+
+def test_incremental_rebuild():
+    """Adding a source renders only that source; fragments are reused at any position"""
+    use_fake_renderer()
+    output = os.path.join(tempfile.mkdtemp(), 'pack.pdf')
+    pdf_fragments.build_pack("Topic", [source(1), source(2)], output)
+
+    rendered.clear()
+    stats = pdf_fragments.build_pack("Topic", [source(3), source(2), source(1)], output)
+    assert stats['cached'] == 2
+    assert stats['rendered'] == 1
+    # The new fragment and the cover with the overlay
+    assert len(rendered) == 2
+    assert len(PdfReader(output).pages) == 4
+
+    cache = pdf_fragments.get_fragment_stats()
+    print(f"Cache: {cache}")
+    assert cache['entries'] == 3
+    assert cache['hits'] == 2
+
+
+def test_cover_page_count_settles():
+    """A cover longer than one page is rendered again with shifted contents page numbers"""
+    use_fake_renderer()
+    output = os.path.join(tempfile.mkdtemp(), 'pack.pdf')
+    sources = [source(1), source(2)]
+
+    def two_page_cover(html_str):
+        pdf, stats = fake_pdf_bytes(html_str)
+        if "<h2>Contents</h2>" not in html_str:
+            return pdf, stats
+        writer = PdfWriter(clone_from=PdfReader(io.BytesIO(pdf)))
+        writer.insert_blank_page(595, 842, index=0)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue(), stats
+
+    render_service._pdf_bytes = two_page_cover
+    stats = pdf_fragments.build_pack("Topic", sources, output)
+    assert stats['pages'] == 4
+    assert len(PdfReader(output).pages) == 4
+    # A first guess of one cover page, then the render that settled on two
+    covers = [html for html in rendered if "<h2>Contents</h2>" in html]
+    assert len(covers) == 2
+    assert "<span class='page'>3</span>" in covers[-1] and "<span class='page'>4</span>" in covers[-1]
+
+
+def test_cover_page_count_must_settle():
+    """A cover whose length keeps flipping with its own page numbers fails loudly"""
+    use_fake_renderer()
+    output = os.path.join(tempfile.mkdtemp(), 'pack.pdf')
+
+    def flipping_cover(html_str):
+        # One cover page when it claims two, two when it claims one
+        extra = "<p></p>" * 3 if "<span class='page'>2</span>" in html_str else ""
+        return fake_pdf_bytes(html_str + extra)
+
+    render_service._pdf_bytes = flipping_cover
+    try:
+        pdf_fragments.build_pack("Topic", [source(1)], output)
+    except RuntimeError as e:
+        assert "does not settle" in str(e)
+    else:
+        assert False, "expected RuntimeError"
+
+
+def test_stylesheet_change_invalidates():
+    """Fragments rendered under another stylesheet are not reused"""
+    use_fake_renderer()
+    output = os.path.join(tempfile.mkdtemp(), 'pack.pdf')
+    html = pdf_fragments.fragment_html(*source(1))
+    old_key = pdf_fragments.fragment_key(html)
+
+    original = pdf_fragments.STYLESHEET_VERSION
+    pdf_fragments.STYLESHEET_VERSION = "changed"
+    try:
+        assert pdf_fragments.fragment_key(html) != old_key
+        pdf_fragments.build_pack("Topic", [source(1)], output)
+    finally:
+        pdf_fragments.STYLESHEET_VERSION = original
+
+    # Back on the current stylesheet, the fragment is rendered again and the stale one evicted
+    rendered.clear()
+    stats = pdf_fragments.build_pack("Topic", [source(1)], output)
+    assert stats['rendered'] == 1
+    assert pdf_fragments.get_fragment_stats()['entries'] == 1
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing PDF Fragments")
+    print("="*60)
+
+    tests = [
+        ("Pack pages and bookmarks", test_pack_pages_and_bookmarks),
+        ("Incremental rebuild", test_incremental_rebuild),
+        ("Cover page count settles", test_cover_page_count_settles),
+        ("Cover page count must settle", test_cover_page_count_must_settle),
+        ("Stylesheet change invalidates", test_stylesheet_change_invalidates),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
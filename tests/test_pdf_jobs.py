@@ -0,0 +1,214 @@
+"""
+Test the background PDF job queue (no network needed; fetch and render are faked)
+"""
+import sys
+import os
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import content_dedupe
+import blob_store
+import pdf_jobs
+
+
+def use_temp_jobs():
+    """Point the job and content index modules at fresh temporary databases"""
+    temp_dir = tempfile.mkdtemp()
+    pdf_jobs.PDF_JOBS_DB = os.path.join(temp_dir, 'pdf_jobs.db')
+    pdf_jobs.init_jobs()
+    content_dedupe.CONTENT_INDEX_DB = os.path.join(temp_dir, 'content_index.db')
+    content_dedupe.init_index()
+
+
+def fake_fetch(urls, stats=None, on_progress=None):
+    sources = []
+    for i, url in enumerate(urls):
+        time.sleep(0.05)
+        sources.append((url, f"<p>Body of {url}</p>"))
+        stats[url] = {'full_bytes': 1000, 'saved_bytes': 400}
+        on_progress(i + 1, len(urls))
+    return sources
+
+
+def fake_build_pack(rendered):
+    def build_pack_pdf(topic, sources, output_path, duplicates=None, on_progress=None, backend=None):
+        rendered.append(output_path)
+        on_progress(len(sources), len(sources))
+        return {'backend': backend or 'weasyprint', 'fragments': len(sources), 'cached': 0,
+                'rendered': len(sources), 'pages': None}
+    return build_pack_pdf
+
+
+def wait_for(job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = pdf_jobs.get_status(job_id)
+        if status['status'] in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_runs_in_background():
+    """submit() returns at once; the job goes through every stage and reports its result"""
+    use_temp_jobs()
+    original = (pdf_jobs.fetch_pages_parallel, pdf_jobs.build_pack_pdf)
+    rendered = []
+    completed = []
+
+    def on_complete(result):
+        completed.append(result)
+        result['insights'] = ["computed once"]
+
+    pdf_jobs.fetch_pages_parallel = fake_fetch
+    pdf_jobs.build_pack_pdf = fake_build_pack(rendered)
+    try:
+        urls = [f"https://example{i}.com/" for i in range(4)]
+        started = time.time()
+        job_id = pdf_jobs.submit("Job Topic", urls, on_complete=on_complete)
+        assert time.time() - started < 0.2
+
+        status = pdf_jobs.get_status(job_id)
+        assert status['status'] in ('queued', 'running')
+        assert status['eta_seconds'] is not None
+        # Known before the fetch stage has started
+        assert status['sources'] == 4
+
+        status = wait_for(job_id)
+        print(f"Status: {status}")
+        assert status['status'] == 'done'
+        assert status['progress'] == 1.0
+        assert status['output_pdf'] == f"Job_Topic_{job_id}.pdf"
+        assert rendered == [f"Job_Topic_{job_id}.pdf"]
+        assert all(stage['status'] == 'done' for stage in status['stages'])
+        assert status['stages'][0]['done'] == 4
+        assert status['result']['sources'] == 4
+        assert status['result']['saved_bytes'] == 1600
+        # Entries added by on_complete are stored with the result
+        assert completed == [status['result']]
+        assert status['result']['insights'] == ["computed once"]
+    finally:
+        pdf_jobs.fetch_pages_parallel, pdf_jobs.build_pack_pdf = original
+
+
+def test_failed_job_reports_error():
+    """A job whose sources can't be fetched fails with the error, not a stuck progress bar"""
+    use_temp_jobs()
+    original = pdf_jobs.fetch_pages_parallel
+    pdf_jobs.fetch_pages_parallel = lambda urls, stats=None, on_progress=None: []
+    try:
+        status = wait_for(pdf_jobs.submit("Nothing", ["https://down.example/"]))
+        assert status['status'] == 'failed'
+        assert "No content could be fetched" in status['error']
+        assert status['stages'][0]['status'] == 'failed'
+        assert status['eta_seconds'] is None
+    finally:
+        pdf_jobs.fetch_pages_parallel = original
+
+    assert pdf_jobs.get_status("unknown") is None
+
+
+def test_eta_learned_from_history():
+    """Completed jobs replace the default per-source stage times"""
+    use_temp_jobs()
+    defaults = pdf_jobs._stage_seconds_per_source()
+    assert defaults == pdf_jobs.DEFAULT_STAGE_SECONDS
+
+    original = (pdf_jobs.fetch_pages_parallel, pdf_jobs.build_pack_pdf)
+    pdf_jobs.fetch_pages_parallel = fake_fetch
+    pdf_jobs.build_pack_pdf = fake_build_pack([])
+    try:
+        wait_for(pdf_jobs.submit("History", ["https://a.example/", "https://b.example/"]))
+    finally:
+        pdf_jobs.fetch_pages_parallel, pdf_jobs.build_pack_pdf = original
+
+    learned = pdf_jobs._stage_seconds_per_source()
+    print(f"Learned seconds per source: {learned}")
+    # Fake fetch takes ~0.05s per source, far below the 1.5s default
+    assert 0.03 < learned['fetch'] < 0.5
+
+
+def test_offline_rebuild():
+    """A rebuild renders stored bodies to its own file, lists what's missing and never fetches"""
+    use_temp_jobs()
+    stored, unstored = "https://stored.example/", "https://gone.example/"
+    blob_store.put_url(stored, "<p>Stored body</p>")
+
+    def no_fetch(*args, **kwargs):
+        raise AssertionError("a rebuild must not fetch")
+
+    original = (pdf_jobs.fetch_pages_parallel, pdf_jobs.build_pack_pdf)
+    rendered = []
+    pdf_jobs.fetch_pages_parallel = no_fetch
+    pdf_jobs.build_pack_pdf = fake_build_pack(rendered)
+    try:
+        first = wait_for(pdf_jobs.submit_rebuild(9001, "Rebuilt Topic", [stored, unstored]))
+        second = wait_for(pdf_jobs.submit_rebuild(9001, "Rebuilt Topic", [stored, unstored]))
+        nothing = wait_for(pdf_jobs.submit_rebuild(9002, "Empty", [unstored]))
+    finally:
+        pdf_jobs.fetch_pages_parallel, pdf_jobs.build_pack_pdf = original
+
+    print(f"Status: {first}")
+    assert first['status'] == 'done'
+    assert first['result']['sources'] == 1
+    assert first['result']['missing'] == [unstored]
+    assert first['result']['offline']
+    # Each rebuild writes its own file
+    assert rendered == [f"Rebuilt_Topic_{first['id']}.pdf", f"Rebuilt_Topic_{second['id']}.pdf"]
+    assert not blob_store.has_session(9001)
+
+    assert nothing['status'] == 'failed'
+    assert "No stored content" in nothing['error']
+    # Rebuilds don't feed the ETA estimate
+    assert pdf_jobs._stage_seconds_per_source() == pdf_jobs.DEFAULT_STAGE_SECONDS
+
+
+def test_interrupted_jobs_marked_failed():
+    """Jobs left queued by a process that is gone fail on startup instead of polling forever"""
+    use_temp_jobs()
+    with pdf_jobs.get_jobs_db() as conn:
+        conn.cursor().execute("""
+            INSERT INTO pdf_jobs (id, topic, urls, status, worker_pid, stages, created_at)
+            VALUES ('orphan', 'Lost', '[]', 'running', NULL, '{}', ?)
+        """, (time.time(),))
+    pdf_jobs.init_jobs()
+
+    with pdf_jobs.get_jobs_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, error FROM pdf_jobs WHERE id = 'orphan'")
+        row = cursor.fetchone()
+    assert row['status'] == 'failed'
+    assert "restart" in row['error']
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing PDF Jobs")
+    print("="*60)
+
+    tests = [
+        ("Job runs in background", test_job_runs_in_background),
+        ("Failed job reports error", test_failed_job_reports_error),
+        ("ETA learned from history", test_eta_learned_from_history),
+        ("Offline rebuild", test_offline_rebuild),
+        ("Interrupted jobs marked failed", test_interrupted_jobs_marked_failed),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,147 @@
+"""
+Test speculative prefetch: which URLs are picked, background warming and cancellation
+(no network; fetch_and_clean() is faked)
+"""
+import sys
+import os
+import time
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+
+class BlockingFetch:
+    """Stands in for fetch_and_clean(); every call waits until release()"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = []
+
+    def __call__(self, url, *args, **kwargs):
+        self.started.append(url)
+        self.gate.wait(5)
+        return "<p>ok</p>"
+
+    def release(self):
+        self.gate.set()
+
+    def wait_started(self, count):
+        deadline = time.time() + 2
+        while len(self.started) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+
+def with_fetch(fake, test):
+    original = research_to_pdf.fetch_and_clean
+    research_to_pdf.fetch_and_clean = fake
+    try:
+        test()
+    finally:
+        fake.release()
+        research_to_pdf.fetch_and_clean = original
+        research_to_pdf._prefetch_executor.submit(lambda: None).result(timeout=5)
+
+
+def test_pick_prefetch_urls():
+    """Pre-checked sources come first, then the best-scored of the rest; rejected ones never"""
+    urls = [{"url": f"https://site{i}.example/", "relevance_score": i} for i in range(14)]
+    urls[2]['is_rejected'] = True
+    urls[12]['is_preferred'] = True
+
+    picked = research_to_pdf.pick_prefetch_urls(urls, max_urls=12)
+    prechecked = [f"https://site{i}.example/" for i in (0, 1, 3, 4, 5, 6, 7, 8, 9, 12)]
+    assert picked == prechecked + ["https://site13.example/", "https://site11.example/"]
+    assert research_to_pdf.pick_prefetch_urls(urls, max_urls=3) == prechecked[:3]
+
+
+def test_prefetch_in_background_and_cancel():
+    """Prefetch returns at once; cancelling drops queued fetches while running ones finish"""
+    fake = BlockingFetch()
+    urls = [f"https://site{i}.example/" for i in range(6)]
+    workers = research_to_pdf.PREFETCH_WORKERS
+
+    def test():
+        started = time.perf_counter()
+        research_to_pdf.prefetch_pages("session-1", urls)
+        assert time.perf_counter() - started < 0.5
+        fake.wait_started(workers)
+        assert fake.started == urls[:workers]
+
+        # A second job skips URLs that are already being prefetched
+        research_to_pdf.prefetch_pages("session-2", urls[:2] + ["https://other.example/"])
+        assert list(research_to_pdf._prefetch_jobs["session-2"]) == ["https://other.example/"]
+
+        queued = [research_to_pdf._prefetch_jobs["session-1"][url] for url in urls[workers:]]
+        research_to_pdf.cancel_prefetch("session-1")
+        research_to_pdf.cancel_prefetch("session-2")
+        assert "session-1" not in research_to_pdf._prefetch_jobs
+        assert all(future.cancelled() for future in queued)
+        fake.release()
+
+        # Joining a running prefetch waits for it to land in the cache
+        research_to_pdf._join_prefetch(urls[0])
+        assert not research_to_pdf._prefetch_jobs
+
+    with_fetch(fake, test)
+    # Only the fetches that were already running happened
+    assert fake.started == urls[:workers]
+
+
+def test_join_only_running_prefetches():
+    """A real fetch waits for a running prefetch but takes over a queued one"""
+    fake = BlockingFetch()
+    workers = research_to_pdf.PREFETCH_WORKERS
+    urls = [f"https://site{i}.example/" for i in range(workers + 2)]
+
+    def test():
+        research_to_pdf.prefetch_pages("session", urls)
+        fake.wait_started(workers)
+        queued = research_to_pdf._prefetch_jobs["session"][urls[-1]]
+
+        # Queued: cancelled on the spot, so the caller fetches the page itself
+        started = time.perf_counter()
+        research_to_pdf._join_prefetch(urls[-1])
+        assert time.perf_counter() - started < 0.1
+        assert queued.cancelled()
+        research_to_pdf.cancel_prefetch("session")
+
+        # Running: waited for until it lands in the cache
+        threading.Timer(0.2, fake.release).start()
+        started = time.perf_counter()
+        research_to_pdf._join_prefetch(urls[0])
+        assert time.perf_counter() - started >= 0.15
+
+    with_fetch(fake, test)
+    assert fake.started == urls[:workers]
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Prefetch")
+    print("="*60)
+
+    tests = [
+        ("Pick prefetch URLs", test_pick_prefetch_urls),
+        ("Prefetch in background and cancel", test_prefetch_in_background_and_cancel),
+        ("Join only running prefetches", test_join_only_running_prefetches),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
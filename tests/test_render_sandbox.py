@@ -0,0 +1,123 @@
+"""
+Test the render sandbox URL fetcher (no WeasyPrint needed; the fetcher is called directly)
+"""
+import sys
+import os
+import tempfile
+from urllib.request import pathname2url
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_sandbox
+
+
+def assets():
+    """An asset directory with a stylesheet, and a file outside it"""
+    root = tempfile.mkdtemp()
+    asset_dir = os.path.join(root, 'assets')
+    os.makedirs(asset_dir)
+    with open(os.path.join(asset_dir, 'pack.css'), 'w') as f:
+        f.write("body { font-family: serif; }")
+    with open(os.path.join(root, 'secret.txt'), 'w') as f:
+        f.write("not for renders")
+    return asset_dir
+
+
+def file_url(path):
+    return "file:" + pathname2url(path)
+
+
+def blocked(fetcher, url):
+    try:
+        fetcher(url)
+    except render_sandbox.ResourceBlocked:
+        return True
+    return False
+
+
+def test_serves_local_assets():
+    """Files in an asset directory are served with their MIME type"""
+    asset_dir = assets()
+    fetcher = render_sandbox.SandboxFetcher(asset_dirs=[asset_dir])
+    result = fetcher(file_url(os.path.join(asset_dir, 'pack.css')))
+    assert result['string'] == b"body { font-family: serif; }"
+    assert result['mime_type'] == "text/css"
+    assert result['encoding'] == "utf-8"
+    assert fetcher.stats['served'] == 1
+
+    # Binary assets carry no charset
+    with open(os.path.join(asset_dir, 'font.woff2'), 'wb') as f:
+        f.write(b"wOF2")
+    assert 'encoding' not in fetcher(file_url(os.path.join(asset_dir, 'font.woff2')))
+
+
+def test_default_assets():
+    """The default allowlist holds the pack stylesheet, and relative links resolve to it"""
+    fetcher = render_sandbox.SandboxFetcher()
+    result = fetcher(render_sandbox.base_url() + "pack.css")
+    assert b".source-url" in result['string']
+
+
+def test_blocks_everything_else():
+    """Remote URLs, files outside the assets and escapes via .. or symlinks are refused"""
+    asset_dir = assets()
+    os.symlink(os.path.join(asset_dir, '..', 'secret.txt'), os.path.join(asset_dir, 'link.txt'))
+    fetcher = render_sandbox.SandboxFetcher(asset_dirs=[asset_dir])
+    urls = [
+        "https://example.com/tracker.png",
+        "http://127.0.0.1:8080/admin",
+        "ftp://example.com/file.css",
+        file_url(os.path.join(asset_dir, '..', 'secret.txt')),
+        file_url(os.path.join(asset_dir, 'link.txt')),
+        file_url(os.path.join(asset_dir, 'missing.css')),
+        "file://remote-host" + pathname2url(os.path.join(asset_dir, 'pack.css')),
+    ]
+    for url in urls:
+        assert blocked(fetcher, url), url
+    print(f"Stats: {fetcher.stats}")
+    assert fetcher.stats['blocked'] == len(urls)
+    assert fetcher.stats['served'] == 0
+
+    # No asset directories: nothing on disk is served
+    assert blocked(render_sandbox.SandboxFetcher(asset_dirs=[]), file_url(os.path.join(asset_dir, 'pack.css')))
+
+
+def test_fetch_budget():
+    """Once the render has spent its fetch budget, further resources are refused"""
+    asset_dir = assets()
+    url = file_url(os.path.join(asset_dir, 'pack.css'))
+    fetcher = render_sandbox.SandboxFetcher(asset_dirs=[asset_dir], budget_seconds=0.5)
+    fetcher(url)
+    fetcher.stats['seconds'] = 0.5
+    assert blocked(fetcher, url)
+    assert fetcher.stats == {'served': 1, 'blocked': 0, 'over_budget': 1, 'seconds': 0.5}
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Render Sandbox")
+    print("="*60)
+
+    tests = [
+        ("Serves local assets", test_serves_local_assets),
+        ("Default assets", test_default_assets),
+        ("Blocks everything else", test_blocks_everything_else),
+        ("Fetch budget", test_fetch_budget),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
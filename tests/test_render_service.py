@@ -0,0 +1,175 @@
+"""
+Test the process-pool render service (no WeasyPrint needed; renders are faked)
+"""
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+import subprocess
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_service
+
+
+# Fake renders run in worker processes, so they have to be module-level
+def fake_render(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def failing_render():
+    raise ValueError("bad markup")
+
+
+def greedy_render(megabytes):
+    return len(bytearray(megabytes * 1024 * 1024))
+
+
+def use_pool(workers=2, memory_limit_mb=0):
+    """Restart the pool with the given settings"""
+    render_service.shutdown()
+    render_service.RENDER_WORKERS = workers
+    render_service.RENDER_MEMORY_LIMIT_MB = memory_limit_mb
+
+
+def test_renders_run_in_parallel_processes():
+    """Concurrent renders run in separate worker processes, not in the caller"""
+    use_pool(workers=2)
+    try:
+        # Warm up so worker startup isn't timed
+        render_service.run(fake_render, 0)
+        pids = []
+        threads = [threading.Thread(target=lambda: pids.append(render_service.run(fake_render, 1)))
+                   for _ in range(2)]
+        started = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - started
+        print(f"Two 1s renders took {elapsed:.2f}s in workers {pids}")
+        assert elapsed < 1.8
+        assert len(set(pids)) == 2
+        assert os.getpid() not in pids
+    finally:
+        render_service.shutdown()
+
+
+def test_timeout():
+    """A render past its time limit is stopped and reported as a timeout"""
+    use_pool(workers=1)
+    try:
+        started = time.time()
+        try:
+            render_service.run(fake_render, 30, timeout=0.5)
+            assert False, "expected RenderTimeout"
+        except render_service.RenderTimeout:
+            pass
+        assert time.time() - started < 10
+        assert render_service.get_render_stats()['timeouts'] >= 1
+
+        # The worker is usable again afterwards
+        assert render_service.run(fake_render, 0) > 0
+    finally:
+        render_service.shutdown()
+
+
+def test_errors_are_render_errors():
+    """Exceptions in a render come back as RenderError"""
+    use_pool(workers=1)
+    try:
+        try:
+            render_service.run(failing_render)
+            assert False, "expected RenderError"
+        except render_service.RenderError as e:
+            assert "bad markup" in str(e)
+    finally:
+        render_service.shutdown()
+
+
+def test_memory_limit():
+    """A render allocating more than the worker's memory limit fails instead of growing"""
+    if render_service.resource is None:
+        return
+    use_pool(workers=1, memory_limit_mb=512)
+    try:
+        assert render_service.run(greedy_render, 16) == 16 * 1024 * 1024
+        try:
+            render_service.run(greedy_render, 1024)
+            assert False, "expected RenderError"
+        except render_service.RenderError as e:
+            print(f"Over the limit: {e}")
+    finally:
+        use_pool(workers=render_service.RENDER_WORKERS)
+
+
+LAUNCHER = """
+import os, sys, json
+sys.path.insert(0, {src!r})
+# Stands in for the app's import-time work (memory layer, DB initializers)
+with open({marker!r}, "a") as f:
+    f.write(str(os.getpid()) + "\\n")
+import render_service
+
+if __name__ == "__main__":
+    render_service.RENDER_WORKERS = 1
+    render_service.RENDER_MAX_TASKS_PER_WORKER = 1
+    pids = [render_service.run(os.getpid) for _ in range(3)]
+    render_service.shutdown()
+    print(json.dumps(pids))
+"""
+
+
+def test_workers_do_not_rerun_main_script():
+    """Workers (including recycled ones) don't re-run the top level of the script that started the server"""
+    directory = tempfile.mkdtemp()
+    marker = os.path.join(directory, 'imports.txt')
+    script = os.path.join(directory, 'app.py')
+    with open(script, 'w') as f:
+        f.write(LAUNCHER.format(src=os.path.abspath(os.path.dirname(render_service.__file__)), marker=marker))
+
+    result = subprocess.run([sys.executable, script], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    pids = json.loads(result.stdout.strip().splitlines()[-1])
+    with open(marker) as f:
+        runs = f.read().split()
+    print(f"Worker pids {pids}, top level ran in {runs}")
+    # One worker per render (max one task each), none of them ran the script
+    assert len(set(pids)) == 3
+    assert len(runs) == 1
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Render Service")
+    print("="*60)
+
+    tests = [
+        ("Renders run in parallel processes", test_renders_run_in_parallel_processes),
+        ("Timeout", test_timeout),
+        ("Errors are RenderErrors", test_errors_are_render_errors),
+        ("Memory limit", test_memory_limit),
+        ("Workers do not re-run main script", test_workers_do_not_rerun_main_script),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # Workers don't load __main__, so run the fakes from the importable module
+    import test_render_service
+    exit(test_render_service.main())
@@ -0,0 +1,124 @@
+"""
+Test the cross-session relevance score cache (no API key needed; embeddings are faked)
+"""
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import database
+import score_cache
+
+# Fixed fake embeddings: the two tea topics are near-identical, coffee is unrelated
+VECTORS = {
+    "green tea health benefits": np.array([1.0, 0.0, 0.1], dtype=np.float32),
+    "health benefits of green tea": np.array([0.98, 0.0, 0.15], dtype=np.float32),
+    "coffee roasting": np.array([0.0, 1.0, 0.0], dtype=np.float32),
+}
+embedded = []
+
+
+def fake_embed(texts):
+    embedded.append(list(texts))
+    return {t: VECTORS[t] for t in texts}
+
+
+def use_temp_db():
+    """Point the database at a fresh temporary file with the score cache tables"""
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(), 'research_memory.db')
+    database.init_database()
+    score_cache.init_score_cache()
+    embedded.clear()
+
+
+def results(*paths):
+    return [{"title": p, "url": f"https://example.com/{p}"} for p in paths]
+
+
+def test_exact_hit():
+    """Stored scores come back for the same topic and canonical URL"""
+    use_temp_db()
+    score_cache.store_scores("Green Tea: health benefits?", results("a", "b"),
+                             [{"score": 80, "reasoning": "good"}, {"score": 50, "reasoning": "Unable to score"}])
+
+    found = score_cache.lookup_scores("green tea health benefits",
+                                      [{"url": "https://www.example.com/a/?utm_source=x"}] + results("b", "c"))
+    print(f"Found: {found}")
+    # The 'Unable to score' fallback was not stored
+    assert list(found) == [0]
+    assert found[0]["score"] == 80
+    assert found[0]["cached_topic"] == "green tea health benefits"
+
+    stats = score_cache.get_score_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+
+
+def test_semantic_hit():
+    """Scores from a near-identical topic are reused above the threshold"""
+    use_temp_db()
+    original = score_cache.SCORE_CACHE_SEMANTIC_THRESHOLD
+    score_cache.SCORE_CACHE_SEMANTIC_THRESHOLD = 0.95
+    try:
+        score_cache.store_scores("coffee roasting", results("c"), [{"score": 90, "reasoning": "x"}], fake_embed)
+        score_cache.store_scores("green tea health benefits", results("a"), [{"score": 70, "reasoning": "y"}],
+                                 fake_embed)
+        assert embedded == [["coffee roasting"], ["green tea health benefits"]]
+
+        found = score_cache.lookup_scores("health benefits of green tea", results("a", "c"), fake_embed)
+        # Without an embedder only exact topics match
+        assert score_cache.lookup_scores("health benefits of green tea", results("a"), None) == {}
+    finally:
+        score_cache.SCORE_CACHE_SEMANTIC_THRESHOLD = original
+
+    print(f"Found: {found}")
+    assert list(found) == [0]
+    assert found[0]["score"] == 70
+    assert found[0]["cached_topic"] == "green tea health benefits"
+    assert score_cache.get_score_cache_stats()['semantic_hits'] == 1
+
+
+def test_age_expiry():
+    """Scores older than SCORE_CACHE_MAX_AGE_DAYS are not served"""
+    use_temp_db()
+    score_cache.store_scores("topic", results("a", "b"), [{"score": 80, "reasoning": "x"}] * 2)
+    with database.get_db() as conn:
+        conn.execute("UPDATE score_cache SET scored_at = ? WHERE url_key LIKE '%/a'",
+                     (time.time() - (score_cache.SCORE_CACHE_MAX_AGE_DAYS + 1) * 86400,))
+
+    found = score_cache.lookup_scores("topic", results("a", "b"))
+    print(f"Found: {found}")
+    assert list(found) == [1]
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Score Cache")
+    print("="*60)
+
+    tests = [
+        ("Exact hit", test_exact_hit),
+        ("Semantic hit", test_semantic_hit),
+        ("Age expiry", test_age_expiry),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
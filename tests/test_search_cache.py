@@ -0,0 +1,106 @@
+"""
+Test the disk-backed search result cache (no network or API key needed)
+"""
+import sys
+import os
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import search_cache
+
+
+def use_temp_cache():
+    """Point the cache module at a fresh temporary database"""
+    search_cache.SEARCH_CACHE_DB = os.path.join(tempfile.mkdtemp(), 'search_cache.db')
+    search_cache.init_cache()
+
+
+def test_hit_and_miss():
+    """Saved results are returned for a normalized query, and counted"""
+    use_temp_cache()
+    results = [{"title": f"Result {i}", "url": f"https://example.com/{i}"} for i in range(10)]
+
+    assert search_cache.get_cached_results("duckduckgo", "Quantum Computing", 10) is None
+    search_cache.save_results("duckduckgo", "Quantum Computing", 10, results)
+
+    cached = search_cache.get_cached_results("duckduckgo", "  quantum   computing? ", 10)
+    print(f"Cached results: {len(cached) if cached else 0}")
+    assert cached == results
+
+    # A larger cached request satisfies a smaller one
+    assert search_cache.get_cached_results("duckduckgo", "quantum computing", 5) == results[:5]
+    # ...but not the other way round, and providers don't share entries
+    assert search_cache.get_cached_results("duckduckgo", "quantum computing", 20) is None
+    assert search_cache.get_cached_results("tavily", "quantum computing", 10) is None
+
+    stats = search_cache.get_cache_stats()
+    print(f"Stats: {stats}")
+    assert stats['hits'] == 2
+    assert stats['misses'] == 3
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are not served"""
+    use_temp_cache()
+    search_cache.save_results("duckduckgo", "old query", 10, [{"title": "t", "url": "u"}])
+
+    original_ttl = search_cache.SEARCH_CACHE_TTL_SECONDS
+    search_cache.SEARCH_CACHE_TTL_SECONDS = -1
+    try:
+        assert search_cache.get_cached_results("duckduckgo", "old query", 10) is None
+    finally:
+        search_cache.SEARCH_CACHE_TTL_SECONDS = original_ttl
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted above the size cap"""
+    use_temp_cache()
+    original_max = search_cache.SEARCH_CACHE_MAX_ENTRIES
+    search_cache.SEARCH_CACHE_MAX_ENTRIES = 2
+    try:
+        search_cache.save_results("duckduckgo", "first", 10, [{"title": "1", "url": "1"}])
+        time.sleep(0.01)
+        search_cache.save_results("duckduckgo", "second", 10, [{"title": "2", "url": "2"}])
+        time.sleep(0.01)
+        # Touch "first" so "second" becomes least recently used
+        assert search_cache.get_cached_results("duckduckgo", "first", 10) is not None
+        time.sleep(0.01)
+        search_cache.save_results("duckduckgo", "third", 10, [{"title": "3", "url": "3"}])
+
+        assert search_cache.get_cached_results("duckduckgo", "second", 10) is None
+        assert search_cache.get_cached_results("duckduckgo", "first", 10) is not None
+        assert search_cache.get_cached_results("duckduckgo", "third", 10) is not None
+        assert search_cache.get_cache_stats()['entries'] == 2
+    finally:
+        search_cache.SEARCH_CACHE_MAX_ENTRIES = original_max
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Search Cache")
+    print("="*60)
+
+    tests = [
+        ("Hit and miss", test_hit_and_miss),
+        ("TTL expiry", test_ttl_expiry),
+        ("LRU eviction", test_lru_eviction),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,118 @@
+"""
+Test the search provider fallback chain, timeouts and hedging (no network; providers are stubbed)
+"""
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+RESULTS = [{"title": "Result", "url": "https://example.com/"}]
+
+
+def failing(query, num_results):
+    raise ConnectionError("HTTP 503")
+
+
+def empty(query, num_results):
+    return []
+
+
+def answering(query, num_results):
+    return RESULTS
+
+
+def slow(seconds):
+    def provider(query, num_results):
+        time.sleep(seconds)
+        return [{"title": "Slow", "url": "https://slow.example/"}]
+    return provider
+
+
+def search(providers: dict, hedge: bool = False):
+    """Run the fallback chain over stub providers, in the given order"""
+    original = dict(research_to_pdf.SEARCH_PROVIDERS)
+    research_to_pdf.SEARCH_PROVIDERS.update(providers)
+    try:
+        return research_to_pdf._search_with_fallback(list(providers), "query", 10, hedge)
+    finally:
+        research_to_pdf.SEARCH_PROVIDERS.clear()
+        research_to_pdf.SEARCH_PROVIDERS.update(original)
+
+
+def test_error_falls_back():
+    """A provider error moves on to the next provider in the chain"""
+    assert search({"stub_error": failing, "stub_ok": answering}) == ("stub_ok", RESULTS)
+
+
+def test_all_empty():
+    """Providers that all answer empty give (None, []); real failures raise"""
+    assert search({"stub_empty1": empty, "stub_empty2": empty}) == (None, [])
+    try:
+        search({"stub_empty3": empty, "stub_error2": failing})
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert "stub_error2" in str(e)
+
+
+def test_primary_timeout():
+    """A primary slower than SEARCH_TIMEOUT_SECONDS is abandoned for the next provider"""
+    original = research_to_pdf.SEARCH_TIMEOUT_SECONDS
+    research_to_pdf.SEARCH_TIMEOUT_SECONDS = 0.3
+    try:
+        started = time.time()
+        provider, results = search({"stub_hung": slow(2), "stub_backup": answering})
+        elapsed = time.time() - started
+    finally:
+        research_to_pdf.SEARCH_TIMEOUT_SECONDS = original
+    print(f"Answered by {provider} after {elapsed:.2f}s")
+    assert (provider, results) == ("stub_backup", RESULTS)
+    assert elapsed < 1.5
+
+
+def test_hedge_won_by_secondary():
+    """Past the primary's hedge budget the secondary starts too, and its faster answer wins"""
+    original = research_to_pdf.SEARCH_HEDGE_DEFAULT_BUDGET
+    research_to_pdf.SEARCH_HEDGE_DEFAULT_BUDGET = 0.1
+    try:
+        started = time.time()
+        provider, results = search({"stub_slow": slow(1.5), "stub_fast": answering}, hedge=True)
+        elapsed = time.time() - started
+    finally:
+        research_to_pdf.SEARCH_HEDGE_DEFAULT_BUDGET = original
+    print(f"Answered by {provider} after {elapsed:.2f}s")
+    assert (provider, results) == ("stub_fast", RESULTS)
+    assert elapsed < 1.0
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Search Fallback")
+    print("="*60)
+
+    tests = [
+        ("Error falls back", test_error_falls_back),
+        ("All empty", test_all_empty),
+        ("Primary timeout", test_primary_timeout),
+        ("Hedge won by secondary", test_hedge_won_by_secondary),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,84 @@
+"""
+Test concurrent multi-query search (no network; search_web() is faked)
+"""
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+# query: (delay in seconds, URLs returned); the first query answers last
+ANSWERS = {
+    "first": (0.3, ["https://a.example/1", "https://b.example/2"]),
+    "second": (0.1, ["https://b.example/2", "https://c.example/3"]),
+    "third": (0.0, ["https://c.example/3", "https://a.example/1", "https://d.example/4"]),
+}
+
+
+def fake_search_web(query, num_results=10, **kwargs):
+    delay, urls = ANSWERS[query]
+    time.sleep(delay)
+    return [{"title": f"{query}: {url}", "url": url} for url in urls]
+
+
+def search(queries):
+    original = research_to_pdf.search_web
+    research_to_pdf.search_web = fake_search_web
+    try:
+        return research_to_pdf.search_queries_parallel(queries, num_results=5)
+    finally:
+        research_to_pdf.search_web = original
+
+
+def test_first_seen_order_and_attribution():
+    """Results merge in query order, whatever order the queries finish in"""
+    started = time.perf_counter()
+    results = search(["first", "second", "third"])
+    elapsed = time.perf_counter() - started
+    print(f"Merged {len(results)} results in {elapsed:.2f}s")
+
+    assert [r['url'] for r in results] == [
+        "https://a.example/1", "https://b.example/2", "https://c.example/3", "https://d.example/4"]
+    # Each URL is credited to the first query (in query order) that returned it
+    assert [r['query'] for r in results] == ["first", "first", "second", "third"]
+    assert results[2]['title'] == "second: https://c.example/3"
+    # The queries ran concurrently: about the slowest one, not the sum
+    assert elapsed < 0.38
+
+
+def test_failed_query_is_skipped():
+    """A query whose search raises contributes nothing; the others still merge"""
+    results = search(["first", "missing", "third"])
+    assert [r['query'] for r in results] == ["first", "first", "third", "third"]
+    assert search([]) == []
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Parallel Search")
+    print("="*60)
+
+    tests = [
+        ("First-seen order and attribution", test_first_seen_order_and_attribution),
+        ("Failed query is skipped", test_failed_query_is_skipped),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
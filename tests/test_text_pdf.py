@@ -0,0 +1,107 @@
+"""
+Test the text-only PDF writer (no WeasyPrint needed)
+"""
+import sys
+import os
+import io
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pypdf import PdfReader
+import text_pdf
+import research_to_pdf
+
+
+def pack(sources: int, paragraphs: int) -> str:
+    parts = ["<html><head><meta charset='utf-8'><title>Tea &amp; Coffee</title>",
+             "<style>p { color: red; }</style></head><body>", "<h1>Research Pack: Tea &amp; Coffee</h1>"]
+    for i in range(1, sources + 1):
+        parts.append(f"<hr/><h2>Source {i}</h2><div class='source-url'>https://example.com/{'x' * 150}</div>")
+        parts.extend(f"<h3>Section {j}</h3><p>{'caffeine (and more) ' * 40}</p>" for j in range(paragraphs))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def test_parse_blocks():
+    """Headings, paragraphs, URL lines and rules come out in order, as plain text"""
+    blocks = text_pdf.parse_blocks(
+        "<html><head><title>x</title><style>p {}</style></head><body><h1>Title</h1><hr/>"
+        "<p>One &lt;b&gt; <a href='#'>link</a>\n text</p><p> </p><div class='source-url'>https://a.example/</div>"
+        "<h3>Sub</h3></body></html>")
+    print(f"Blocks: {blocks}")
+    assert blocks == [("h1", "Title"), ("hr", ""), ("p", "One <b> link text"),
+                      ("div", "https://a.example/"), ("h3", "Sub")]
+
+    assert text_pdf.supports(pack(1, 1))
+    assert not text_pdf.supports("<p>x</p><ul><li>item</li></ul>")
+
+
+def test_supports_only_cp1252_text():
+    """Text outside cp1252, literal or as entities, goes to WeasyPrint in auto mode"""
+    assert text_pdf.supports("<p>Caf&eacute; cr\u00e8me \u2014 \u20ac5</p>")
+    assert not text_pdf.supports("<p>\u91cf\u5b50\u8ba1\u7b97</p>")
+    assert not text_pdf.supports("<p>Emoji &#x1F600;</p>")
+
+    large = pack(40, 20)
+    assert len(large) >= research_to_pdf.PDF_AUTO_TEXT_MIN_CHARS
+    assert research_to_pdf.resolve_pdf_backend("auto", large) == "text"
+    assert research_to_pdf.resolve_pdf_backend("auto", large.replace("caffeine", "\u5496\u5561\u56e0")) == "weasyprint"
+
+
+def test_wrap():
+    """Lines fit the width; words longer than a line are split"""
+    width = 200
+    lines = text_pdf._wrap("short words here " * 20 + "y" * 300, "F1", 10.5, width)
+    assert len(lines) > 5
+    assert all(text_pdf._width(line, "F1", 10.5) <= width for line in lines)
+    assert b"".join(lines).count(b"y") == 300
+
+
+def test_valid_pdf_with_outline_and_page_numbers():
+    """The output parses strictly, paginates, and has a bookmark per h1/h2"""
+    data = text_pdf.build_pdf(pack(3, 6))
+    reader = PdfReader(io.BytesIO(data), strict=True)
+    pages = len(reader.pages)
+    print(f"{pages} pages, {len(data)} bytes")
+    assert pages > 3
+
+    assert reader.metadata.title == "Tea & Coffee"
+    assert [item.title for item in reader.outline] == [
+        "Research Pack: Tea & Coffee", "Source 1", "Source 2", "Source 3"]
+
+    first = reader.pages[0].extract_text()
+    assert "Research Pack: Tea & Coffee" in first
+    assert "caffeine (and more)" in first
+    assert f"Page 1 of {pages}" in first
+    assert f"Page {pages} of {pages}" in reader.pages[-1].extract_text()
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Text PDF Writer")
+    print("="*60)
+
+    tests = [
+        ("Parse blocks", test_parse_blocks),
+        ("Supports only cp1252 text", test_supports_only_cp1252_text),
+        ("Wrap", test_wrap),
+        ("Valid PDF with outline and page numbers", test_valid_pdf_with_outline_and_page_numbers),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
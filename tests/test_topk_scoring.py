@@ -0,0 +1,100 @@
+"""
+Test early-terminating top-k scoring (no API calls; LLM scores are faked)
+"""
+import sys
+import os
+import asyncio
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import research_to_pdf
+
+# 40 candidates with local priors 79, 78, ... 40
+RESULTS = [{"title": f"Result {i}", "url": f"https://site{i}.example/"} for i in range(40)]
+PRIORS = [79 - i for i in range(40)]
+
+
+def score_waves(llm_score: int, top_k: int = 5):
+    """Run _score_in_waves with every LLM score equal to llm_score"""
+    scored_urls = []
+
+    async def fake_score_with_cache(topic, results, batch_size, use_cache=True, **kwargs):
+        scored_urls.extend(r['url'] for r in results)
+        return [{"score": llm_score, "reasoning": "fake"} for _ in results]
+
+    original = (research_to_pdf._score_with_cache, research_to_pdf.SCORING_WAVE_SIZE,
+                research_to_pdf.SCORING_TOPK_MARGIN)
+    research_to_pdf._score_with_cache = fake_score_with_cache
+    research_to_pdf.SCORING_WAVE_SIZE = 10
+    research_to_pdf.SCORING_TOPK_MARGIN = 20
+    metrics = {}
+    try:
+        scored = asyncio.run(research_to_pdf._score_in_waves(
+            "topic", RESULTS, list(range(len(RESULTS))), PRIORS, limit=40, batch_size=10,
+            use_cache=False, min_score=60, top_k=top_k, confirmed=[], metrics=metrics))
+    finally:
+        (research_to_pdf._score_with_cache, research_to_pdf.SCORING_WAVE_SIZE,
+         research_to_pdf.SCORING_TOPK_MARGIN) = original
+    return scored, scored_urls, metrics
+
+
+def test_settled():
+    """Settled once top_k scores exist that the next prior plus the margin can't beat"""
+    original = research_to_pdf.SCORING_TOPK_MARGIN
+    research_to_pdf.SCORING_TOPK_MARGIN = 20
+    try:
+        assert not research_to_pdf._top_k_settled([90, 90], 3, 10)
+        assert research_to_pdf._top_k_settled([90, 90, 90], 3, None)
+        assert research_to_pdf._top_k_settled([95, 70, 90], 2, 70)
+        assert not research_to_pdf._top_k_settled([95, 70, 90], 2, 71)
+    finally:
+        research_to_pdf.SCORING_TOPK_MARGIN = original
+
+
+def test_stops_after_strong_first_wave():
+    """Strong early scores stop scoring after about top_k results (one wave)"""
+    scored, scored_urls, metrics = score_waves(llm_score=90)
+    print(f"Scored {len(scored)}, metrics {metrics}")
+    assert len(scored) == 10
+    # Best priors first
+    assert scored_urls == [r['url'] for r in RESULTS[:10]]
+    assert metrics == {'waves': 1, 'stopped_early': True, 'skipped': 30}
+
+
+def test_continues_while_a_prior_could_displace_kth():
+    """Scoring goes on while an unscored prior plus the margin could beat the current kth score"""
+    scored, _, metrics = score_waves(llm_score=75)
+    print(f"Scored {len(scored)}, metrics {metrics}")
+    # After each wave the next prior (69, 59, 49) + 20 is compared with 75: stop only at 49
+    assert len(scored) == 30
+    assert metrics == {'waves': 3, 'stopped_early': True, 'skipped': 10}
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing Top-k Scoring")
+    print("="*60)
+
+    tests = [
+        ("Settled", test_settled),
+        ("Stops after strong first wave", test_stops_after_strong_first_wave),
+        ("Continues while a prior could displace kth", test_continues_while_a_prior_could_displace_kth),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
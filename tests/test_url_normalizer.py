@@ -0,0 +1,151 @@
+"""
+Test URL canonicalization and duplicate collapsing (no network needed)
+"""
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import url_normalizer
+import database as db
+
+
+def test_variants_share_a_key():
+    """Scheme, www., trailing slash, tracking params, fragment, AMP and mobile variants collapse"""
+    variants = [
+        "https://www.example.com/news/story",
+        "http://example.com/news/story/",
+        "https://EXAMPLE.com/news/story?utm_source=twitter&utm_medium=social",
+        "https://example.com/news/story?fbclid=abc#comments",
+        "https://example.com/news/story/amp/",
+        "https://example.com/amp/news/story",
+        "https://m.example.com/news/story",
+        "https://www.google.com/amp/s/example.com/news/story",
+        "https://example-com.cdn.ampproject.org/c/s/example.com/news/story?amp=1",
+        "https://example.com:443/news/story",
+    ]
+    keys = {url_normalizer.url_key(url) for url in variants}
+    print(f"Keys: {keys}")
+    assert keys == {"example.com/news/story"}
+
+    assert url_normalizer.url_key("https://en.m.wikipedia.org/wiki/X") == "en.wikipedia.org/wiki/X"
+
+
+def test_distinct_pages_stay_distinct():
+    """Meaningful query params, paths, ports and registrable domains are kept"""
+    assert url_normalizer.url_key("https://example.com/a?page=2") != url_normalizer.url_key("https://example.com/a?page=3")
+    assert url_normalizer.url_key("https://example.com/a?x=1&y=2") == url_normalizer.url_key("https://example.com/a?y=2&x=1")
+    assert url_normalizer.url_key("https://example.com/a") != url_normalizer.url_key("https://example.com/b")
+    assert url_normalizer.url_key("https://example.com:8443/a") != url_normalizer.url_key("https://example.com/a")
+    assert url_normalizer.url_key("https://m.co/a") == "m.co/a"
+    # A bare /amp is a page of its own, not the AMP variant of the site root
+    assert url_normalizer.url_key("https://example.com/amp") == "example.com/amp"
+    assert url_normalizer.url_key("https://example.com/amp/") != url_normalizer.url_key("https://example.com/")
+    assert url_normalizer.url_key("not a url") == "not a url"
+
+
+def test_canonical_url_is_fetchable():
+    """canonical_url() keeps the scheme and www. but drops tracking, fragment and AMP"""
+    assert url_normalizer.canonical_url("https://www.Example.com/a/?utm_campaign=x&q=1#top") == \
+        "https://www.example.com/a?q=1"
+    assert url_normalizer.canonical_url("https://example.com/story.amp.html") == "https://example.com/story.html"
+    assert url_normalizer.canonical_url("http://example.com") == "http://example.com/"
+
+
+def test_collapse_duplicates():
+    """First result wins, https is preferred, and every spelling is recorded as an alias"""
+    results = [
+        {"title": "First", "url": "http://example.com/a", "query": "q1"},
+        {"title": "Other", "url": "https://other.org/"},
+        {"title": "Second", "url": "https://www.example.com/a/?utm_medium=email", "query": "q2"},
+        {"title": "Mobile", "url": "https://m.example.com/a"},
+    ]
+    unique = url_normalizer.collapse_duplicates(results)
+    print(unique)
+
+    assert [r['title'] for r in unique] == ["First", "Other"]
+    assert unique[0]['query'] == "q1"
+    assert unique[0]['url'] == "https://www.example.com/a"
+    assert set(unique[0]['aliases']) == {"http://example.com/a",
+                                         "https://www.example.com/a/?utm_medium=email",
+                                         "https://m.example.com/a"}
+    assert unique[1]['aliases'] == []
+    # Input dicts are not modified
+    assert results[0]['url'] == "http://example.com/a"
+
+
+def test_save_sources_by_url_key():
+    """db.save_sources() keeps one row per page and merges alias sets"""
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), 'research_memory.db')
+    db.init_database()
+    session_id = db.save_session_start("topic", 3, "quality", "balanced", 60, 10)
+
+    db.save_sources(session_id, [{"url": "https://example.com/a", "aliases": ["http://example.com/a"]}])
+    db.save_sources(session_id,
+                    [{"url": "https://www.example.com/a/", "aliases": ["https://m.example.com/a"]}],
+                    selected_urls=["http://example.com/a?utm_source=x"])
+
+    sources = db.get_session_details(session_id)['sources']
+    assert len(sources) == 1
+    assert sources[0]['selected'] == 1
+    assert sources[0]['url_key'] == "example.com/a"
+    assert "https://m.example.com/a" in sources[0]['aliases']
+    assert "http://example.com/a" in sources[0]['aliases']
+
+
+def test_migrate_canonical_url_column():
+    """Databases with the old canonical_url column get it renamed to url_key"""
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), 'research_memory.db')
+    db.init_database()
+    with db.get_db() as conn:
+        conn.execute("DROP INDEX idx_sources_url_key")
+        conn.execute("ALTER TABLE sources RENAME COLUMN url_key TO canonical_url")
+        conn.execute("CREATE INDEX idx_sources_canonical ON sources(session_id, canonical_url)")
+    session_id = db.save_session_start("topic", 3, "quality", "balanced", 60, 10)
+    with db.get_db() as conn:
+        conn.execute("INSERT INTO sources (session_id, url, canonical_url) VALUES (?, ?, ?)",
+                     (session_id, "https://example.com/a", "example.com/a"))
+
+    db.init_database()
+    db.save_sources(session_id, [{"url": "http://www.example.com/a"}], selected_urls=["https://example.com/a"])
+    sources = db.get_session_details(session_id)['sources']
+    assert len(sources) == 1
+    assert sources[0]['url_key'] == "example.com/a"
+    assert sources[0]['selected'] == 1
+    with db.get_db() as conn:
+        indexes = {row['name'] for row in conn.execute("PRAGMA index_list(sources)")}
+    assert "idx_sources_url_key" in indexes
+    assert "idx_sources_canonical" not in indexes
+
+
+def main():
+    print("="*60)
+    print("🧪 Testing URL Normalizer")
+    print("="*60)
+
+    tests = [
+        ("Variants share a key", test_variants_share_a_key),
+        ("Distinct pages stay distinct", test_distinct_pages_stay_distinct),
+        ("Canonical URL is fetchable", test_canonical_url_is_fetchable),
+        ("Collapse duplicates", test_collapse_duplicates),
+        ("Save sources by URL key", test_save_sources_by_url_key),
+        ("Migrate canonical_url column", test_migrate_canonical_url_column),
+    ]
+
+    failed = 0
+    for name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASSED - {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ FAILED - {name}: {e}")
+
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())